@@ -0,0 +1,75 @@
+# bench/fixtures.py
+"""오프라인 벤치마크용 고정 입력 (네트워크 / 키 불필요, seed 고정)"""
+import json, random
+
+from core.fixed  import Scale
+from core.models import StratCfg
+
+SEED = 7
+
+SPOT  = Scale(price_dp=10, qty_dp=8)
+HEDGE = Scale(price_dp=1,  qty_dp=3)
+FX    = Scale(price_dp=8)
+
+STRAT = StratCfg(bp_threshold=0.5, order_size_krw=100000, requote_bp=1)
+
+# Upbit SIMPLE orderbook (depth 1) / DEFAULT 포맷, Binance bookTicker – 실제 프레임과 같은 모양
+UPBIT_SIMPLE = json.dumps({
+    "ty": "orderbook", "cd": "USDT-BTC", "tms": 1700000000123,
+    "tas": 1.23456789, "tbs": 2.3456789,
+    "obu": [{"ap": 60010.5, "as": 0.12345678, "bp": 60000.25, "bs": 0.87654321}],
+    "st": "REALTIME", "lv": 0,
+}, separators=(",", ":")).encode()
+
+UPBIT_DEFAULT = json.dumps({
+    "type": "orderbook", "code": "USDT-BTC", "timestamp": 1700000000123,
+    "total_ask_size": 1.23456789, "total_bid_size": 2.3456789,
+    "orderbook_units": [{"ask_price": 60010.5, "bid_price": 60000.25,
+                         "ask_size": 0.12345678, "bid_size": 0.87654321}],
+    "stream_type": "REALTIME", "level": 0,
+}, separators=(",", ":")).encode()
+
+BINANCE_BOOK = (b'{"e":"bookTicker","u":400900217,"s":"BTCUSDT",'
+                b'"b":"60000.10","B":"31.210","a":"60000.20","A":"40.660",'
+                b'"T":1700000000120,"E":1700000000123}')
+
+
+def quotes(n: int = 1024):
+    """Strategy 입력 (bid, ask, bid_f, ask_f) – implied 근처에서 흔들리는 값"""
+    r, out = random.Random(SEED), []
+    f = 600000
+    for _ in range(n):
+        f  += r.randint(-3, 3)
+        imp = 2 * 10 ** 11 // (2 * f + 1)
+        off = r.randint(-1500, 1500)
+        out.append((imp + off - 100, imp + off + 100, f, f + 1))
+    return out
+
+
+class StubUpbitREST:
+    """UpbitOrderPoller 용 – 응답을 즉시 돌려주는 ccxt 대역"""
+    def __init__(self, ids):
+        self.open = [{"id": i, "status": "open", "filled": 0.001, "side": "buy"} for i in ids]
+
+    async def fetch_open_orders(self, *a, **k):
+        return self.open
+
+    async def fetch_closed_orders(self, *a, **k):
+        return []
+
+    async def fetch_canceled_orders(self, *a, **k):
+        return []
+
+    async def fetch_order(self, oid, *a, **k):
+        return {"id": oid, "status": "open", "filled": 0.001, "side": "buy"}
+
+
+class StubWrapper:
+    """ExchWrapper 대역 – OMS 가 생성 시 쓰는 id / symbol / scale (RateScheduler, ledger, hedger 등록)"""
+    def __init__(self, scale: Scale, ccxt_ex=None, symbol="BTC/USDT", id="upbit"):
+        self.scale, self.ccxt_ex, self.symbol, self.id = scale, ccxt_ex, symbol, id
+
+
+class StubFx:
+    scale = FX
+    price = FX.px("1400.5")
@@ -0,0 +1,230 @@
+# bench/hotpath.py
+"""
+틱 단위 핫패스 마이크로 벤치마크.
+
+  python -m bench.hotpath                      # 측정 + baseline 비교 (회귀 시 exit 1)
+  python -m bench.hotpath --save               # 현재 결과를 baseline 으로 저장
+  python -m bench.hotpath -k decode --threshold 0.1
+
+지표 (벤치마크별)
+  ns/op      : 전체 평균
+  p50 / p99  : 배치(batch 회) 평균 ns/op 의 분포 – 회귀 판정은 p50 기준
+  alloc B/op : tracemalloc peak 기준 1회당 임시 할당 바이트 (중앙값)
+
+baseline.json 은 측정한 머신 기준이다. 다른 머신에서는 --save 로 먼저 다시 만든다.
+"""
+import argparse, asyncio, gc, json, statistics, sys, time, tracemalloc
+from pathlib import Path
+
+from core.codec        import get_decoder
+from core.fills        import FillTracker
+from core.oms          import OMS
+from core.order_poller import UpbitOrderPoller
+from core.strategy     import Strategy
+from core.bus          import MarketBus
+from core.ratelimit    import RateScheduler, Prio
+
+from . import fixtures as fx
+
+BASELINE = Path(__file__).with_name("baseline.json")
+
+BENCHES = {}
+
+
+def bench(name, batch=1000, rounds=200, is_async=False):
+    def deco(fn):
+        BENCHES[name] = (fn, batch, rounds, is_async)
+        return fn
+    return deco
+
+
+# ────────────────────────────── 피드 디코드
+def _decoder_case(venue, backend, frame, scale):
+    dec = get_decoder(venue, backend, scale)
+    return lambda: dec(frame)
+
+for _b in ("scan", "json", "legacy"):
+    bench(f"decode.upbit.{_b}")(
+        lambda b=_b: _decoder_case("upbit", b,
+                                   fx.UPBIT_DEFAULT if b == "legacy" else fx.UPBIT_SIMPLE,
+                                   fx.SPOT))
+    bench(f"decode.binance.{_b}")(
+        lambda b=_b: _decoder_case("binance", b, fx.BINANCE_BOOK, fx.HEDGE))
+
+
+# ────────────────────────────── Strategy / OMS
+@bench("strategy.eval")
+def _strategy():
+    bus   = MarketBus({"spot": fx.SPOT, "hedge": fx.HEDGE})
+    strat = Strategy(fx.STRAT, bus, None, None)
+    qs, i = fx.quotes(), [0]
+    def op():
+        q = qs[i[0] & 1023]; i[0] += 1
+        return strat.spreads(*q)
+    return op
+
+
+@bench("strategy.eval_vec.n32", batch=200, rounds=100)
+def _strategy_vec():
+    """pair 32 개를 한 번에 (Strategy.spreads_vec) – op 1회 = 32 pair 판정"""
+    bus   = MarketBus([{"spot": fx.SPOT, "hedge": fx.HEDGE}] * 32)
+    strat = Strategy(fx.STRAT, bus, None, None)
+    qs    = fx.quotes()
+    for i in range(32):
+        bid, ask, bid_f, ask_f = qs[i]
+        bus.publish("spot", bid, ask, i=i)
+        bus.publish("hedge", bid_f, ask_f, i=i)
+    idx = bus.drain()
+    return lambda: strat.spreads_vec(idx)
+
+
+@bench("oms.size_btc")
+def _size():
+    oms = OMS(fx.StubWrapper(fx.SPOT, symbol="USDT/BTC"),
+              fx.StubWrapper(fx.HEDGE, symbol="BTC/USDT:USDT", id="binanceusdm"), fx.STRAT,
+              None, None, None, fx.StubFx())
+    qs, i = fx.quotes(), [0]
+    def op():
+        q = qs[i[0] & 1023]; i[0] += 1
+        return oms._size_btc(q[1])
+    return op
+
+
+# ────────────────────────────── async
+@bench("ratelimit.acquire.x8", batch=64, rounds=100, is_async=True)
+def _bucket():
+    """8 개 코루틴이 동시에 acquire – rps 를 크게 잡아 대기 없이 스케줄러 경로만 측정"""
+    rl = RateScheduler("upbit", {"order": 10**9})
+    async def worker(k):
+        for _ in range(k):
+            await rl.acquire("order", Prio.NEW)
+    async def op(n):
+        await asyncio.gather(*(worker(n // 8) for _ in range(8)))
+    return op
+
+
+@bench("poller.poll_once.n50", batch=10, rounds=100, is_async=True)
+def _poller():
+    ids = [f"oid-{i}" for i in range(50)]
+    ex  = fx.StubUpbitREST(ids)
+    tr  = FillTracker({}, asyncio.Queue())
+    p   = UpbitOrderPoller(fx.StubWrapper(fx.SPOT, ex), tr)
+    async def op(n):
+        for _ in range(n):
+            tr.watch.update(dict.fromkeys(ids, tr.fill_q))
+            tr._filled.clear()
+            await p._poll_once()
+            while not tr.fill_q.empty():
+                tr.fill_q.get_nowait()
+    return op
+
+
+# ────────────────────────────── 실행기
+def _measure_sync(op, batch, rounds):
+    for _ in range(batch):                       # warm-up
+        op()
+    samples = []
+    pc = time.perf_counter_ns
+    for _ in range(rounds):
+        t0 = pc()
+        for _ in range(batch):
+            op()
+        samples.append((pc() - t0) / batch)
+    tm, peaks = tracemalloc, []
+    tm.start()
+    for _ in range(min(batch, 200)):
+        cur = tm.get_traced_memory()[0]
+        tm.reset_peak()
+        op()
+        peaks.append(tm.get_traced_memory()[1] - cur)
+    tm.stop()
+    return samples, statistics.median(peaks)
+
+
+def _measure_async(op, batch, rounds):
+    async def run():
+        await op(batch)                          # warm-up
+        samples = []
+        pc = time.perf_counter_ns
+        for _ in range(rounds):
+            t0 = pc()
+            await op(batch)
+            samples.append((pc() - t0) / batch)
+        tracemalloc.start()
+        cur = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        await op(batch)
+        peak = (tracemalloc.get_traced_memory()[1] - cur) / batch
+        tracemalloc.stop()
+        return samples, peak
+    return asyncio.run(run())
+
+
+def run(pattern: str = "") -> dict:
+    out = {}
+    for name, (factory, batch, rounds, is_async) in BENCHES.items():
+        if pattern and pattern not in name:
+            continue
+        gc.collect()
+        gc.disable()
+        try:
+            op = factory()
+            samples, alloc = (_measure_async if is_async else _measure_sync)(op, batch, rounds)
+        finally:
+            gc.enable()
+        samples.sort()
+        out[name] = {
+            "ns_op":   round(statistics.mean(samples), 1),
+            "p50":     round(samples[len(samples) // 2], 1),
+            "p99":     round(samples[min(len(samples) - 1, int(len(samples) * 0.99))], 1),
+            "alloc_B": round(alloc, 1),
+        }
+    return out
+
+
+def compare(cur: dict, base: dict, threshold: float) -> list[str]:
+    bad = []
+    for name, r in cur.items():
+        b = base.get(name)
+        if b and r["p50"] > b["p50"] * (1 + threshold):
+            bad.append(name)
+    return bad
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    ap.add_argument("-k", default="", help="이름에 이 문자열이 들어간 벤치만")
+    ap.add_argument("--threshold", type=float, default=0.25,
+                    help="baseline 대비 허용 증가율 (0.25 = +25%%)")
+    ap.add_argument("--baseline", default=str(BASELINE))
+    ap.add_argument("--save", action="store_true", help="결과를 baseline 으로 저장")
+    ap.add_argument("--json", action="store_true", help="결과를 JSON 으로 출력")
+    a = ap.parse_args(argv)
+
+    cur  = run(a.k)
+    path = Path(a.baseline)
+    base = json.loads(path.read_text()) if path.exists() else {}
+
+    if a.json:
+        print(json.dumps(cur, indent=2))
+    else:
+        print(f"{'bench':32} {'ns/op':>10} {'p50':>10} {'p99':>10} {'alloc B':>9} {'vs base':>8}")
+        for name, r in cur.items():
+            b  = base.get(name)
+            vs = f"{r['p50'] / b['p50'] - 1:+.0%}" if b else "-"
+            print(f"{name:32} {r['ns_op']:>10} {r['p50']:>10} {r['p99']:>10} "
+                  f"{r['alloc_B']:>9} {vs:>8}")
+
+    if a.save:
+        base.update(cur)
+        path.write_text(json.dumps(base, indent=2, sort_keys=True) + "\n")
+        return 0
+    bad = compare(cur, base, a.threshold)
+    if bad:
+        print(f"REGRESSION (> +{a.threshold:.0%}): {', '.join(bad)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
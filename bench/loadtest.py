@@ -0,0 +1,405 @@
+# bench/loadtest.py
+"""
+로컬 모의 거래소(bench/mockex.py) 에 main.main() 을 그대로 붙여 보는 end-to-end 부하 시험.
+
+  python -m bench.loadtest                                   # 시세 500 프레임/s, 60 초
+  python -m bench.loadtest --rate 2000 --sec 120 --burst 10,1,5
+  python -m bench.loadtest --lat 30,0.6 --errors 0.01 --http429 0.005
+  python -m bench.loadtest --ramp 250,500,1000,2000,4000,8000 --step-sec 20   # 최대 지속 rate
+  python -m bench.loadtest --set runtime.feeds=process --set runtime.decoder=json --json out.json
+
+  모의 거래소는 자식 프로세스 (봇과 CPU 를 나눠 쓰지 않게), 봇은 이 프로세스에서 main.main(cfg).
+  설정은 config.yaml 에서 거래소 rest_url / ws_url 만 mock 으로 바꾸고 hedge_backup 라우팅과
+  metrics 서버는 끈다. 임시 작업 디렉터리에 가짜 .env 와 market 캐시를 만들어 load_markets 없이 기동.
+  rate 는 두 venue 합 (--spot-share 로 나눔).
+
+  단계(rate) 마다
+    ticks/s     봇이 디코드한 시세 프레임 (rx_decode 관측 수) – sent 는 mock 이 실제로 보낸 수
+    ex_rx       거래소 시각 → 수신 p50 / p99 (ms) – 봇이 못 따라가면 소켓에 쌓여 계속 커진다
+    t→order     시세 수신 → 주문 송신 p50 / p99, t→ack 는 주문 응답까지 (Trace 주문 로그)
+    fill→hedge  체결 감지 → 헷지 주문 응답 p50 / p99 (fill_hedge_ack)
+    queue       OMS 명령 / 체결 큐, 로그 큐 최대 깊이
+    lag         10 ms 타이머가 늦은 정도 p99 (이벤트 루프 포화)
+    rss         단계 끝 RSS (MB) / 단계 동안 증가 속도 (MB/분)
+  지속 가능 : sent ≥ 97% × 목표 (봇이 소켓을 비우지 못하면 mock 도 못 보낸다), ticks ≥ 97% × sent,
+              ex_rx p99 ≤ --max-lag, lag p99 ≤ --max-lag – burst 가 있으면 sent 가 목표보다 크다
+  runtime.feeds: process 면 디코드가 자식 프로세스라 ticks 는 ShmBridge 가 반영한 (conflated) 갱신 수,
+  ex_rx 는 없다 – sent 와 lag 로만 판정
+"""
+import argparse, asyncio, json, logging, multiprocessing as mp, os, sys, tempfile, time
+from pathlib import Path
+
+import aiohttp, ccxt, yaml
+from prometheus_client import REGISTRY
+
+import main as bot
+from core.feedproc import run_loop
+from core.logq     import setup_logging
+from core.models   import Settings
+from core.sim      import _override
+from core.startup  import startup
+from core.trace    import STAGES, tracer
+
+from . import mockex
+
+PAGE = os.sysconf("SC_PAGE_SIZE")
+
+KEYS = {"UPBIT_KEY": "mock", "UPBIT_SECRET": "mock" * 8,
+        "BINANCEUSDM_KEY": "mock", "BINANCEUSDM_SECRET": "mock" * 8}
+
+
+# ────────────────────────────── 설정 / 작업 디렉터리
+def _upbit_id(symbol: str) -> str:
+    base, quote = symbol.split("/")
+    return f"{quote}-{base}"
+
+
+def _binance_raw(symbol: str) -> dict:
+    base, quote = symbol.split(":")[0].split("/")
+    return {"symbol": base + quote, "pair": base + quote, "contractType": "PERPETUAL",
+            "deliveryDate": 4133404800000, "onboardDate": 1569398400000, "status": "TRADING",
+            "baseAsset": base, "quoteAsset": quote, "marginAsset": quote,
+            "pricePrecision": 1, "quantityPrecision": 3, "underlyingType": "COIN",
+            "orderTypes": ["LIMIT", "MARKET"], "timeInForce": ["GTC", "IOC", "FOK", "GTX"],
+            "filters": [
+                {"filterType": "PRICE_FILTER", "tickSize": str(mockex.HEDGE_TICK),
+                 "minPrice": "0.1", "maxPrice": "10000000"},
+                {"filterType": "LOT_SIZE", "stepSize": "0.001", "minQty": "0.001",
+                 "maxQty": "100000000"},
+                {"filterType": "MARKET_LOT_SIZE", "stepSize": "0.001", "minQty": "0.001",
+                 "maxQty": "100000000"},
+                {"filterType": "MIN_NOTIONAL", "notional": "5"}]}
+
+
+def _markets(cfg: Settings) -> dict[str, dict]:
+    """venue → {symbol: ccxt market} – 거래소 응답 모양 그대로 ccxt parse_market 으로 만든다"""
+    up, bn = ccxt.upbit(), ccxt.binanceusdm()
+    spot = {}
+    for s in {p.spot for p in cfg.pairs} | {cfg.exchanges["spot"].symbol, cfg.fx.symbol}:
+        m = up.parse_market({"market": _upbit_id(s)})
+        m["precision"]["price"] = mockex.SPOT_TICK
+        spot[s] = m
+    hedge = {s: bn.parse_market(_binance_raw(s))
+             for s in {p.hedge for p in cfg.pairs} | {cfg.exchanges["hedge_primary"].symbol}}
+    return {"upbit": spot, "binanceusdm": hedge}
+
+
+def workdir(cfg: Settings) -> Path:
+    """임시 cwd – 가짜 .env, market 캐시 (main 은 상대 경로로 읽는다)"""
+    d = Path(tempfile.mkdtemp(prefix="loadtest-"))
+    (d / ".env").write_text("".join(f"{k}={v}\n" for k, v in KEYS.items()))
+    mdir = d / cfg.markets.cache_dir
+    mdir.mkdir(parents=True)
+    for venue, ms in _markets(cfg).items():
+        (mdir / f"{venue}.json").write_text(json.dumps({"ts": time.time(), "markets": ms},
+                                                       default=str))
+    return d
+
+
+def bot_config(path: Path, host: str, ports: dict, sets: dict) -> Settings:
+    raw = yaml.safe_load(path.read_text())
+    for k, venue in (("spot", "upbit"), ("hedge_primary", "binanceusdm")):
+        raw["exchanges"][k].update(rest_url=f"http://{host}:{ports[venue]}",
+                                   ws_url=f"ws://{host}:{ports[venue]}")
+    _override(raw, {"runtime.run_mode": "LIVE", "runtime.metrics_port": 0,
+                    "hedge.route.enabled": False, "journal.enabled": False,
+                    "markets.enabled": True, "markets.ttl_sec": 10 ** 9,
+                    "trace.enabled": True, "trace.order_log": True, **sets})
+    return Settings(**raw)
+
+
+def mock_config(cfg: Settings, a) -> dict:
+    pairs = [{"code": p.ws_code, "market": _upbit_id(p.spot),
+              "symbol": p.ws_stream.split("@")[0].upper(), "mid": 60000.0 * (1 + i)}
+             for i, p in enumerate(cfg.pairs)]
+    lat, sigma = (float(x) for x in a.lat.split(","))
+    venue = {"lat_ms": lat, "lat_sigma": sigma, "error_rate": a.errors, "http429": a.http429,
+             "burst": [float(x) for x in a.burst.split(",")] if a.burst else [0, 0, 1],
+             "ws_lag_ms": a.ws_lag}
+    return {"host": a.host, "seed": a.seed, "band": float(cfg.strategy.band), "pairs": pairs,
+            "upbit": {**venue, "port": a.port, "fill_prob": a.fill_prob},
+            "binanceusdm": {**venue, "port": a.port + 1}}
+
+
+# ────────────────────────────── 봇 프로세스 안 표본
+class _Tap:
+    """tracer 구간 히스토그램 앞에 끼워 값을 그대로 모은다 (분위수를 버킷이 아닌 표본으로)"""
+    def __init__(self, h):
+        self.h, self.v = h, []
+
+    def observe(self, x: float):
+        self.v.append(x)
+        self.h.observe(x)
+
+
+class _Orders(logging.Handler):
+    """Trace 주문 로그 → (수신→송신, 수신→ack) ms"""
+    def __init__(self):
+        super().__init__()
+        self.v = []
+
+    def emit(self, record):
+        o = json.loads(record.getMessage())
+        if o.get("rx"):
+            self.v.append(((o["sent"] - o["rx"]) / 1e6, (o["ack"] - o["rx"]) / 1e6))
+
+
+def pct(v: list, q: float) -> float:
+    if not v:
+        return 0.0
+    s = sorted(v)
+    return s[min(len(s) - 1, int(q * len(s)))]
+
+
+class Probe:
+    def __init__(self, cfg: Settings, listener):
+        self.taps = {s: _Tap(tracer._h[s]) for s in STAGES}
+        tracer._h.update(self.taps)
+        self.orders = _Orders()
+        tl = logging.getLogger("Trace")
+        tl.addHandler(self.orders)
+        tl.setLevel(logging.INFO)
+        tl.propagate = False                # 주문 로그는 표본으로만
+        self.syms  = [p.spot for p in cfg.pairs]
+        self.logq  = listener.queue if listener else None
+        self.reset()
+
+    def reset(self):
+        for t in self.taps.values():
+            t.v = []
+        self.orders.v = []
+        self.lag, self.rss, self.q = [], [], {"ord": 0, "fill": 0, "log": 0}
+        self.paused = 0
+
+    def _gauges(self):
+        get = REGISTRY.get_sample_value
+        for s in self.syms:
+            for k in ("ord", "fill"):
+                self.q[k] = max(self.q[k], get("oms_queue_depth", {"symbol": s, "queue": k}) or 0)
+        if self.logq is not None:
+            self.q["log"] = max(self.q["log"], self.logq.qsize())
+        self.paused = max(self.paused, get("liveness_state") or 0)
+
+    def sample_rss(self, t: float):
+        with open("/proc/self/statm") as f:
+            self.rss.append((t, int(f.read().split()[1]) * PAGE / 2 ** 20))
+
+    async def run(self):
+        loop, n = asyncio.get_running_loop(), 0
+        t_rss = loop.time()
+        while True:
+            t = loop.time()
+            await asyncio.sleep(0.01)
+            self.lag.append((loop.time() - t - 0.01) * 1000)
+            n += 1
+            if n % 10 == 0:
+                self._gauges()
+            if t - t_rss >= 1:              # 루프가 밀려도 초 단위로
+                self.sample_rss(t)
+                t_rss = t
+
+
+def _slope(pts: list) -> float:
+    """최소제곱 기울기 (MB/분)"""
+    if len(pts) < 2:
+        return 0.0
+    n  = len(pts)
+    mt = sum(t for t, _ in pts) / n
+    mv = sum(v for _, v in pts) / n
+    d  = sum((t - mt) ** 2 for t, _ in pts)
+    return sum((t - mt) * (v - mv) for t, v in pts) / d * 60 if d else 0.0
+
+
+# ────────────────────────────── 실행
+class Harness:
+    def __init__(self, a, cfg: Settings, mcfg: dict):
+        self.a, self.cfg, self.mcfg = a, cfg, mcfg
+        self.base  = f"http://{a.host}:{a.port}"
+        self.http  = None
+
+    async def _mock(self, path: str, body: dict | None = None) -> dict:
+        fn = self.http.post(self.base + path, json=body) if body is not None \
+             else self.http.get(self.base + path)
+        async with fn as r:
+            return await r.json()
+
+    async def _ready(self, timeout: float = 15):
+        t = time.monotonic()
+        while True:
+            try:
+                return await self._mock("/_mock/stats")
+            except aiohttp.ClientError:
+                if time.monotonic() - t > timeout:
+                    raise
+                await asyncio.sleep(0.1)
+
+    async def set_rate(self, rate: float):
+        s = self.a.spot_share
+        await self._mock("/_mock/cfg", {"upbit": {"rate": rate * s},
+                                         "binanceusdm": {"rate": rate * (1 - s)}})
+
+    async def step(self, probe: Probe, rate: float) -> dict:
+        a = self.a
+        await self.set_rate(rate)
+        await asyncio.sleep(a.settle)
+        s0 = await self._mock("/_mock/stats")
+        probe.reset()
+        t0 = time.monotonic()
+        await asyncio.sleep(a.step_sec)
+        s1 = await self._mock("/_mock/stats")
+        dt = time.monotonic() - t0
+        probe.sample_rss(asyncio.get_running_loop().time())
+        tp = probe.taps
+
+        def d(venue, k):
+            return s1[venue].get(k, 0) - s0[venue].get(k, 0)
+
+        ex  = tp["ex_rx"].v
+        lag = probe.lag
+        t2o = [x for x, _ in probe.orders.v]
+        t2a = [x for _, x in probe.orders.v]
+        fh  = tp["fill_hedge_ack"].v
+        r = {"target":     rate,
+             "sent":       (d("upbit", "frames") + d("binanceusdm", "frames")) / dt,
+             "ticks":      len(tp["rx_decode"].v) / dt,
+             "ex_rx":      [pct(ex, .5), pct(ex, .99)],
+             "t2order":    [pct(t2o, .5), pct(t2o, .99)],
+             "t2ack":      [pct(t2a, .5), pct(t2a, .99)],
+             "fill_hedge": [pct(fh, .5), pct(fh, .99)],
+             "orders_s":   d("upbit", "orders") / dt,
+             "fills_s":    d("upbit", "fills") / dt,
+             "cancels_s":  d("upbit", "cancels") / dt,
+             "hedges_s":   d("binanceusdm", "orders") / dt,
+             "r429":       d("upbit", "r429") + d("binanceusdm", "r429"),
+             "err":        d("upbit", "err") + d("binanceusdm", "err"),
+             "queue":      dict(probe.q),
+             "lag_p99":    pct(lag, .99),
+             "rss_mb":     probe.rss[-1][1] if probe.rss else 0.0,
+             "rss_mb_min": _slope(probe.rss),
+             "paused":     probe.paused > 0}
+        inproc  = self.cfg.runtime.feeds != "process"
+        r["ok"] = (r["sent"] >= 0.97 * rate and r["lag_p99"] <= a.max_lag
+                   and (not inproc or (r["ticks"] >= 0.97 * r["sent"]
+                                       and r["ex_rx"][1] <= a.max_lag)))
+        return r
+
+    async def run(self) -> list[dict]:
+        a = self.a
+        self.http = aiohttp.ClientSession()
+        listener  = setup_logging(a.log_level, self.cfg.log)
+        logging.getLogger("ccxt.base.exchange").setLevel(logging.INFO)
+        probe = Probe(self.cfg, listener)
+        rates = [float(x) for x in a.ramp.split(",")] if a.ramp else [a.rate]
+        out   = []
+        try:
+            await self._ready()
+            await self.set_rate(rates[0])
+            task = asyncio.create_task(bot.main(self.cfg))
+            pt   = asyncio.create_task(probe.run())
+            t0   = time.monotonic()
+            while not startup.quoted and time.monotonic() - t0 < a.warmup and not task.done():
+                await asyncio.sleep(0.1)
+            if task.done():
+                task.result()               # 기동 실패 – 예외 그대로
+            print(f"# first quote {'%.2f s' % (time.monotonic() - t0) if startup.quoted else 'none'}",
+                  flush=True)
+            print(HEADER, flush=True)
+            for rate in rates:
+                r = await self.step(probe, rate)
+                out.append(r)
+                print(row(r), flush=True)
+                if a.ramp and not r["ok"] and not a.no_stop:
+                    break
+            pt.cancel()
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        finally:
+            await self.http.close()
+            if listener:
+                listener.stop()
+        return out
+
+
+HEADER = ("#  target    sent   ticks |  ex_rx p50/p99 |  t→order p50/p99 |    t→ack p50/p99 |"
+          " fill→hedge p50/p99 | ord/s fill/s hdg/s 429 err | q ord/fill/log |  lag p99 |"
+          "  rss MB  MB/min | ok")
+
+
+def row(r: dict) -> str:
+    q = r["queue"]
+    return (f"{r['target']:8.0f} {r['sent']:7.0f} {r['ticks']:7.0f} |"
+            f" {r['ex_rx'][0]:6.2f} {r['ex_rx'][1]:7.2f} |"
+            f" {r['t2order'][0]:7.2f} {r['t2order'][1]:8.2f} |"
+            f" {r['t2ack'][0]:7.2f} {r['t2ack'][1]:8.2f} |"
+            f" {r['fill_hedge'][0]:8.2f} {r['fill_hedge'][1]:9.2f} |"
+            f" {r['orders_s']:5.1f} {r['fills_s']:6.1f} {r['hedges_s']:5.1f}"
+            f" {r['r429']:3d} {r['err']:3d} |"
+            f" {q['ord']:4.0f} {q['fill']:4.0f} {q['log']:5.0f} | {r['lag_p99']:8.2f} |"
+            f" {r['rss_mb']:7.1f} {r['rss_mb_min']:7.2f} |"
+            f" {'yes' if r['ok'] else 'NO'}{' (paused)' if r['paused'] else ''}")
+
+
+def _cli():
+    ap = argparse.ArgumentParser(description="end-to-end load test against a local mock exchange")
+    ap.add_argument("-c", "--config", default="config.yaml")
+    ap.add_argument("--rate", type=float, default=500, help="시세 프레임/s (두 venue 합)")
+    ap.add_argument("--sec", type=float, default=60, help="단일 rate 측정 시간")
+    ap.add_argument("--ramp", help="rate 목록 (예: 250,500,1000) – 실패할 때까지 올린다")
+    ap.add_argument("--step-sec", type=float, default=20, help="ramp 단계별 측정 시간")
+    ap.add_argument("--no-stop", action="store_true", help="ramp 에서 실패해도 끝까지")
+    ap.add_argument("--settle", type=float, default=3, help="rate 변경 후 측정 전 대기 (초)")
+    ap.add_argument("--warmup", type=float, default=20, help="첫 호가 대기 상한 (초)")
+    ap.add_argument("--spot-share", type=float, default=0.5, help="rate 중 Upbit 비중")
+    ap.add_argument("--burst", help="주기,길이,배수 (초, 초, ×) – 예: 10,1,5")
+    ap.add_argument("--lat", default="20,0.5", help="REST 지연 중앙값 ms,σ (lognormal)")
+    ap.add_argument("--errors", type=float, default=0.0, help="REST 500 확률")
+    ap.add_argument("--http429", type=float, default=0.0, help="한도와 무관한 429 확률")
+    ap.add_argument("--ws-lag", type=float, default=0.0, help="거래소 시각 지연 (ms)")
+    ap.add_argument("--fill-prob", type=float, default=0.5, help="상대 호가를 넘은 주문의 체결 확률")
+    ap.add_argument("--max-lag", type=float, default=50, help="지속 가능 판정 p99 한도 (ms)")
+    ap.add_argument("--set", action="append", default=[], help="봇 설정 key=value (JSON 값)")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=18181, help="Upbit mock (Binance 는 +1)")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--log-level", default="WARNING")
+    ap.add_argument("--json", help="결과 JSON 파일")
+    a = ap.parse_args()
+    if not a.ramp:
+        a.step_sec = a.sec
+
+    sets = {}
+    for s in a.set:
+        k, _, v = s.partition("=")
+        try:
+            sets[k] = json.loads(v)
+        except ValueError:
+            sets[k] = v
+    ports = {"upbit": a.port, "binanceusdm": a.port + 1}
+    cfg   = bot_config(Path(a.config).resolve(), a.host, ports, sets)
+    mcfg  = mock_config(cfg, a)
+
+    proc = mp.get_context("spawn").Process(target=mockex.serve, args=(mcfg, cfg.runtime.uvloop),
+                                           daemon=True, name="mockex")
+    proc.start()
+    cwd = os.getcwd()
+    os.chdir(workdir(cfg))
+    try:
+        res = run_loop(Harness(a, cfg, mcfg).run(), cfg.runtime.uvloop)
+    finally:
+        os.chdir(cwd)
+        proc.terminate()
+        proc.join(5)
+
+    if a.ramp:
+        ok = [r["target"] for r in res if r["ok"]]
+        print(f"# max sustainable rate: {max(ok):.0f} frames/s" if ok else
+              "# max sustainable rate: none (첫 단계부터 실패)")
+    if a.json:
+        Path(a.json).write_text(json.dumps(res, indent=1))
+
+
+if __name__ == "__main__":
+    sys.exit(_cli())
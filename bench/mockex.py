@@ -0,0 +1,694 @@
+# bench/mockex.py
+"""
+부하 시험용 로컬 모의 거래소 – Upbit 현물 + Binance USD-M (bench/loadtest.py 가 자식 프로세스로 띄운다).
+
+  python -m bench.mockex --rate 1000                 # 단독 실행 (config.yaml 의 rest_url / ws_url 을 여기로)
+
+  WS   Upbit   /websocket/v1           orderbook (SIMPLE / DEFAULT) + 환율 ticker
+       Upbit   /websocket/v1/private   myOrder push (체결 / 취소)
+       Binance /stream?streams=…       bookTicker (combined stream)
+  REST ccxt 가 실제로 부르는 경로만 – 주문 / 취소 / 조회 / 잔고 / 포지션 / ticker / time / leverage
+  시세 venue 별 초당 rate 프레임 (burst 구간은 × 배수). 헷지 mid 는 random walk,
+       spot = 1 / mid × (1 + premium) – premium 이 ±band 를 오가서 호가 / 취소 / 체결이 계속 생긴다
+  체결 상대 호가를 넘는 지정가는 fill_prob 확률로 fill_delay_ms 뒤 체결 (partial 확률로 절반씩),
+       아니면 걸어 두고 다음 시세에서 다시 본다. Binance 시장가는 즉시 체결.
+  REST 응답 지연 lognormal(lat_ms 중앙값, lat_sigma), error_rate 로 500,
+       group 별 초당 한도(rps) 초과 또는 http429 확률로 429 + Retry-After.
+       Upbit Remaining-Req / Binance X-MBX-* 헤더도 붙인다 (core/ratelimit.py 가 읽는다)
+  제어 POST /_mock/cfg  {"upbit": {"rate": 2000}, …}  (ramp)
+       GET  /_mock/stats 보낸 프레임 / 요청 / 오류 / 429 / 주문 / 체결 / 취소 누계
+
+시세 프레임은 봇이 못 받으면 (TCP 버퍼가 차면) 보내는 쪽이 기다린다 – 못 보낸 만큼은 버리고 frames 에 안 센다.
+"""
+import argparse, asyncio, collections, itertools, json, logging, math, random, time, uuid, zlib
+from urllib.parse import parse_qsl
+
+from aiohttp import web
+
+from core.feedproc import run_loop
+
+VENUE = {
+    "port":       0,
+    "rate":       250.0,            # 초당 시세 프레임 (pair 합)
+    "burst":      [0, 0, 1],        # [주기 초, 길이 초, 배수] – 주기 0 = 끔
+    "lat_ms":     20.0,             # REST 응답 지연 중앙값 (0 = 즉시)
+    "lat_sigma":  0.5,              # lognormal σ
+    "error_rate": 0.0,              # 500 응답 확률
+    "http429":    0.0,              # 한도와 무관한 429 확률
+    "ws_lag_ms":  0.0,              # 이벤트 시각(tms / E) 을 이만큼 과거로 – ex_rx / liveness
+}
+
+DEFAULTS = {
+    "host":  "127.0.0.1",
+    "seed":  7,
+    "band":  0.005,                 # 전략 bp_threshold / 100 – premium 진폭 기준
+    "prem_sd":  1.0,                # premium 정상 분포 표준편차 (band 배수)
+    "prem_rev": 2.0,                # 초당 평균 회귀 – 가격 과정은 시간 기준이라 rate 와 무관
+    "vol":   2e-4,                  # 헷지 mid 변동 (√초당)
+    "fx":    1400.0,                # KRW-USDT
+    "pairs": [{"code": "USDT-BTC", "market": "BTC-USDT", "symbol": "BTCUSDT", "mid": 60000.0}],
+    "upbit": {**VENUE, "port": 18181, "rps": {"order": 8, "default": 30},
+              "fill_prob": 0.5, "fill_delay_ms": 5.0, "partial": 0.2},
+    "binanceusdm": {**VENUE, "port": 18182, "rps": {"order": 20, "default": 40}},
+}
+
+SPOT_TICK, HEDGE_TICK = 1e-10, 0.1
+KEEP_CLOSED = 200                   # 조회용으로 남기는 종료 주문 수
+
+log = logging.getLogger("MockEx")
+
+
+def merge(base: dict, over: dict) -> dict:
+    """dict 깊은 병합 (over 우선, base 는 그대로)"""
+    out = dict(base)
+    for k, v in over.items():
+        out[k] = merge(out[k], v) if isinstance(v, dict) and isinstance(out.get(k), dict) else v
+    return out
+
+
+def _ms() -> int:
+    return int(time.time() * 1000)
+
+
+# ────────────────────────────── 시세
+class Book:
+    __slots__ = ("code", "market", "symbol", "mid", "prem", "u", "orders", "t_h", "t_s")
+
+    def __init__(self, p: dict):
+        self.code, self.market, self.symbol = p["code"], p["market"], p["symbol"]
+        self.mid    = float(p.get("mid", 60000.0))
+        self.prem   = 0.0
+        self.u      = 0                 # bookTicker update id
+        self.orders = []                # 걸려 있는 spot 주문
+        self.t_h = self.t_s = time.monotonic()      # 마지막 헷지 / spot 갱신
+
+    # 헷지 1 tick 스프레드, spot 은 2 bp
+    def hedge(self) -> tuple[float, float]:
+        b = math.floor(self.mid / HEDGE_TICK) * HEDGE_TICK
+        return b, b + HEDGE_TICK
+
+    def spot(self) -> tuple[float, float]:
+        m = (1 / self.mid) * (1 + self.prem)
+        return (math.floor(m * 0.9999 / SPOT_TICK) * SPOT_TICK,
+                math.ceil(m * 1.0001 / SPOT_TICK) * SPOT_TICK)
+
+
+class Market:
+    def __init__(self, cfg: dict):
+        self.cfg   = cfg
+        self.rnd   = random.Random(cfg["seed"])
+        self.books = [Book(p) for p in cfg["pairs"]]
+        self.by_code   = {b.code: b for b in self.books}
+        self.by_market = {b.market: b for b in self.books}
+        self.by_symbol = {b.symbol: b for b in self.books}
+        self.fx    = float(cfg["fx"])
+
+    def step_hedge(self, b: Book):
+        t, dt = time.monotonic(), time.monotonic() - b.t_h
+        b.t_h  = t
+        b.mid *= 1 + self.rnd.gauss(0, self.cfg["vol"] * math.sqrt(dt))
+        b.u   += 1
+
+    def step_spot(self, b: Book):
+        c  = self.cfg
+        t  = time.monotonic()
+        kd = min(1.0, c["prem_rev"] * (t - b.t_s))  # OU – 정상 σ = prem_sd × band
+        b.t_s = t
+        b.prem += -kd * b.prem + self.rnd.gauss(0, c["prem_sd"] * c["band"] * math.sqrt(2 * kd))
+
+
+# ────────────────────────────── venue 공통 (REST 게이트 / 시세 펌프)
+class _Bucket:
+    __slots__ = ("rate", "tokens", "t")
+
+    def __init__(self, rate: float):
+        self.rate, self.tokens, self.t = rate, rate, time.monotonic()
+
+    def take(self) -> int | None:
+        """남은 토큰 (꺼낸 뒤), 없으면 -1 – rate 0 이면 무제한 (None)"""
+        if not self.rate:
+            return None
+        t = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (t - self.t) * self.rate)
+        self.t = t
+        if self.tokens < 1:
+            return -1
+        self.tokens -= 1
+        return int(self.tokens)
+
+
+class MockVenue:
+    NAME = ""
+
+    def __init__(self, cfg: dict, market: Market):
+        self.market = market
+        self.rnd    = random.Random(cfg["seed"] + zlib.crc32(self.NAME.encode()))
+        self.n      = collections.Counter()     # frames / req / err / r429 / orders / fills / cancels
+        self.subs   = []                        # 시세 WS [(ws, 키 set)]
+        self._bg    = set()
+        self.configure(cfg[self.NAME])
+
+    def configure(self, c: dict):
+        self.cfg     = c
+        self.buckets = {g: _Bucket(r) for g, r in c.get("rps", {}).items()}
+
+    def rate(self, t: float) -> float:
+        every, length, mult = self.cfg["burst"]
+        r = self.cfg["rate"]
+        return r * mult if every and t % every < length else r
+
+    def spawn(self, coro):
+        t = asyncio.create_task(coro)
+        self._bg.add(t)
+        t.add_done_callback(self._bg.discard)
+
+    # ── REST
+    def group(self, req) -> str:
+        return "order" if req.method == "POST" and "order" in req.path.lower() else "default"
+
+    async def gate(self, req) -> tuple[web.Response | None, int | None]:
+        """지연 → 한도 / 429 / 500 주입. (오류 응답 | None, 남은 토큰 | None = 무제한)"""
+        c = self.cfg
+        self.n["req"] += 1
+        if c["lat_ms"]:
+            await asyncio.sleep(self.rnd.lognormvariate(math.log(c["lat_ms"]), c["lat_sigma"]) / 1000)
+        g   = self.group(req)
+        rem = self.buckets[g].take() if g in self.buckets else None
+        if (rem is not None and rem < 0) or self.rnd.random() < c["http429"]:
+            self.n["r429"] += 1
+            return self.too_many(g), 0
+        if self.rnd.random() < c["error_rate"]:
+            self.n["err"] += 1
+            return web.Response(status=500, text="mock internal error"), rem
+        return None, rem
+
+    def too_many(self, group: str) -> web.Response:
+        raise NotImplementedError
+
+    def reply(self, data, rem: int | None, group: str, status: int = 200) -> web.Response:
+        return web.json_response(data, status=status)
+
+    def handler(self, fn):
+        async def h(req):
+            err, rem = await self.gate(req)
+            if err is not None:
+                return err
+            status, data = await fn(req)
+            return self.reply(data, rem, self.group(req), status)
+        return h
+
+    # ── 시세
+    def frame(self, b: Book, sub) -> str:
+        raise NotImplementedError
+
+    def step(self, b: Book):
+        raise NotImplementedError
+
+    async def pump(self):
+        """rate(t) 만큼 프레임 – 봇이 못 받아 밀린 만큼은 100 ms 넘게 쌓지 않고 버린다"""
+        loop, rr = asyncio.get_running_loop(), itertools.cycle(self.market.books)
+        t, credit = loop.time(), 0.0
+        while True:
+            await asyncio.sleep(0.001)
+            now = loop.time()
+            r   = self.rate(now)
+            credit = min(credit + (now - t) * r, max(1.0, r * 0.1))
+            t = now
+            n = int(credit)
+            credit -= n
+            for _ in range(n):
+                b = next(rr)
+                self.step(b)
+                for ws, keys, sub in list(self.subs):
+                    if b.code in keys or b.symbol in keys:
+                        try:
+                            await ws.send_str(self.frame(b, sub))
+                        except Exception:
+                            pass                # 끊긴 소켓 – ws 핸들러가 정리
+                self.n["frames"] += 1
+
+    async def _hold(self, ws, entry):
+        self.subs.append(entry)
+        try:
+            async for _ in ws:                  # 끊길 때까지 (ping / pong 은 aiohttp 가)
+                pass
+        finally:
+            self.subs.remove(entry)
+
+
+# ────────────────────────────── Upbit
+class _Order:
+    __slots__ = ("uuid", "cid", "book", "side", "price", "volume", "executed", "state",
+                 "ioc", "created")
+
+    def __init__(self, book, side, price, volume, cid, ioc):
+        self.uuid, self.cid, self.book = str(uuid.uuid4()), cid, book
+        self.side, self.price, self.volume = side, price, volume
+        self.executed, self.state, self.ioc = 0.0, "wait", ioc
+        self.created = time.strftime("%Y-%m-%dT%H:%M:%S+09:00")
+
+    def json(self) -> dict:
+        return {"uuid": self.uuid, "side": self.side, "ord_type": "limit",
+                "price": f"{self.price:.10f}", "state": self.state, "market": self.book.market,
+                "created_at": self.created, "volume": f"{self.volume:.8f}",
+                "remaining_volume": f"{self.volume - self.executed:.8f}",
+                "reserved_fee": "0", "remaining_fee": "0", "paid_fee": "0", "locked": "0",
+                "executed_volume": f"{self.executed:.8f}", "trades_count": int(self.executed > 0),
+                "identifier": self.cid, "time_in_force": "ioc" if self.ioc else None}
+
+
+class UpbitMock(MockVenue):
+    NAME = "upbit"
+
+    def __init__(self, cfg, market):
+        super().__init__(cfg, market)
+        self.priv   = []                    # private WS
+        self.orders = {}                    # uuid → 미체결
+        self.closed = collections.deque(maxlen=KEEP_CLOSED)
+        self.byid   = {}                    # uuid / identifier → _Order (최근 것만)
+        self.bal    = collections.defaultdict(float)
+
+    def routes(self, app):
+        r = app.router
+        r.add_get("/websocket/v1", self.ws_public)
+        r.add_get("/websocket/v1/private", self.ws_private)
+        r.add_post("/v1/orders", self.handler(self.create))
+        r.add_delete("/v1/order", self.handler(self.cancel))
+        r.add_get("/v1/order", self.handler(self.get))
+        r.add_get("/v1/orders/open", self.handler(self.open))
+        r.add_get("/v1/orders/closed", self.handler(self.closed_list))
+        r.add_get("/v1/accounts", self.handler(self.accounts))
+        r.add_get("/v1/ticker", self.handler(self.ticker))
+
+    def group(self, req) -> str:            # core/ratelimit.classify 와 같은 분류
+        if req.path.startswith("/v1/ticker"):
+            return "ticker" if "ticker" in self.buckets else "default"
+        return super().group(req)
+
+    def too_many(self, group):
+        return web.Response(status=429, text="Too many API requests.",
+                            headers={"Remaining-Req": f"group={group}; min=0; sec=0"})
+
+    def reply(self, data, rem, group, status=200):
+        h = {} if rem is None else {"Remaining-Req": f"group={group}; min=1800; sec={rem}"}
+        return web.json_response(data, status=status, headers=h)
+
+    @staticmethod
+    def _err(status: int, name: str, msg: str):
+        return status, {"error": {"name": name, "message": msg}}
+
+    # ── 시세
+    def step(self, b):
+        self.market.step_spot(b)
+        if b.orders:
+            self._cross(b)
+
+    def frame(self, b, sub):
+        bid, ask = b.spot()
+        ts = _ms() - int(self.cfg["ws_lag_ms"])
+        if sub["simple"]:
+            return (f'{{"ty":"orderbook","cd":"{b.code}","tms":{ts},"tas":1000.0,"tbs":1000.0,'
+                    f'"obu":[{{"ap":{ask:.10f},"as":500.0,"bp":{bid:.10f},"bs":500.0}}],'
+                    f'"st":"REALTIME","lv":0}}')
+        return (f'{{"type":"orderbook","code":"{b.code}","timestamp":{ts},'
+                f'"total_ask_size":1000.0,"total_bid_size":1000.0,'
+                f'"orderbook_units":[{{"ask_price":{ask:.10f},"bid_price":{bid:.10f},'
+                f'"ask_size":500.0,"bid_size":500.0}}],"stream_type":"REALTIME","level":0}}')
+
+    def fx_frame(self, code, sub) -> str:
+        ts = _ms() - int(self.cfg["ws_lag_ms"])
+        if sub["simple"]:
+            return f'{{"ty":"ticker","cd":"{code}","tp":{self.market.fx},"tms":{ts},"st":"REALTIME"}}'
+        return (f'{{"type":"ticker","code":"{code}","trade_price":{self.market.fx},'
+                f'"timestamp":{ts},"stream_type":"REALTIME"}}')
+
+    async def fx_pump(self):
+        while True:
+            await asyncio.sleep(1)
+            for ws, _, sub in list(self.subs):
+                for code in sub["fx"]:
+                    try:
+                        await ws.send_str(self.fx_frame(code, sub))
+                    except Exception:
+                        pass
+
+    async def ws_public(self, req):
+        ws = web.WebSocketResponse()
+        await ws.prepare(req)
+        msg  = json.loads(await ws.receive_str())
+        sub  = {"simple": any(m.get("format") == "SIMPLE" for m in msg), "fx": []}
+        keys = set()
+        for m in msg:
+            if m.get("type") == "orderbook":
+                keys.update(m.get("codes", ()))
+            elif m.get("type") == "ticker":
+                sub["fx"] += m.get("codes", [])
+        for code in sub["fx"]:
+            await ws.send_str(self.fx_frame(code, sub))
+        await self._hold(ws, (ws, keys, sub))
+        return ws
+
+    async def ws_private(self, req):
+        ws = web.WebSocketResponse()
+        await ws.prepare(req)
+        await ws.receive_str()              # myOrder / myAsset 구독 – 모든 주문을 보낸다
+        self.priv.append(ws)
+        try:
+            async for _ in ws:
+                pass
+        finally:
+            self.priv.remove(ws)
+        return ws
+
+    async def _push(self, o: _Order):
+        j = json.dumps({"type": "myOrder", "code": o.book.market, "uuid": o.uuid,
+                        "ask_bid": "BID" if o.side == "bid" else "ASK", "order_type": "limit",
+                        "state": o.state if o.state != "wait" else "trade",
+                        "price": o.price, "volume": o.volume,
+                        "remaining_volume": o.volume - o.executed,
+                        "executed_volume": o.executed, "identifier": o.cid,
+                        "timestamp": _ms(), "stream_type": "REALTIME"})
+        for ws in list(self.priv):
+            try:
+                await ws.send_str(j)
+            except Exception:
+                pass
+
+    # ── 체결
+    def _marketable(self, o: _Order) -> bool:
+        bid, ask = o.book.spot()
+        return o.price >= ask if o.side == "bid" else o.price <= bid
+
+    def _cross(self, b: Book):
+        c = self.cfg
+        for o in list(b.orders):
+            if o.state == "wait" and self._marketable(o) and self.rnd.random() < c["fill_prob"]:
+                q = o.volume - o.executed
+                if self.rnd.random() < c["partial"]:
+                    q = round(q / 2, 8) or q
+                self.spawn(self._fill(o, q, c["fill_delay_ms"]))
+
+    async def _fill(self, o: _Order, qty: float, delay_ms: float):
+        if delay_ms:
+            await asyncio.sleep(self.rnd.expovariate(1 / delay_ms) / 1000)
+        if o.state != "wait":
+            return
+        qty = min(qty, o.volume - o.executed)
+        o.executed = round(o.executed + qty, 8)
+        base, quote = o.book.market.split("-")[1], o.book.market.split("-")[0]
+        d = qty if o.side == "bid" else -qty
+        self.bal[base]  += d
+        self.bal[quote] -= d * o.price
+        self.n["fills"] += 1
+        if o.volume - o.executed < 1e-9:
+            self._close(o, "done")
+        await self._push(o)
+
+    def _close(self, o: _Order, state: str):
+        o.state = state
+        self.orders.pop(o.uuid, None)
+        if o in o.book.orders:
+            o.book.orders.remove(o)
+        self.closed.append(o)
+        if len(self.byid) > 4 * KEEP_CLOSED + len(self.orders):    # 오래된 종료 주문은 잊는다
+            live = {x.uuid for x in self.closed} | set(self.orders)
+            self.byid = {k: v for k, v in self.byid.items() if v.uuid in live}
+
+    # ── REST
+    async def create(self, req):
+        j = await req.json()
+        b = self.market.by_market.get(j.get("market"))
+        if b is None:
+            return self._err(404, "market_does_not_exist", "마켓이 없습니다.")
+        ioc = j.get("time_in_force") == "ioc"
+        o   = _Order(b, j["side"], float(j.get("price") or 0), float(j.get("volume") or 0),
+                     j.get("identifier"), ioc)
+        self.n["orders"] += 1
+        self.orders[o.uuid] = self.byid[o.uuid] = o
+        if o.cid:
+            self.byid[o.cid] = o
+        b.orders.append(o)
+        out = o.json()
+        if ioc:                             # 즉시 체결 가능한 만큼만, 나머지 취소
+            if self._marketable(o):
+                await self._fill(o, o.volume, 0)
+            if o.state == "wait":
+                self._close(o, "cancel")
+                self.spawn(self._push(o))
+            out = o.json()
+        elif self._marketable(o) and self.rnd.random() < self.cfg["fill_prob"]:
+            self.spawn(self._fill(o, o.volume, self.cfg["fill_delay_ms"]))
+        return 201, out
+
+    async def cancel(self, req):
+        o = self.byid.get(req.query.get("uuid") or req.query.get("identifier"))
+        if o is None or o.state != "wait":
+            return self._err(404, "order_not_found", "주문을 찾지 못했습니다.")
+        self._close(o, "cancel")
+        self.n["cancels"] += 1
+        self.spawn(self._push(o))
+        return 200, o.json()
+
+    async def get(self, req):
+        o = self.byid.get(req.query.get("uuid") or req.query.get("identifier"))
+        if o is None:
+            return self._err(404, "order_not_found", "주문을 찾지 못했습니다.")
+        return 200, o.json()
+
+    async def open(self, req):
+        m, n = req.query.get("market"), int(req.query.get("limit", 100))
+        return 200, [o.json() for o in self.orders.values()
+                     if not m or o.book.market == m][:n]
+
+    async def closed_list(self, req):
+        m, n = req.query.get("market"), int(req.query.get("limit", 100))
+        st = req.query.get("state")
+        return 200, [o.json() for o in reversed(self.closed)
+                     if (not m or o.book.market == m) and (not st or o.state == st)][:n]
+
+    async def accounts(self, req):
+        return 200, [{"currency": c, "balance": f"{v:.8f}", "locked": "0",
+                      "avg_buy_price": "0", "avg_buy_price_modified": False,
+                      "unit_currency": "KRW"} for c, v in self.bal.items()]
+
+    async def ticker(self, req):
+        out = []
+        for m in req.query.get("markets", "").split(","):
+            b = self.market.by_market.get(m)
+            px = sum(b.spot()) / 2 if b else self.market.fx if m == "KRW-USDT" else 1.0
+            out.append({"market": m, "trade_price": px, "timestamp": _ms(),
+                        "trade_timestamp": _ms(), "acc_trade_volume_24h": 0})
+        return 200, out
+
+
+# ────────────────────────────── Binance USD-M
+class BinanceMock(MockVenue):
+    NAME = "binanceusdm"
+
+    def __init__(self, cfg, market):
+        super().__init__(cfg, market)
+        self.pos  = collections.defaultdict(float)      # symbol → 포지션 (BTC)
+        self.oid  = itertools.count(1)
+        self._w   = [0, 0]                              # [분, 이번 분 요청 수] – X-MBX-USED-WEIGHT-1M
+        self._o   = [0, 0]                              # [10 초, 주문 수]
+        self.byc  = collections.OrderedDict()           # clientOrderId → 주문 (최근 KEEP_CLOSED 건)
+
+    def routes(self, app):
+        r = app.router
+        r.add_get("/stream", self.ws_stream)
+        r.add_get("/fapi/v1/ping", self.handler(self.ping))
+        r.add_get("/fapi/v1/time", self.handler(self.time))
+        r.add_get("/fapi/v1/ticker/24hr", self.handler(self.ticker))
+        r.add_get("/fapi/v1/leverageBracket", self.handler(self.brackets))
+        r.add_get("/fapi/v2/positionRisk", self.handler(self.positions))
+        r.add_get("/fapi/v3/positionRisk", self.handler(self.positions))
+        r.add_post("/fapi/v1/order", self.handler(self.order))
+        r.add_get("/fapi/v1/order", self.handler(self.query))
+        r.add_post("/fapi/v1/batchOrders", self.handler(self.batch))
+        r.add_post("/fapi/v1/leverage", self.handler(self.leverage))
+
+    def too_many(self, group):
+        return web.json_response({"code": -1003, "msg": "Too many requests (mock)."},
+                                 status=429, headers={"Retry-After": "1"})
+
+    def reply(self, data, rem, group, status=200):
+        t = int(time.time())
+        if self._w[0] != t // 60:
+            self._w = [t // 60, 0]
+        self._w[1] += 1
+        h = {"X-MBX-USED-WEIGHT-1M": str(self._w[1])}
+        if group == "order":
+            if self._o[0] != t // 10:
+                self._o = [t // 10, 0]
+            self._o[1] += 1
+            h["X-MBX-ORDER-COUNT-10S"] = str(self._o[1])
+        return web.json_response(data, status=status, headers=h)
+
+    @staticmethod
+    async def _params(req) -> dict:
+        return {**req.query, **dict(parse_qsl(await req.text()))}
+
+    # ── 시세
+    def step(self, b):
+        self.market.step_hedge(b)
+
+    def frame(self, b, sub):
+        bid, ask = b.hedge()
+        ts = _ms() - int(self.cfg["ws_lag_ms"])
+        return (f'{{"stream":"{b.symbol.lower()}@bookTicker","data":{{"e":"bookTicker",'
+                f'"u":{b.u},"s":"{b.symbol}","b":"{bid:.1f}","B":"5.000","a":"{ask:.1f}",'
+                f'"A":"5.000","T":{ts},"E":{ts}}}}}')
+
+    async def ws_stream(self, req):
+        ws = web.WebSocketResponse()
+        await ws.prepare(req)
+        keys = {s.split("@")[0].upper() for s in req.query.get("streams", "").split("/")
+                if s.endswith("@bookTicker")}
+        await self._hold(ws, (ws, keys, None))
+        return ws
+
+    # ── REST
+    async def ping(self, req):
+        return 200, {}
+
+    async def time(self, req):
+        return 200, {"serverTime": _ms()}
+
+    async def ticker(self, req):
+        b = self.market.by_symbol.get(req.query.get("symbol"))
+        if b is None:
+            return 400, {"code": -1121, "msg": "Invalid symbol."}
+        px = f"{sum(b.hedge()) / 2:.1f}"
+        return 200, {"symbol": b.symbol, "lastPrice": px, "openPrice": px, "highPrice": px,
+                     "lowPrice": px, "volume": "0", "quoteVolume": "0", "priceChange": "0",
+                     "priceChangePercent": "0", "weightedAvgPrice": px,
+                     "openTime": _ms() - 86400000, "closeTime": _ms(), "count": 0}
+
+    async def brackets(self, req):
+        return 200, [{"symbol": b.symbol, "brackets": [
+            {"bracket": 1, "initialLeverage": 125, "notionalCap": 1e12, "notionalFloor": 0,
+             "maintMarginRatio": 0.004, "cum": 0}]} for b in self.market.books]
+
+    async def positions(self, req):
+        out = []
+        for b in self.market.books:
+            q = self.pos[b.symbol]
+            px = sum(b.hedge()) / 2
+            out.append({"symbol": b.symbol, "positionSide": "BOTH", "positionAmt": f"{q:.3f}",
+                        "entryPrice": f"{px:.1f}", "breakEvenPrice": "0", "markPrice": f"{px:.1f}",
+                        "unRealizedProfit": "0", "liquidationPrice": "0", "isolatedMargin": "0",
+                        "notional": f"{q * px:.2f}", "marginAsset": "USDT", "isolatedWallet": "0",
+                        "initialMargin": "0", "maintMargin": "0", "positionInitialMargin": "0",
+                        "openOrderInitialMargin": "0", "adl": 0, "bidNotional": "0",
+                        "askNotional": "0", "updateTime": _ms(), "leverage": "20",
+                        "marginType": "cross"})
+        return 200, out
+
+    async def leverage(self, req):
+        p = await self._params(req)
+        return 200, {"leverage": int(p.get("leverage", 1)), "symbol": p.get("symbol"),
+                     "maxNotionalValue": "1000000000"}
+
+    def _fill(self, p: dict) -> dict:
+        b = self.market.by_symbol.get(p.get("symbol"))
+        if b is None:
+            return {"code": -1121, "msg": "Invalid symbol."}
+        q    = float(p.get("quantity") or 0)
+        side = p.get("side", "BUY").upper()
+        bid, ask = b.hedge()
+        px   = ask if side == "BUY" else bid
+        self.pos[b.symbol] += q if side == "BUY" else -q
+        self.n["orders"] += 1
+        self.n["fills"]  += 1
+        cid = p.get("newClientOrderId") or f"mock-{uuid.uuid4().hex[:16]}"
+        o   = self.byc[cid] = {"orderId": next(self.oid), "symbol": b.symbol, "status": "FILLED",
+                               "clientOrderId": cid,
+                               "price": "0", "avgPrice": f"{px:.1f}", "origQty": f"{q:.3f}",
+                               "executedQty": f"{q:.3f}", "cumQuote": f"{q * px:.4f}", "timeInForce": "GTC",
+                               "type": p.get("type", "MARKET"), "reduceOnly": p.get("reduceOnly") == "true",
+                               "closePosition": False, "side": side, "positionSide": "BOTH",
+                               "stopPrice": "0", "workingType": "CONTRACT_PRICE", "priceProtect": False,
+                               "origType": p.get("type", "MARKET"), "updateTime": _ms()}
+        while len(self.byc) > KEEP_CLOSED:
+            self.byc.popitem(last=False)
+        return o
+
+    async def query(self, req):
+        """GET /fapi/v1/order?origClientOrderId= – 응답을 못 받은 헷지 주문 확인 (HedgeAggregator)"""
+        o = self.byc.get(req.query.get("origClientOrderId"))
+        return (200, o) if o else (400, {"code": -2013, "msg": "Order does not exist."})
+
+    async def order(self, req):
+        r = self._fill(await self._params(req))
+        return (400 if "code" in r else 200), r
+
+    async def batch(self, req):
+        p = await self._params(req)
+        return 200, [self._fill(o) for o in json.loads(p.get("batchOrders", "[]"))]
+
+
+# ────────────────────────────── 서버
+class MockExchange:
+    def __init__(self, cfg: dict):
+        self.cfg    = merge(DEFAULTS, cfg)
+        self.market = Market(self.cfg)
+        self.venues = {v.NAME: v for v in (UpbitMock(self.cfg, self.market),
+                                           BinanceMock(self.cfg, self.market))}
+        self.t0     = time.time()
+
+    async def set_cfg(self, req):
+        over = await req.json()
+        for name, c in over.items():
+            if name in self.venues:
+                self.cfg[name] = merge(self.cfg[name], c)
+                self.venues[name].configure(self.cfg[name])
+        return web.json_response({k: self.cfg[k] for k in self.venues})
+
+    async def stats(self, req):
+        return web.json_response({"t": time.time() - self.t0,
+                                  **{k: dict(v.n) for k, v in self.venues.items()}})
+
+    async def serve(self):
+        runners = []
+        for name, v in self.venues.items():
+            app = web.Application()
+            v.routes(app)
+            app.router.add_post("/_mock/cfg", self.set_cfg)
+            app.router.add_get("/_mock/stats", self.stats)
+            runner = web.AppRunner(app, access_log=None)
+            await runner.setup()
+            await web.TCPSite(runner, self.cfg["host"], self.cfg[name]["port"]).start()
+            runners.append(runner)
+            log.info("%s mock on http://%s:%d", name, self.cfg["host"], self.cfg[name]["port"])
+        tasks = [asyncio.create_task(v.pump()) for v in self.venues.values()]
+        tasks.append(asyncio.create_task(self.venues["upbit"].fx_pump()))
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for r in runners:
+                await r.cleanup()
+
+
+def serve(cfg: dict, use_uvloop: bool = False):
+    """자식 프로세스 진입점 (bench/loadtest.py)"""
+    logging.basicConfig(level="WARNING", format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    run_loop(MockExchange(cfg).serve(), use_uvloop)
+
+
+def _cli():
+    ap = argparse.ArgumentParser(description="local mock exchange (Upbit spot + Binance USD-M)")
+    ap.add_argument("--rate", type=float, default=None, help="venue 별 초당 시세 프레임")
+    ap.add_argument("--upbit-port", type=int, default=DEFAULTS["upbit"]["port"])
+    ap.add_argument("--binance-port", type=int, default=DEFAULTS["binanceusdm"]["port"])
+    ap.add_argument("--cfg", default="{}", help='JSON – 예: {"upbit": {"lat_ms": 40}}')
+    a = ap.parse_args()
+    cfg = merge({"upbit": {"port": a.upbit_port}, "binanceusdm": {"port": a.binance_port}},
+                json.loads(a.cfg))
+    if a.rate is not None:
+        cfg = merge(cfg, {"upbit": {"rate": a.rate}, "binanceusdm": {"rate": a.rate}})
+    logging.basicConfig(level="INFO", format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    run_loop(MockExchange(cfg).serve())
+
+
+if __name__ == "__main__":
+    _cli()
@@ -0,0 +1,191 @@
+# core/book.py
+"""
+venue × pair 별 L2 호가창 (배열 기반).
+
+  L2Book   : side 마다 가격 키 / 수량 int64 배열 (용량 고정, 정렬 유지)
+               키 = ask 는 가격, bid 는 -가격 → 두 side 모두 오름차순 = 최우선 호가가 [0]
+               set()   : 레벨 하나 변경 – searchsorted + 뒤쪽 memmove, 책 전체를 다시 만들지 않음
+               vwap()  : 주어진 수량을 시장가로 먹을 때 평균 가격 – 걸어 들어간 레벨만 본다
+               depth() : 최우선 호가에서 slip_bp 이내에 있는 수량
+  DiffSync : Binance USD-M diff depth (snapshot lastUpdateId + U / u / pu 이벤트)
+               pu 가 직전 u 와 다르면 gap → 책을 비우고 snapshot 다시 요청
+  Books    : pair(행) × venue(spot / hedge) L2Book + OMS 가 마지막으로 낸 주문의 hedge 수량(ref_qty)
+
+가격 / 수량은 MarketBus 와 같은 Scale 정수. side 이름은 먹히는 쪽 ("bid" = 시장가 매도가 닿는 쪽).
+"""
+import logging
+
+import numpy as np
+
+from .fixed import Scale, div_half_even
+
+SIDES = ("bid", "ask")
+
+
+class L2Book:
+    __slots__ = ("scale", "cap", "key", "qty", "n", "seq")
+
+    def __init__(self, scale: Scale | None = None, cap: int = 50):
+        self.scale = scale or Scale()
+        self.cap   = cap
+        self.key   = {s: np.zeros(cap, np.int64) for s in SIDES}
+        self.qty   = {s: np.zeros(cap, np.int64) for s in SIDES}
+        self.n     = {s: 0 for s in SIDES}
+        self.seq   = 0                      # 마지막으로 반영한 update id (venue 정의)
+
+    @staticmethod
+    def _k(side: str, px: int) -> int:
+        return -px if side == "bid" else px
+
+    def clear(self):
+        self.n["bid"] = self.n["ask"] = 0
+        self.seq = 0
+
+    def snapshot(self, bids, asks, seq: int = 0):
+        """[(px, qty)] 전체 교체 – 입력은 최우선 호가부터"""
+        for side, lv in (("bid", bids), ("ask", asks)):
+            lv = [(self._k(side, p), q) for p, q in lv if q][:self.cap]
+            lv.sort()
+            m = len(lv)
+            if m:
+                a = np.array(lv, np.int64)
+                self.key[side][:m] = a[:, 0]
+                self.qty[side][:m] = a[:, 1]
+            self.n[side] = m
+        self.seq = seq
+
+    def set(self, side: str, px: int, qty: int):
+        """레벨 하나 – qty 0 이면 삭제. 용량을 넘치는 가장 먼 레벨은 버린다"""
+        k, q, n = self.key[side], self.qty[side], self.n[side]
+        kp = self._k(side, px)
+        j  = int(np.searchsorted(k[:n], kp))
+        if j < n and k[j] == kp:
+            if qty:
+                q[j] = qty
+            else:
+                k[j:n - 1] = k[j + 1:n]
+                q[j:n - 1] = q[j + 1:n]
+                self.n[side] = n - 1
+        elif qty and j < self.cap:
+            m = min(n, self.cap - 1)
+            k[j + 1:m + 1] = k[j:m]
+            q[j + 1:m + 1] = q[j:m]
+            k[j], q[j] = kp, qty
+            self.n[side] = m + 1
+
+    def update(self, bids, asks):
+        for p, q in bids:
+            self.set("bid", p, q)
+        for p, q in asks:
+            self.set("ask", p, q)
+
+    # ── 조회
+    def best(self, side: str) -> tuple[int, int]:
+        if not self.n[side]:
+            return 0, 0
+        return abs(int(self.key[side][0])), int(self.qty[side][0])
+
+    def vwap(self, side: str, qty: int) -> int:
+        """side 를 qty 만큼 먹을 때 평균 가격 (half-even). 깊이가 모자라면 0"""
+        n = self.n[side]
+        if not n:
+            return 0
+        k, q = self.key[side], self.qty[side]
+        if qty <= 0:
+            return abs(int(k[0]))
+        rem, notional = qty, 0
+        for j in range(n):
+            take = min(rem, int(q[j]))
+            notional += take * abs(int(k[j]))
+            rem -= take
+            if not rem:
+                return div_half_even(notional, qty)
+        return 0
+
+    def depth(self, side: str, slip_bp: float) -> int:
+        """최우선 호가에서 slip_bp 이내 가격에 걸린 총 수량"""
+        n = self.n[side]
+        if not n:
+            return 0
+        k    = self.key[side]
+        best = abs(int(k[0]))
+        off  = int(best * slip_bp / 1e4)
+        j    = int(np.searchsorted(k[:n], self._k(side, best + off if side == "ask" else best - off),
+                                   "right"))
+        return int(self.qty[side][:j].sum())
+
+
+class DiffSync:
+    """Binance USD-M diff depth 동기화 – snapshot 전 이벤트는 버퍼에 모은다"""
+    BUF_MAX = 10_000                        # snapshot 을 기다리며 모을 이벤트 상한
+
+    def __init__(self, book: L2Book, name: str = ""):
+        self.book   = book
+        self.synced = False
+        self.first  = True                  # snapshot 뒤 첫 이벤트: U <= lastUpdateId <= u
+        self.buf    = []
+        self.log    = logging.getLogger(f"DiffSync[{name}]")
+
+    def reset(self):
+        self.book.clear()
+        self.synced = False
+        self.first  = True
+        self.buf    = []
+
+    def _apply(self, U: int, u: int, pu: int, bids, asks) -> bool:
+        seq = self.book.seq
+        if u < seq:
+            return True                     # snapshot 에 이미 포함
+        if self.first:
+            if U > seq:
+                self.log.warning("snapshot %d 이후 이벤트가 빠짐 (U=%d) – resync", seq, U)
+                self.reset()
+                return False
+            self.first = False
+        elif pu != seq:
+            self.log.warning("sequence gap pu=%d last=%d – resync", pu, seq)
+            self.reset()
+            return False
+        self.book.update(bids, asks)
+        self.book.seq = u
+        return True
+
+    def on_snapshot(self, last_id: int, bids, asks) -> bool:
+        """REST snapshot 반영 후 버퍼 재생 – 이어지지 않으면 False (다시 요청)"""
+        self.book.snapshot(bids, asks, last_id)
+        buf, self.buf, self.first = self.buf, [], True
+        for ev in buf:
+            if not self._apply(*ev):
+                return False
+        self.synced = True
+        return True
+
+    def on_event(self, U: int, u: int, pu: int, bids, asks) -> bool:
+        """이벤트 하나 – gap 이면 책을 비우고 False (호출자가 snapshot 재요청)"""
+        if not self.synced:
+            if len(self.buf) < self.BUF_MAX:
+                self.buf.append((U, u, pu, bids, asks))
+            return True
+        return self._apply(U, u, pu, bids, asks)
+
+
+class Books:
+    """pair(행) × venue L2Book – MarketBus 와 같은 모양"""
+    VENUES = ("spot", "hedge")
+
+    def __init__(self, scales: list[dict], cap: dict[str, int]):
+        self.n       = len(scales)
+        self.book    = {v: [L2Book(sc[v], cap[v]) for sc in scales] for v in self.VENUES}
+        self.ref_qty = np.zeros(self.n, np.int64)   # 행별 기준 hedge 수량 (hedge Scale) – Strategy vwap 용
+
+    def hedge_vwap(self, idx: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """행 idx 의 hedge 매도 / 매수 vwap (ref_qty 기준, 깊이 부족이면 0)"""
+        hb = np.zeros(len(idx), np.int64)
+        ha = np.zeros(len(idx), np.int64)
+        books, ref = self.book["hedge"], self.ref_qty
+        for j, i in enumerate(idx.tolist()):
+            b, q = books[i], int(ref[i])
+            hb[j] = b.vwap("bid", q)
+            ha[j] = b.vwap("ask", q)
+        return hb, ha
+
@@ -0,0 +1,70 @@
+# core/bus.py
+import asyncio
+
+import numpy as np
+
+from .fixed import Scale
+
+
+class MarketBus:
+    """
+    pair(행) × venue(spot / hedge) × side(bid / ask) 마다 최신값 한 칸만 유지하는 시세 버스.
+
+    ① feed 는 publish() 로 슬롯을 덮어쓴다 – 값이 같으면 아무 일도 하지 않음
+    ② 값이 바뀌면 해당 행을 dirty 로 표시하고 seq 를 올려 대기 중인 Strategy 를 깨운다
+    ③ 큐가 없으므로 거래소가 몰아서 쏴도 backlog 가 쌓이지 않는다 (conflation)
+
+    슬롯은 venue 별 int64 배열 (길이 = pair 수) – Strategy 가 모든 pair 를 한 번에 계산한다.
+    가격은 pair·venue 별 Scale 기준 고정소수점 정수.
+    """
+    VENUES = ("spot", "hedge")
+
+    def __init__(self, scale: dict[str, Scale] | list[dict[str, Scale]] | None = None):
+        rows = scale if isinstance(scale, list) else [scale or {}]
+        self.n      = len(rows)
+        self.scales = [{v: r.get(v) or Scale() for v in self.VENUES} for r in rows]
+        self.scale  = self.scales[0]        # 단일 pair 호환 (SIM / bench)
+        self.bid    = {v: np.zeros(self.n, np.int64) for v in self.VENUES}
+        self.ask    = {v: np.zeros(self.n, np.int64) for v in self.VENUES}
+        self.dirty  = np.zeros(self.n, bool)            # 마지막 drain() 이후 바뀐 행
+        self.t_rx   = np.zeros(self.n, np.int64)        # 행의 마지막 변경 수신 / 디코드 시각 (ns)
+        self.t_dec  = np.zeros(self.n, np.int64)
+        self.t_last = {v: 0 for v in self.VENUES}      # venue 별 마지막 publish 수신 시각 (값이 같아도) – liveness
+        self.seq    = 0                     # 변경될 때마다 +1
+        self._ev    = asyncio.Event()
+
+    def publish(self, venue: str, bid, ask, t_rx: int = 0, t_dec: int = 0, i: int = 0) -> bool:
+        """pair i 의 최신 호가 기록. 실제로 바뀐 경우에만 True"""
+        self.t_last[venue] = t_rx
+        b, a = self.bid[venue], self.ask[venue]
+        if b[i] == bid and a[i] == ask:
+            return False
+        b[i] = bid
+        a[i] = ask
+        self.t_rx[i]  = t_rx
+        self.t_dec[i] = t_dec
+        self.dirty[i] = True
+        self.seq += 1
+        self._ev.set()
+        return True
+
+    def ready_mask(self) -> np.ndarray:
+        """네 가격이 모두 들어온 행"""
+        b, a = self.bid, self.ask
+        return (b["spot"] > 0) & (a["spot"] > 0) & (b["hedge"] > 0) & (a["hedge"] > 0)
+
+    def ready(self) -> bool:
+        return bool(self.ready_mask().all())
+
+    def drain(self) -> np.ndarray:
+        """dirty 행 index 를 돌려주고 표시를 지운다"""
+        idx = np.flatnonzero(self.dirty)
+        self.dirty[idx] = False
+        return idx
+
+    async def wait(self, seen: int) -> int:
+        """seq 가 seen 과 달라질 때까지 대기 후 최신 seq 반환"""
+        while self.seq == seen:
+            self._ev.clear()
+            await self._ev.wait()
+        return self.seq
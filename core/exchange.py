@@ -1,42 +1,180 @@
+import asyncio, itertools, time
 import ccxt.async_support as ccxt
-from pydantic import BaseModel
-from typing import Any
+from pydantic import BaseModel, Field
+from typing import Any, ClassVar
 import logging
 
+from .fixed import Scale
+from .models import TransportCfg
+from .markets import MarketCache
+from .transport import get_transport, rehost, WARM_URL
+
+CID_PREFIX = "arb-"                            # client order id – 거래소 order id 와 구분
+_cid_run   = f"{int(time.time() * 1000):x}-"   # 재시작해도 겹치지 않게
+_cid_seq   = itertools.count(1)
+
+
+def new_cid() -> str:
+    """client order id – ack / 체결 push 를 순서와 무관하게 주문과 짝짓는다 (Binance 36 자 이하)"""
+    return f"{CID_PREFIX}{_cid_run}{next(_cid_seq):x}"
+
+
+def _cid(cid: str | None) -> dict:
+    return {"clientOrderId": cid} if cid else {}    # ccxt: Upbit identifier / Binance newClientOrderId …
+
+
 class ExchWrapper(BaseModel):
+    """
+    ccxt 경계. 내부에서는 가격/수량을 Scale 기준 정수로 다루고
+    ccxt 호출 직전에만 float 로 바꾼다.
+    여러 심볼을 다룰 때는 init(symbols=…) 후 view(symbol) 로 심볼별 wrapper 를 만든다
+    (ccxt 클라이언트 / 커넥션 풀은 공유).
+    """
     id: str
     symbol: str
     ccxt_ex: Any | None = None
+    rest_url: str | None = None             # REST host 대체 (mock 거래소)
+    _ping_task: Any = None                  # init 의 첫 REST (fetch_ticker) – ready() 가 결과 확인
+    _ping_err: Any = None
+    scale: Scale = Field(default_factory=Scale)
+    scales: dict[str, Scale] = Field(default_factory=dict)     # symbol → Scale
 
-    async def init(self, keys: dict):
+    async def init(self, keys: dict, transport: TransportCfg | None = None,
+                   symbols: list[str] | None = None, cache: MarketCache | None = None):
+        """
+        ccxt 클라이언트 생성 + 설정 심볼 market 로드 (cache 가 있으면 디스크 캐시 우선).
+        연결 확인(fetch_ticker) 과 keep-warm 은 백그라운드 – 피드 연결과 겹치고,
+        결과는 첫 주문 전에 ready() 로 확인한다.
+        """
         klass = getattr(ccxt, self.id)
+        tp    = get_transport(self.id, transport)       # venue 공용 커넥션 풀
         api_key = keys.get(f"{self.id.upper()}_KEY")     # 예: UPBIT_KEY
         sec_key = keys.get(f"{self.id.upper()}_SECRET")  # 예: UPBIT_SECRET
         self.ccxt_ex = klass({
-            "api_key": api_key,
+            "apiKey": api_key,
             "secret": sec_key,
-            "enableRateLimit": True,
-            "verbose": False
+            "enableRateLimit": False,                    # 한도는 core/ratelimit.py 가 (ccxt 내부 FIFO 는 우선순위를 모름)
+            "verbose": False,
+            "session": tp.session                        # ccxt 는 닫지 않음 (own_session=False)
         })
-        if hasattr(self.ccxt_ex, "load_markets"):
-            await self.ccxt_ex.load_markets()
+        if self.rest_url:
+            api = self.ccxt_ex.urls["api"]
+            for k, u in api.items():
+                if isinstance(u, str):
+                    api[k] = rehost(u, self.rest_url)
+        symbols = symbols or [self.symbol]
         log = logging.getLogger(f"ExchWrapper[{self.id}]")
+        if hasattr(self.ccxt_ex, "load_markets"):
+            t0 = asyncio.get_running_loop().time()
+            if cache:
+                src = await cache.load(self.ccxt_ex, list(dict.fromkeys(symbols + [self.symbol])))
+            else:
+                src = "full"
+                await self.ccxt_ex.load_markets()
+            log.info("markets %s (%.0f ms)", src, (asyncio.get_running_loop().time() - t0) * 1000)
+            for sym in symbols:
+                try:                                     # BTC/USDT → 선물 venue 면 BTC/USDT:USDT
+                    market = self.ccxt_ex.market(sym)
+                except Exception:
+                    market = None
+                self.scales[sym] = Scale.from_market(market, self.ccxt_ex.precisionMode) \
+                                   if market else Scale()
+            self.scale = self.scales.get(self.symbol, self.scale)
+        self._ping_task = asyncio.create_task(self._ping(tp, log))
+
+    async def _ping(self, tp, log) -> bool:
+        """첫 REST 로 TLS 연결을 미리 열고 venue 가 응답하는지 확인 – 실패는 ready() 가 올린다"""
         try:
-            await self.ccxt_ex.fetch_ticker(self.symbol)   # ping
-            log.info("REST auth OK")
+            await self.ccxt_ex.fetch_ticker(self.symbol)
+            log.info("REST OK")
+            return True
         except Exception as e:
-            log.error("REST auth FAIL: %s", e, exc_info=True)
-            raise
+            log.error("REST ping FAIL: %s", e)
+            self._ping_err = e
+            return False
+        finally:
+            url = WARM_URL.get(self.id)
+            tp.start_keep_warm(rehost(url, self.rest_url) if url else None)
+
+    async def ready(self):
+        """init 의 REST 확인을 기다린다 – 실패했으면 그 예외 (예전처럼 기동 중단)"""
+        if self._ping_task is not None and not await asyncio.shield(self._ping_task):
+            raise self._ping_err
+
+    def view(self, symbol: str) -> "ExchWrapper":
+        """같은 ccxt 클라이언트를 쓰는 symbol 전용 wrapper"""
+        return self.model_copy(update={"symbol": symbol,
+                                       "scale": self.scales.get(symbol, self.scale)})
 
-    async def limit(self, side: str, amount: float, price: float):
+    async def limit(self, side: str, amount: int, price: int, cid: str | None = None):
+        """amount / price : Scale 기준 정수, cid : client order id"""
         fn = self.ccxt_ex.create_limit_buy_order if side == "buy" \
              else self.ccxt_ex.create_limit_sell_order
-        return await fn(self.symbol, amount, price)
+        return await fn(self.symbol,
+                        self.scale.qty_float(amount),
+                        self.scale.px_float(self.scale.round_px(price)),
+                        _cid(cid))
 
-    async def market(self, side: str, amount: float):
+    async def market(self, side: str, amount: int, reduce_only: bool = False,
+                     cid: str | None = None):
         fn = self.ccxt_ex.create_market_buy_order if side == "buy" \
              else self.ccxt_ex.create_market_sell_order
-        return await fn(self.symbol, amount)
+        return await fn(self.symbol, self.scale.qty_float(amount),
+                        {**({"reduceOnly": True} if reduce_only else {}), **_cid(cid)})
+
+    async def ioc(self, side: str, amount: int, price: int, cid: str | None = None):
+        """즉시 체결 안 된 잔량은 취소되는 지정가 (Upbit 시장가 매수는 수량이 아니라 금액이라 이걸 쓴다)"""
+        return await self.ccxt_ex.create_order(self.symbol, "limit", side,
+                                               self.scale.qty_float(amount),
+                                               self.scale.px_float(self.scale.round_px(price)),
+                                               {"timeInForce": "IOC", **_cid(cid)})
+
+    BATCH: ClassVar[int] = 5                    # Binance USD-M batchOrders 최대 건수
+
+    async def market_many(self, orders: list[tuple[str, str, int, str | None]]) -> list:
+        """
+        [(symbol, side, amount, cid)] 시장가 여러 건 – venue 가 지원하면 batch 주문.
+        결과는 입력 순서대로, 실패한 건은 None 또는 status == "rejected".
+        """
+        ex   = self.ccxt_ex
+        reqs = [{"symbol": s, "type": "market", "side": side,
+                 "amount": self.scales.get(s, self.scale).qty_float(a), "params": _cid(cid)}
+                for s, side, a, cid in orders]
+        if ex.has.get("createOrders"):
+            chunks = [reqs[i:i + self.BATCH] for i in range(0, len(reqs), self.BATCH)]
+            res    = await asyncio.gather(*(ex.create_orders(c) for c in chunks),
+                                          return_exceptions=True)
+            out    = []
+            for c, r in zip(chunks, res):       # 실패한 chunk 의 주문만 None (결과 모름)
+                if isinstance(r, Exception):
+                    logging.getLogger(f"ExchWrapper[{self.id}]").warning(
+                        "batch order error (%d 건): %s", len(c), r)
+                    r = [None] * len(c)
+                out.extend(r)
+            return out
+        res = await asyncio.gather(*(ex.create_order(r["symbol"], "market", r["side"], r["amount"],
+                                                     None, r["params"])
+                                     for r in reqs), return_exceptions=True)
+        return [None if isinstance(r, Exception) else r for r in res]
+
+    async def order_by_cid(self, cid: str):
+        """
+        client order id 로 주문 조회 – 응답을 받지 못한 주문이 실제로 들어갔는지 확인.
+        거래소에 없으면 ccxt.OrderNotFound
+        """
+        ex = self.ccxt_ex
+        if self.id == "upbit":                  # GET /v1/order?identifier= (ccxt fetch_order 는 uuid 만)
+            return ex.parse_order(await ex.privateGetOrder({"identifier": cid}))
+        if self.id == "bybit":                  # ccxt bybit fetch_order 는 orderId 를 비울 수 없다
+            m   = ex.market(self.symbol)
+            r   = await ex.privateGetV5OrderRealtime({
+                "category": "linear" if m.get("linear", True) else "inverse",
+                "symbol": m["id"], "orderLinkId": cid})
+            lst = (r.get("result") or {}).get("list") or []
+            if not lst:
+                raise ccxt.OrderNotFound(f"{self.id} order {cid} not found")
+            return ex.parse_order(lst[0], m)
+        return await ex.fetch_order(None, self.symbol, _cid(cid))   # Binance origClientOrderId
 
     async def cancel(self, order_id: str):
         return await self.ccxt_ex.cancel_order(order_id, self.symbol)
@@ -1,84 +1,245 @@
 # core/feed.py
-import asyncio, json, logging, decimal as D
+import asyncio, json, logging
+
 import websockets
-import msgpack
+
+from .bus   import MarketBus
+from .book  import DiffSync, L2Book
+from .codec import get_decoder, get_extras, get_key, upbit_levels, binance_depth
+from .trace import tracer, now
+from .transport import get_transport, rehost
 
 class AbstractFeed:
-    def __init__(self, q: asyncio.Queue):
-        self.q   = q
+    """
+    venue 당 WS 하나에 여러 심볼을 구독한다.
+    프레임의 심볼 키로 행(pair index)을 골라 그 행의 Scale decoder 로 bus 에 넣는다.
+    books 가 있으면 (core/book.py) 행별 L2 호가창도 갱신한다 – _book() 이 True 면 호가창 전용 프레임.
+    aux : 행이 없는 키의 프레임 → fn(raw, t_rx) (예: 환율 ticker). 행을 못 찾은 경우에만 본다.
+    ws / ex_lag : 연결 중인 소켓 (liveness ping 용), ex_sample 프레임마다 잰 거래소 시각 → 수신 (ms)
+    url : WS scheme://host 대체 (mock 거래소 – bench/loadtest.py), 경로는 venue URL 그대로
+    """
+    VENUE = ""                          # bus venue (spot / hedge)
+    CODEC = ""                          # codec venue (upbit / binance)
+
+    def __init__(self, bus: MarketBus, keys: list[str], decoder: str = "json",
+                 recorders: list | None = None, books: list[L2Book] | None = None):
+        self.bus     = bus
+        self.books   = books
+        self.backend = decoder
+        self.key     = get_key(self.CODEC)
+        self.aux     = {}                   # 심볼 키(bytes) → fn(raw, t_rx)
+        self.ws      = None
+        self.ex_lag  = 0.0
+        recorders    = recorders or [None] * len(keys)
+        # 심볼 키(bytes) → (행, decoder, extras, recorder)
+        self.rows = {}
+        for i, k in enumerate(keys):
+            scale = bus.scales[i][self.VENUE]
+            self.rows[k.encode()] = (i, get_decoder(self.CODEC, decoder, scale),
+                                     get_extras(self.CODEC, scale), recorders[i])
         self.log = logging.getLogger(self.__class__.__name__)
 
+    async def _consume(self, ws):
+        """프레임 → 행 선택 → 디코드 → bus (+ 기록 / 지연 추적)"""
+        venue, key, rows, publish = self.VENUE, self.key, self.rows, self.bus.publish
+        tr, n, books = tracer, 0, self.books
+        self.ws = ws
+        async for raw in ws:
+            t_rx = now()
+            if type(raw) is str:
+                raw = raw.encode()
+            k   = key(raw)
+            row = rows.get(k)
+            if row is None:
+                fn = self.aux.get(k)
+                if fn:
+                    fn(raw, t_rx)
+                continue
+            i, decode, extras, rec = row
+            if books is not None and self._book(i, raw):
+                continue
+            q = decode(raw)
+            if q is None:
+                continue
+            if tr.on:
+                t_dec = now()
+                publish(venue, q[0], q[1], t_rx, t_dec, i)
+                tr.span("rx_decode", t_rx, t_dec)
+            else:
+                publish(venue, q[0], q[1], t_rx, 0, i)
+            n += 1
+            if n % tr.ex_sample == 0:
+                t_ex = extras(raw)[2] * 1_000_000
+                if t_ex:
+                    self.ex_lag = (t_rx - t_ex) / 1e6
+                    if tr.on:
+                        tr.span("ex_rx", t_ex, t_rx)
+            if rec:
+                rec.record(raw, q, t_rx)
+
+    def _book(self, i: int, raw: bytes) -> bool:
+        return False
+
 
 # ────────────────────────────── Upbit (현물)
 class UpbitFeed(AbstractFeed):
-    URL = "wss://api.upbit.com/websocket/v1"
-
-    def __init__(self, q, symbol="USDT-BTC"):
-        super().__init__(q)
-        self.symbol = symbol              # 반드시 "USDT-BTC"
-        self.log    = logging.getLogger("UpbitFeed")
+    URL   = "wss://api.upbit.com/websocket/v1"
+    VENUE = "spot"
+    CODEC = "upbit"
+
+    def __init__(self, bus, codes=("USDT-BTC",), decoder: str = "json", recorders=None,
+                 books=None, fx=None, url=None):
+        super().__init__(bus, list(codes), decoder, recorders, books)
+        self.URL   = rehost(self.URL, url)
+        self.codes = list(codes)          # 예: ["USDT-BTC", "USDT-ETH"] – 행 순서 = pair 순서
+        self.depth = books[0].cap if books else 1
+        self.fx    = fx                   # FxPoller – 같은 WS 로 환율 ticker 구독
+        if fx:
+            self.aux[fx.code] = fx.on_frame
+        self.log   = logging.getLogger("UpbitFeed")
+
+    def _sub(self) -> list:
+        # Upbit 는 depth 를 문자열이 아닌 숫자(int) 로 줘야 합니다.
+        sub = [
+            {"ticket": "feed"},
+            {"type": "orderbook", "codes": self.codes, "depth": self.depth}
+        ]
+        if self.fx:
+            sub.append({"type": "ticker", "codes": [self.fx.cfg.ws_code]})
+        if self.backend != "legacy":
+            sub.append({"format": "SIMPLE"})   # 축약 키 (ty / cd / obu / ap / bp)
+        return sub
+
+    def _book(self, i: int, raw: bytes) -> bool:
+        """Upbit orderbook 은 매 프레임이 depth 개 레벨 snapshot – 호가창 교체 후 최우선 호가도 그대로 처리"""
+        book = self.books[i]
+        lv   = upbit_levels(book.scale, raw)
+        if lv:
+            book.snapshot(*lv)
+        return False
 
     async def run(self):
         while True:
             try:
                 async with websockets.connect(self.URL, ping_interval=20) as ws:
-                    # Upbit 는 depth 를 문자열이 아닌 숫자(int) 로 줘야 합니다.
-                    sub = [
-                        {"ticket": "feed"},
-                        {"type": "orderbook", "codes": [self.symbol], "depth": 1}
-                    ]
-                    await ws.send(json.dumps(sub))
-                    self.log.info("WS connected")
-
-                    async for raw in ws:
-                        j = json.loads(raw)
-
-                        if j.get("type") != "orderbook":
-                            continue
-
-                        # ① 한 번만 프레임 구조를 찍고 싶다면
-                        if not hasattr(self, "_dbg_printed"):
-                            print("[DEBUG‑FRAME]", j, flush=True)
-                            self._dbg_printed = True
-
-                        units = j.get("orderbook_units")
-                        if not units:
-                            continue
-
-                        best = units[0]
-                        ask = D.Decimal(best["ask_price"])
-                        bid = D.Decimal(best["bid_price"])
-
-                        # ② 로그로도 확인
-                        self.log.debug("ask=%s bid=%s", ask, bid)
-
-                        await self.q.put({"ex": "spot", "ask": ask, "bid": bid})
+                    await ws.send(json.dumps(self._sub()))
+                    self.log.info("WS connected (%s, %d codes)", self.backend, len(self.codes))
+                    await self._consume(ws)
             except Exception as e:
-                self.log.warning("WS error: %s – reconnect in 5 s", e)
+                self.log.warning("WS error: %s – reconnect in 5 s", e)
                 await asyncio.sleep(5)
 
 
 # ────────────────────────────── Binance USDT‑Perp (선물)
 class BinanceFeed(AbstractFeed):
-    URL_BASE = "wss://fstream.binance.com/ws"
+    URL_BASE = "wss://fstream.binance.com/stream?streams="    # combined stream
+    VENUE    = "hedge"
+    CODEC    = "binance"
 
     def __init__(self,
-                 q: asyncio.Queue,
-                 stream: str = "btcusdt@bookTicker"):
-        super().__init__(q)
-        self.stream = stream
-        self.URL    = f"{self.URL_BASE}/{self.stream}"
+                 bus: MarketBus,
+                 streams=("btcusdt@bookTicker",),
+                 decoder: str = "json",
+                 recorders=None,
+                 books=None,
+                 url=None,
+                 rest_url=None):
+        # 행 키 = bookTicker 의 "s" (btcusdt@bookTicker → BTCUSDT)
+        syms = [s.split("@")[0].upper() for s in streams]
+        super().__init__(bus, syms, decoder, recorders, books)
+        self.streams = list(streams)
+        self.syms    = syms
+        if books:                           # diff depth + REST snapshot (core/book.py DiffSync)
+            self.streams += [f"{s.lower()}@depth@100ms" for s in syms]
+            self.syncs    = [DiffSync(b, s) for b, s in zip(books, syms)]
+            self._pending = {}
+        self.URL     = rehost(self.URL_BASE, url) + "/".join(self.streams)
+        self.snap    = rehost(self.SNAPSHOT_URL, rest_url)
+
+    SNAPSHOT_URL = "https://fapi.binance.com/fapi/v1/depth?symbol={}&limit={}"
+
+    def _book(self, i: int, raw: bytes) -> bool:
+        if b'"depthUpdate"' not in raw:
+            return False
+        ev = binance_depth(self.books[i].scale, raw)
+        if ev and not self.syncs[i].on_event(*ev):
+            self._resync(i)
+        return True
+
+    def _resync(self, i: int):
+        t = self._pending.get(i)
+        if t is None or t.done():
+            self._pending[i] = asyncio.create_task(self._snapshot(i))
+
+    async def _snapshot(self, i: int):
+        """REST snapshot – 이어지지 않으면 1 초 후 다시"""
+        sync, sc = self.syncs[i], self.books[i].scale
+        limit    = min(1000, self.books[i].cap)
+        session  = get_transport("binanceusdm").session
+        while True:
+            try:
+                async with session.get(self.snap.format(self.syms[i], limit)) as r:
+                    j = await r.json()
+                if sync.on_snapshot(j["lastUpdateId"],
+                                    [(sc.px(p), sc.qty(q)) for p, q in j["bids"]],
+                                    [(sc.px(p), sc.qty(q)) for p, q in j["asks"]]):
+                    self.log.info("%s book synced @%d", self.syms[i], sync.book.seq)
+                    return
+            except Exception as e:
+                self.log.warning("%s depth snapshot error: %s", self.syms[i], e)
+            await asyncio.sleep(1)
 
     async def run(self):
         while True:
             try:
                 async with websockets.connect(self.URL, ping_interval=20) as ws:
-                    self.log.info("WS connected")
-                    async for raw in ws:
-                        j = json.loads(raw)
-                        await self.q.put({"ex":"hedge",
-                                          "ask_f": D.Decimal(j["a"]),
-                                          "bid_f": D.Decimal(j["b"])})
+                    self.log.info("WS connected (%s, %d streams)", self.backend, len(self.streams))
+                    if self.books:          # 재접속마다 다시 동기화
+                        for i, s in enumerate(self.syncs):
+                            s.reset()
+                            self._resync(i)
+                    await self._consume(ws)
+            except Exception as e:
+                self.log.warning("WS error: %s – reconnect in 5 s", e)
+                await asyncio.sleep(5)
+
+
+# ────────────────────────────── Bybit USDT‑Perp (헷지 backup – core/router.py)
+class BybitFeed(AbstractFeed):
+    """
+    v5 public linear orderbook.1 – 라우팅용 최우선 호가.
+    Strategy 가 보지 않도록 backup 전용 MarketBus 의 'hedge' 슬롯에 넣는다.
+    """
+    URL   = "wss://stream.bybit.com/v5/public/linear"
+    VENUE = "hedge"
+    CODEC = "bybit"
+    SUB_MAX = 10                        # 구독 요청 하나당 topic 수
+
+    def __init__(self, bus: MarketBus, topics=("orderbook.1.BTCUSDT",),
+                 decoder: str = "json", recorders=None, url=None):
+        # 행 키 = data "s" (orderbook.1.BTCUSDT → BTCUSDT)
+        super().__init__(bus, [t.rsplit(".", 1)[1] for t in topics], decoder, recorders)
+        self.URL    = rehost(self.URL, url)
+        self.topics = list(topics)
+
+    async def _ping(self, ws):
+        while True:                     # 20 초마다 앱 레벨 ping 이 없으면 서버가 끊는다
+            await asyncio.sleep(20)
+            await ws.send('{"op":"ping"}')
+
+    async def run(self):
+        while True:
+            try:
+                async with websockets.connect(self.URL, ping_interval=None) as ws:
+                    for i in range(0, len(self.topics), self.SUB_MAX):
+                        await ws.send(json.dumps({"op": "subscribe",
+                                                  "args": self.topics[i:i + self.SUB_MAX]}))
+                    self.log.info("WS connected (%s, %d topics)", self.backend, len(self.topics))
+                    ping = asyncio.create_task(self._ping(ws))
+                    try:
+                        await self._consume(ws)
+                    finally:
+                        ping.cancel()
             except Exception as e:
-                self.log.warning("WS error: %s – reconnect in 5 s", e)
+                self.log.warning("WS error: %s – reconnect in 5 s", e)
                 await asyncio.sleep(5)
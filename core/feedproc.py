@@ -0,0 +1,192 @@
+# core/feedproc.py
+"""
+runtime.feeds: process – WS 피드를 별도 프로세스로 돌리고 공유 메모리로 호가를 넘긴다.
+
+  공유 메모리 = pair × venue 마다 64 byte seqlock 슬롯 (캐시 라인 하나)
+    seq(u64) bid ask t_rx t_dec (i64) – 가격은 MarketBus 와 같은 Scale 정수
+    + 끝에 venue 마다 heartbeat 줄 하나 : 마지막 프레임 수신 시각 t_rx (i64, 값이 같아도 매 프레임)
+  쓰기 (feed 프로세스, 슬롯당 writer 하나) : seq 홀수 → 값 → seq 짝수. 잠금 없음
+                          값이 같은 프레임은 슬롯을 건드리지 않고 heartbeat 만 쓴다
+  읽기 (전략 프로세스)  : ShmBridge 가 poll_us 마다 seq 배열을 한 번에 비교해
+                          바뀐 슬롯만 복사하고, 읽는 동안 seq 가 변했으면 다음 회차에 다시 읽는다
+                          → 기존 MarketBus.publish() 로 넘기므로 Strategy / OMS 는 그대로
+                          heartbeat 는 MarketBus.t_last 로 (core/liveness.py feed_age – 조용한 호가창도 살아 있음)
+
+  FeedProcess : 자식 프로세스 감시 – 죽으면 다시 띄운다
+  run_loop()  : uvloop 가 있고 켜져 있으면 uvloop 로 실행
+
+x86(TSO) 에서는 store 순서가 유지되어 seq → 값 → seq 순서가 reader 에게 그대로 보인다.
+"""
+import asyncio, logging, multiprocessing as mp, signal, struct
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .bus   import MarketBus
+from .trace import tracer
+
+SLOT  = 64
+DTYPE = np.dtype([("seq", "<u8"), ("bid", "<i8"), ("ask", "<i8"),
+                  ("t_rx", "<i8"), ("t_dec", "<i8"), ("_pad", "V24")])
+_SEQ  = struct.Struct("<Q")
+_DATA = struct.Struct("<qqqq")
+_HB   = struct.Struct("<q")
+VENUE_ID = {v: k for k, v in enumerate(MarketBus.VENUES)}
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """자식 쪽 attach – 종료 시 resource_tracker 가 segment 를 지우지 않게"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)    # 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+class ShmWriter:
+    """feed 프로세스 쪽 – AbstractFeed 가 쓰는 bus 인터페이스 (scales / publish)"""
+    def __init__(self, shm: shared_memory.SharedMemory, scales: list[dict]):
+        self.shm    = shm
+        self.buf    = shm.buf
+        self.scales = scales
+        n           = len(scales) * len(VENUE_ID)
+        self._seq   = [0] * n
+        self._last  = [None] * n
+        self._hb    = n * SLOT                  # venue heartbeat 줄 시작
+
+    def publish(self, venue: str, bid, ask, t_rx: int = 0, t_dec: int = 0, i: int = 0) -> bool:
+        v = VENUE_ID[venue]
+        _HB.pack_into(self.buf, self._hb + v * SLOT, t_rx)     # 값이 같아도 – liveness feed_age
+        k = i * len(VENUE_ID) + v
+        if self._last[k] == (bid, ask):
+            return False
+        self._last[k] = (bid, ask)
+        off, s = k * SLOT, self._seq[k]
+        _SEQ.pack_into(self.buf, off, s + 1)                 # 쓰는 중 (홀수)
+        _DATA.pack_into(self.buf, off + 8, bid, ask, t_rx, t_dec)
+        _SEQ.pack_into(self.buf, off, s + 2)                 # 완료 (짝수)
+        self._seq[k] = s + 2
+        return True
+
+
+class ShmBridge:
+    """전략 프로세스 쪽 – 공유 메모리 슬롯 → MarketBus"""
+    def __init__(self, bus: MarketBus, poll_us: int = 50):
+        self.bus  = bus
+        self.poll = poll_us / 1e6
+        n         = bus.n * len(VENUE_ID)
+        self.shm  = shared_memory.SharedMemory(create=True, size=(n + len(VENUE_ID)) * SLOT)
+        self.shm.buf[:] = bytes(self.shm.size)
+        self.arr  = np.ndarray((n,), DTYPE, buffer=self.shm.buf)
+        self.hb   = np.ndarray((len(VENUE_ID),), "<i8", buffer=self.shm.buf,
+                               offset=n * SLOT, strides=(SLOT,))
+        self.seen = np.zeros(len(self.arr), np.uint64)
+        self.log  = logging.getLogger("ShmBridge")
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def pump(self) -> int:
+        """바뀐 슬롯을 bus 로 + venue heartbeat 를 t_last 로 – 반영한 슬롯 수"""
+        n = self._slots()
+        t_last = self.bus.t_last
+        for v, t in zip(MarketBus.VENUES, self.hb.tolist()):
+            if t > t_last[v]:
+                t_last[v] = t
+        return n
+
+    def _slots(self) -> int:
+        arr  = self.arr
+        s1   = arr["seq"].copy()
+        idx  = np.flatnonzero((s1 != self.seen) & (s1 & 1 == 0))
+        if not idx.size:
+            return 0
+        rows = arr[idx]                                      # 복사
+        ok   = (rows["seq"] == s1[idx]) & (arr["seq"][idx] == s1[idx])
+        pub, nv, n = self.bus.publish, len(VENUE_ID), 0
+        venues = MarketBus.VENUES
+        for k, r in zip(idx[ok].tolist(), rows[ok].tolist()):
+            _, bid, ask, t_rx, t_dec, _ = r
+            pub(venues[k % nv], bid, ask, t_rx, t_dec, k // nv)
+            if t_dec and tracer.on:
+                tracer.span("rx_decode", t_rx, t_dec)
+            n += 1
+        self.seen[idx[ok]] = s1[idx[ok]]
+        return n
+
+    async def run(self):
+        while True:
+            self.pump()
+            await asyncio.sleep(self.poll)
+
+    def close(self):
+        del self.arr, self.hb
+        self.shm.close()
+        self.shm.unlink()
+
+
+# ────────────────────────────── 자식 프로세스
+def run_loop(coro, use_uvloop: bool = False):
+    if use_uvloop:
+        try:
+            import uvloop                   # 선택 의존성
+            with asyncio.Runner(loop_factory=uvloop.new_event_loop) as r:
+                return r.run(coro)
+        except ImportError:
+            logging.getLogger("feedproc").warning("uvloop 없음 – 기본 asyncio 루프 사용")
+    return asyncio.run(coro)
+
+
+def _feed_main(kind: str, keys: list, scales: list, shm_name: str, decoder: str,
+               trace_cfg, use_uvloop: bool, log_level: str, url: str | None = None):
+    from .feed import UpbitFeed, BinanceFeed, BybitFeed
+    signal.signal(signal.SIGINT, signal.SIG_IGN)            # 종료는 부모가 terminate()
+    logging.basicConfig(level=log_level,
+                        format=f"%(asctime)s %(levelname)s [{kind}] %(name)s: %(message)s")
+    tracer.configure(trace_cfg)             # t_dec 기록 – 자식의 히스토그램은 노출되지 않으므로
+                                            # rx_decode 는 부모(ShmBridge)가 슬롯 시각으로 관측
+    shm    = _attach(shm_name)
+    writer = ShmWriter(shm, scales)
+    feed   = {"upbit":   lambda: UpbitFeed(writer, codes=keys, decoder=decoder, url=url),
+              "binance": lambda: BinanceFeed(writer, streams=keys, decoder=decoder, url=url),
+              "bybit":   lambda: BybitFeed(writer, topics=keys, decoder=decoder, url=url)}[kind]()
+    try:
+        run_loop(feed.run(), use_uvloop)
+    finally:
+        shm.close()
+
+
+class FeedProcess:
+    """피드 자식 프로세스 하나 – run() 이 살아 있는지 보고 죽으면 다시 띄운다"""
+    def __init__(self, kind: str, keys: list, bridge: ShmBridge, decoder: str,
+                 trace_cfg, use_uvloop: bool = False, log_level: str = "INFO",
+                 check_sec: float = 1.0, url: str | None = None):
+        self.kind  = kind
+        self.args  = (kind, keys, bridge.bus.scales, bridge.name, decoder,
+                      trace_cfg, use_uvloop, log_level, url)
+        self.check = check_sec
+        self.proc  = None
+        self.log   = logging.getLogger(f"FeedProcess[{kind}]")
+
+    def start(self):
+        ctx = mp.get_context("spawn")
+        self.proc = ctx.Process(target=_feed_main, args=self.args,
+                                name=f"feed-{self.kind}", daemon=True)
+        self.proc.start()
+        self.log.info("started pid=%d", self.proc.pid)
+
+    async def run(self):
+        self.start()
+        while True:
+            await asyncio.sleep(self.check)
+            if not self.proc.is_alive():
+                self.log.warning("exited (code %s) – restart", self.proc.exitcode)
+                self.start()
+
+    def stop(self):
+        if self.proc and self.proc.is_alive():
+            self.proc.terminate()
+            self.proc.join(2)
@@ -0,0 +1,128 @@
+# core/fills.py
+import asyncio, json, logging
+from typing import Dict
+
+import websockets
+
+from .trace import now
+from .transport import rehost
+
+
+class FillTracker:
+    """
+    주문별 누적 체결량(filled)을 기억해 증가분만 fill_q 로 내보낸다.
+    push(WS) / REST 어느 쪽에서 같은 체결을 두 번 보고해도 헷지는 한 번만 나간다.
+    watch 는 OMS(pair)들이 공유하는 {oid: fill_q} – 이벤트는 주문을 낸 OMS 의 큐로 간다.
+    OMS 는 주문을 보내기 전에 client order id(cid) 로 먼저 등록한다 – REST ack 보다 먼저 온
+    push 체결은 cid 로 찾아 oid 로 옮긴다 (OMS 는 ack 때 cid 가 남아 있을 때만 oid 로 옮긴다).
+    종료된 주문은 누적량을 지우는 대신 tombstone(최근 DONE_MAX 개)에 남긴다 – 폴러가 await 사이에
+    들고 있던 늦은 보고가 전체 체결을 새 체결로 다시 내보내지 않도록.
+    """
+    DONE_MAX = 4096
+
+    def __init__(self, watch: Dict[str, asyncio.Queue], fill_q: asyncio.Queue):
+        self.watch     = watch               # 공유 dict – OMS 가 주문 id 등록
+        self.fill_q    = fill_q              # watch 에 큐가 없을 때
+        self._filled: Dict[str, int] = {}    # oid → 누적 체결량 (spot Scale 정수)
+        self._done: Dict[str, None] = {}     # 종료된 oid (삽입 순서 = 오래된 순)
+        self.log       = logging.getLogger("FillTracker")
+
+    async def update(self, oid: str, side: str, filled: int, done: bool, cid: str | None = None):
+        """filled : 주문 oid 의 누적 체결량, done : 체결 완료/취소로 종료, cid : client order id"""
+        if oid in self._done:
+            return                           # 종료 뒤 도착한 보고 (폴러 / resync / 중복 push)
+        if cid and oid not in self.watch and cid in self.watch:
+            self.watch[oid] = self.watch.pop(cid)           # ack 전에 도착한 push
+        prev = self._filled.get(oid, 0)
+        if filled > prev:
+            self._filled[oid] = filled
+            await (self.watch.get(oid) or self.fill_q).put({
+                "side":    side,             # 'buy' or 'sell'
+                "filled":  filled - prev,
+                "oid":     oid,
+                "t_fill":  now(),            # 체결 감지 시각 (fill_hedge_ack 구간 시작)
+            })
+        if done:
+            self.watch.pop(oid, None)
+            self._filled.pop(oid, None)
+            self._done[oid] = None
+            if len(self._done) > self.DONE_MAX:
+                del self._done[next(iter(self._done))]
+
+
+class FillSource:
+    """체결 감지 공통 인터페이스 – run() 이 FillTracker 로 이벤트를 넣는다"""
+    def __init__(self, upbit, tracker: FillTracker):
+        self.upbit   = upbit                 # ExchWrapper (ccxt.upbit)
+        self.tracker = tracker
+        self.log     = logging.getLogger(self.__class__.__name__)
+
+    @property
+    def symbols(self) -> list:
+        """감시할 spot 심볼 – init(symbols=…) 로 받은 전부"""
+        return list(getattr(self.upbit, "scales", None) or ()) or [self.upbit.symbol]
+
+    def scale_of(self, symbol: str):
+        return getattr(self.upbit, "scales", {}).get(symbol, self.upbit.scale)
+
+    async def run(self):
+        raise NotImplementedError
+
+
+# ────────────────────────────── Upbit private WebSocket (myOrder / myAsset)
+class UpbitFillFeed(FillSource):
+    """
+    Upbit private WS 로 내 주문 체결을 push 받는다.
+    (재)접속 직후에는 resync(REST 폴러)를 한 번 돌려 끊긴 동안의 체결을 메운다.
+    """
+    URL  = "wss://api.upbit.com/websocket/v1/private"
+    DONE = ("done", "cancel")
+    RECONNECT_SEC = 5
+
+    def __init__(self, upbit, tracker: FillTracker, resync=None, url=None):
+        super().__init__(upbit, tracker)
+        self.URL    = rehost(self.URL, url)   # mock 거래소 (bench/loadtest.py)
+        self.resync = resync                 # UpbitOrderPoller | None
+        self.assets: Dict[str, dict] = {}    # currency → myAsset 최신값
+        self._scale: Dict[str, object] = {}  # market code → spot Scale
+
+    def _auth(self) -> dict:
+        ex = self.upbit.ccxt_ex
+        token = ex.jwt({"access_key": ex.apiKey, "nonce": ex.uuid()},
+                       ex.encode(ex.secret), "sha256")
+        return {"Authorization": f"Bearer {token}"}
+
+    async def run(self):
+        ex = self.upbit.ccxt_ex
+        self._scale = {ex.market_id(s): self.scale_of(s) for s in self.symbols}
+        while True:
+            try:
+                async with websockets.connect(self.URL, ping_interval=20,
+                                              additional_headers=self._auth()) as ws:
+                    await ws.send(json.dumps([
+                        {"ticket": "fills"},
+                        {"type": "myOrder", "codes": list(self._scale)},
+                        {"type": "myAsset"},
+                    ]))
+                    self.log.info("private WS connected")
+                    if self.resync:
+                        await self.resync._poll_once()
+                    async for raw in ws:
+                        await self._on_msg(json.loads(raw))
+            except Exception as e:
+                self.log.warning("private WS error: %s – reconnect in %s s", e, self.RECONNECT_SEC)
+                await asyncio.sleep(self.RECONNECT_SEC)
+
+    async def _on_msg(self, j: dict):
+        ty = j.get("type")
+        if ty == "myOrder":
+            oid, cid = j["uuid"], j.get("identifier")
+            if oid not in self.tracker.watch and cid not in self.tracker.watch:
+                return
+            side   = "buy" if j["ask_bid"] == "BID" else "sell"
+            sc     = self._scale.get(j.get("code"), self.upbit.scale)
+            filled = sc.qty(j["executed_volume"])
+            await self.tracker.update(oid, side, filled, j["state"] in self.DONE, cid)
+        elif ty == "myAsset":
+            for a in j.get("assets", ()):
+                self.assets[a["currency"]] = a
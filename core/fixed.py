@@ -0,0 +1,116 @@
+# core/fixed.py
+"""
+고정소수점 가격/수량.
+
+가격·수량을 10^dp 배 한 정수(int64 범위)로 들고 다닌다.
+  예) price_dp=2  →  60001.25 USDT == 6000125
+심볼별 dp / tick / lot 은 ccxt market 메타데이터에서 만든다 (Scale.from_market).
+float / Decimal 변환은 ExchWrapper(ccxt 경계)에서만 한다.
+"""
+import decimal as D
+from pydantic import BaseModel
+
+P10 = [10 ** i for i in range(40)]         # 10^dp 테이블
+
+TICK_SIZE = 4                              # ccxt.TICK_SIZE (precisionMode)
+
+
+def div_half_even(n: int, d: int) -> int:
+    """n / d 를 정수로 – Decimal 기본 rounding(ROUND_HALF_EVEN) 과 동일"""
+    if d < 0:
+        n, d = -n, -d
+    q, r = divmod(n, d)
+    r2 = r * 2
+    if r2 > d or (r2 == d and q & 1):
+        q += 1
+    return q
+
+
+def rescale(v: int, src_dp: int, dst_dp: int) -> int:
+    """dp 변경. 자릿수를 줄이는 경우 0 방향 절사 (ccxt amount_to_precision 과 동일)"""
+    if dst_dp >= src_dp:
+        return v * P10[dst_dp - src_dp]
+    p = P10[src_dp - dst_dp]
+    return v // p if v >= 0 else -(-v // p)
+
+
+def parse(s, dp: int) -> int:
+    """str / bytes / int / float / Decimal → 10^dp 정수 (초과 자릿수는 half-even)"""
+    if isinstance(s, (bytes, bytearray, memoryview)):
+        s = bytes(s).decode()
+    elif isinstance(s, float):
+        s = repr(s)                        # 최단 왕복 표현 – 2진 오차 제거
+    elif isinstance(s, int):
+        return s * P10[dp]
+    elif not isinstance(s, str):
+        return int(D.Decimal(s).scaleb(dp).to_integral_value(D.ROUND_HALF_EVEN))
+
+    ip, _, fp = s.partition(".")
+    if len(fp) > dp or "e" in s or "E" in s:
+        return int(D.Decimal(s).scaleb(dp).to_integral_value(D.ROUND_HALF_EVEN))
+    return int(ip + fp + "0" * (dp - len(fp))) if (ip or fp) else 0
+
+
+def _dp_of(step) -> int:
+    """0.01 → 2, 1 → 0, 5e-05 → 5"""
+    exp = D.Decimal(str(step)).normalize().as_tuple().exponent
+    return max(0, -exp)
+
+
+class Scale(BaseModel):
+    """심볼 하나의 가격/수량 스케일"""
+    price_dp: int = 8
+    qty_dp:   int = 8
+    tick:     int = 1          # 호가 단위 (price_dp 기준 정수)
+    lot:      int = 1          # 수량 단위 (qty_dp 기준 정수)
+
+    @classmethod
+    def from_market(cls, market: dict, precision_mode: int = TICK_SIZE) -> "Scale":
+        prec = market.get("precision") or {}
+        px, amt = prec.get("price"), prec.get("amount")
+        kw = {}
+        if precision_mode == TICK_SIZE:
+            if px:
+                kw["price_dp"] = _dp_of(px)
+                kw["tick"]     = parse(str(px), kw["price_dp"])
+            if amt:
+                kw["qty_dp"]   = _dp_of(amt)
+                kw["lot"]      = parse(str(amt), kw["qty_dp"])
+        else:                                  # DECIMAL_PLACES
+            if px is not None:
+                kw["price_dp"] = int(px)
+            if amt is not None:
+                kw["qty_dp"]   = int(amt)
+        return cls(**kw)
+
+    # ── 문자열/숫자 → 정수
+    def px(self, s) -> int:
+        return parse(s, self.price_dp)
+
+    def qty(self, s) -> int:
+        return parse(s, self.qty_dp)
+
+    # ── 호가·수량 단위 맞추기
+    def round_px(self, v: int) -> int:
+        """가장 가까운 tick (half-even)"""
+        return v if self.tick == 1 else div_half_even(v, self.tick) * self.tick
+
+    def floor_lot(self, v: int) -> int:
+        return v if self.lot == 1 else (v // self.lot) * self.lot
+
+    def qty_from(self, v: int, src_dp: int) -> int:
+        """다른 스케일의 수량 → 이 심볼의 lot 으로 절사"""
+        return self.floor_lot(rescale(v, src_dp, self.qty_dp))
+
+    # ── ccxt 경계 전용
+    def px_float(self, v: int) -> float:
+        return v / P10[self.price_dp]
+
+    def qty_float(self, v: int) -> float:
+        return v / P10[self.qty_dp]
+
+    def px_dec(self, v: int) -> D.Decimal:
+        return D.Decimal(v).scaleb(-self.price_dp)
+
+    def qty_dec(self, v: int) -> D.Decimal:
+        return D.Decimal(v).scaleb(-self.qty_dp)
@@ -1,23 +1,98 @@
-import asyncio, decimal as D, ccxt.async_support as ccxt
-from pydantic import BaseModel
+# core/fx.py
+"""
+USDT/KRW 환율.
+
+  stream : UpbitFeed 가 같은 WS 로 ticker(ws_code) 를 받아 on_frame() 으로 넘긴다
+           WS 환율이 fallback_ms 보다 오래되면 (거래 없음 / WS 끊김) REST fetch_ticker 로 보충
+  REST   : stream: false 면 poll_sec 마다 (예전 방식)
+           process 피드 모드 / source 가 spot venue 가 아니면 main 이 stream 을 끄고 이 방식으로
+  guard  : 마지막 갱신이 stale_ms 보다 오래되면 price 가 0 → OMS 가 수량 0 으로 호가를 거둔다
+"""
+import asyncio, logging, time
+
+import ccxt.async_support as ccxt
+from prometheus_client import Gauge
+
+from .codec     import upbit_ticker
+from .fixed     import Scale
+from .models    import FxCfg
+from .transport import get_transport
+from .ratelimit import Prio
+
+FX_RATE = Gauge("fx_rate", "USDT/KRW 환율")
+FX_AGE  = Gauge("fx_age_sec", "마지막 환율 갱신 후 경과 시간 (초)")
 
-class FxCfg(BaseModel):
-    source: str
-    symbol: str
-    poll_sec: int
 
 class FxPoller:
-    def __init__(self, cfg: FxCfg):
+    def __init__(self, cfg: FxCfg, ex=None, limiter=None, deadline_ms: int = 5000):
+        """
+        ex      : 이미 떠 있는 같은 venue 의 ccxt 클라이언트 (없으면 첫 REST 때 공용 풀로 만듦)
+        limiter : 같은 venue 의 RateScheduler – 최하위 우선순위, deadline 을 넘기면 이번 회차 생략
+        """
         self.cfg   = cfg
-        self.price = D.Decimal("0")         # 최신 환율 (USDT 1개당 KRW)
-        self._ex   = getattr(ccxt, cfg.source)()
+        self.limiter  = limiter
+        self.deadline = deadline_ms / 1000
+        self.scale = Scale(price_dp=8)      # KRW/USDT (Decimal 경로와 동일한 정밀도)
+        self.last  = 0                      # 최신 환율 (USDT 1개당 KRW, scale 기준 정수)
+        self.t_upd = 0.0                    # 마지막 갱신 (time.monotonic)
+        self.src   = ""                     # ws / rest
+        self.stale = False
+        self.code  = cfg.ws_code.encode()   # UpbitFeed 가 이 키의 프레임을 on_frame 으로
+        self._conv = self.scale.px
+        self._own  = ex is None
+        self._ex   = ex
+        self.log   = logging.getLogger("Fx")
+
+    # ── 조회 (OMS)
+    def age(self) -> float:
+        """초 – 아직 값이 없으면 inf"""
+        return time.monotonic() - self.t_upd if self.t_upd else float("inf")
+
+    @property
+    def price(self) -> int:
+        """stale_ms 안의 환율, 아니면 0 (호가 중단)"""
+        return self.last if self.age() * 1000 < self.cfg.stale_ms else 0
+
+    # ── 갱신
+    def _set(self, px: int, src: str):
+        self.last, self.t_upd, self.src = px, time.monotonic(), src
+        FX_RATE.set(self.scale.px_float(px))
+
+    def on_frame(self, raw: bytes, t_rx: int = 0):
+        """UpbitFeed 의 ticker 프레임"""
+        px = upbit_ticker(self._conv, raw)
+        if px:
+            self._set(px, "ws")
+
+    async def _poll(self):
+        if self.limiter and not await self.limiter.acquire("ticker", Prio.MONITOR, self.deadline):
+            return
+        if self._ex is None:                # REST 가 필요해졌을 때만 (stream 이면 보통 안 씀)
+            self._ex = getattr(ccxt, self.cfg.source)(
+                {"session": get_transport(self.cfg.source).session})
+        try:
+            tkr = await self._ex.fetch_ticker(self.cfg.symbol)
+            self._set(self.scale.px(tkr["last"]), "rest")
+        except Exception as e:
+            self.log.warning("REST fetch_ticker 실패: %s", e)
+
+    async def close(self):
+        if self._own and self._ex:
+            await self._ex.close()
 
     async def run(self):
+        c = self.cfg
+        period = c.fallback_ms / 1000 if c.stream else c.poll_sec
         while True:
-            try:
-                tkr   = await self._ex.fetch_ticker(self.cfg.symbol)
-                self.price = D.Decimal(str(tkr["last"]))
-            except Exception as e:
-                # 로깅 생략
-                pass
-            await asyncio.sleep(self.cfg.poll_sec)
+            if not c.stream or self.age() * 1000 >= c.fallback_ms:
+                await self._poll()
+            age = self.age()
+            FX_AGE.set(min(age, 1e9))
+            stale = age * 1000 >= c.stale_ms
+            if stale != self.stale:
+                self.stale = stale
+                if stale:
+                    self.log.error("환율 %.1f s 갱신 없음 – 호가 중단", age)
+                else:
+                    self.log.info("환율 회복 (%s) – 호가 재개", self.src)
+            await asyncio.sleep(period)
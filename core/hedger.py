@@ -0,0 +1,228 @@
+# core/hedger.py
+"""
+spot 체결 → 헷지 주문 사이의 순액(netting) 단계.
+
+  add()   : 체결을 pair 별 '필요한 헷지 수량'(spot Scale 정수, +buy / -sell)에 더한다
+            반대 방향 체결은 여기서 상쇄되어 주문이 나가지 않는다
+  flush() : window_ms 가 지나면 (또는 한 pair 의 미헷지 수량이 max_unhedged 에 닿으면 즉시)
+            모든 pair 의 잔량을 hedge lot 으로 절사해 주문
+            – 주문이 하나면 market(), 여럿이면 venue batch 주문 (ExchWrapper.market_many)
+            lot 미만 잔량은 버리지 않고 다음 flush 로 넘긴다
+  실패한 leg 는 수량을 되돌리고 retry_ms 후 다시 시도한다.
+  응답을 받지 못한 leg (timeout / 네트워크 오류 / batch chunk 실패) 는 되돌리기 전에 client order id 로
+  조회한다 – 들어간 주문이면 ack, 거래소에 없으면 되돌림, 조회도 실패하면 보류(_unknown)해 두고
+  다음 flush 에서 다시 조회한다 (보류 수량은 결과를 알 때까지 다시 보내지 않는다).
+  add() 는 flush 를 기다리지 않는다 (task 로 예약) – 헷지 응답을 기다리는 동안 들어온 체결은
+  다음 flush 에 모인다. 주문마다 client order id 를 붙여 batch 응답을 id 로 짝짓는다.
+
+router (core/router.py) 가 있으면 leg 마다 venue 를 골라 venue 별로 묶어 동시에 보낸다.
+실패한 venue 는 router 가 제외하므로 다른 venue 가 남아 있으면 retry_ms 를 기다리지 않고 바로 재시도.
+ack 된 수량은 ledger (core/ledger.py) 의 venue 별 헷지 포지션에 더한다.
+"""
+import asyncio, logging
+
+import ccxt.async_support as ccxt
+from prometheus_client import Counter, Gauge
+
+from .exchange import new_cid
+from .fixed  import rescale
+from .models import HedgeCfg
+from .trace  import tracer, now
+from .ratelimit import Prio
+
+HEDGE_FILLS  = Counter("hedge_fills_total", "헷지 대상 spot 체결 수")
+HEDGE_ORDERS = Counter("hedge_orders_total", "헷지 REST 호출 수", ["mode"])    # single / batch
+UNHEDGED     = Gauge("hedge_unhedged_qty", "아직 주문하지 않은 헷지 수량 (base)", ["symbol"])
+
+
+class _Leg:
+    __slots__ = ("ex", "spot_dp", "limit", "net", "t0")
+
+    def __init__(self, ex, spot_dp: int, limit: int):
+        self.ex      = ex                   # 심볼 전용 hedge ExchWrapper (view)
+        self.spot_dp = spot_dp
+        self.limit   = limit                # spot Scale 정수
+        self.net     = 0                    # 필요한 헷지 (+buy / -sell), spot Scale 정수
+        self.t0      = 0                    # 가장 오래된 미헷지 체결 감지 시각 (trace)
+
+
+class HedgeAggregator:
+    def __init__(self, venue, cfg: HedgeCfg, limiter=None, router=None, ledger=None):
+        self.venue  = venue                 # hedge venue ExchWrapper – batch 주문용
+        self.cfg    = cfg
+        self.limiter = limiter              # hedge venue RateScheduler | None
+        self.router = router                # HedgeRouter | None (primary 하나만)
+        self.ledger = ledger                # PositionLedger | None
+        self.legs: dict[str, _Leg] = {}     # hedge symbol → leg
+        self._timer = None
+        self._due   = 0.0                   # _timer 가 flush 할 loop.time()
+        self._inflight = set()              # 응답 대기 중인 flush 의 주문 묶음
+        self._unknown  = {}                 # cid → (venue, 주문) – 결과를 모르는 주문 (cid 조회 대기)
+        self.log    = logging.getLogger("Hedger")
+
+    def register(self, hedge, spot_scale, max_unhedged: float | None = None):
+        """pair 등록 – hedge : 심볼 전용 ExchWrapper, spot_scale : 체결 수량 Scale"""
+        lim = self.cfg.max_unhedged if max_unhedged is None else max_unhedged
+        self.legs[hedge.symbol] = _Leg(hedge, spot_scale.qty_dp, spot_scale.qty(lim))
+
+    async def add(self, symbol: str, spot_side: str, qty: int, t_fill: int = 0):
+        """spot 체결 qty (spot Scale 정수) – spot buy 는 hedge sell"""
+        leg = self.legs[symbol]
+        leg.net += -qty if spot_side == "buy" else qty
+        leg.t0 = leg.t0 or t_fill
+        HEDGE_FILLS.inc()
+        self._gauge(leg)
+        if abs(leg.net) >= leg.limit or not self.cfg.window_ms:
+            self._arm(0)
+        else:
+            self._arm(self.cfg.window_ms)
+
+    async def drain(self, symbol: str) -> int:
+        """응답 대기 중인 헷지 주문이 끝나길 기다렸다가 symbol 의 미헷지 잔량을 버린다 (emergency_flat)"""
+        while self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        await self._recheck()
+        leg = self.legs[symbol]
+        n   = sum(1 for _, o in self._unknown.values() if o[0] is leg)
+        if n:
+            self.log.error("%s 결과를 모르는 헷지 주문 %d 건 – 수량 미포함", symbol, n)
+        net, leg.net, leg.t0 = leg.net, 0, 0
+        self._gauge(leg)
+        return net
+
+    def _arm(self, ms: int):
+        """ms 뒤 flush 예약 – 이미 걸린 타이머(window_ms / retry_ms)가 더 늦으면 취소하고 당긴다"""
+        due = asyncio.get_running_loop().time() + ms / 1000
+        if self._timer is not None:
+            if self._due <= due:
+                return
+            self._timer.cancel()
+        self._due   = due
+        self._timer = asyncio.create_task(self._later(ms))
+
+    async def _later(self, ms: int):
+        await asyncio.sleep(ms / 1000)
+        self._timer = None
+        await self.flush()
+
+    def _gauge(self, leg: _Leg):
+        UNHEDGED.labels(leg.ex.symbol).set(leg.net / 10 ** leg.spot_dp)
+
+    async def flush(self):
+        """
+        잔량을 떼어 내는 부분은 await 없이 한 번에 – 앞 flush 의 응답을 기다리지 않고
+        바로 주문을 보낸다 (실패한 수량은 _send 가 되돌린다)
+        """
+        if self._unknown:
+            await self._recheck()
+            if self._unknown:
+                self._arm(self.cfg.retry_ms)
+        groups = {}                         # venue → [(leg, ex, side, hedge qty, spot qty ±, t0, cid)]
+        for leg in self.legs.values():
+            if not leg.net:
+                continue
+            side = "buy" if leg.net > 0 else "sell"
+            v    = self.router.pick(leg.ex.symbol, side) if self.router else None
+            ex   = v.view(leg.ex.symbol) if v else leg.ex
+            sc   = ex.scale
+            q    = sc.qty_from(abs(leg.net), leg.spot_dp)   # hedge lot 절사
+            if not q:
+                continue
+            sent = rescale(q, sc.qty_dp, leg.spot_dp)
+            sent = sent if leg.net > 0 else -sent
+            leg.net -= sent
+            groups.setdefault(v, []).append((leg, ex, side, q, sent, leg.t0, new_cid()))
+            leg.t0 = 0
+        if not groups:
+            return
+        t = asyncio.ensure_future(asyncio.gather(*(self._send(v, o) for v, o in groups.items())))
+        self._inflight.add(t)
+        t.add_done_callback(self._inflight.discard)
+        ok = await t
+        if not all(ok):
+            fast = self.router is not None and self.router.healthy()
+            self._arm(0 if fast else self.cfg.retry_ms)
+
+    async def _send(self, v, orders: list) -> bool:
+        """venue 하나로 주문 – 모두 성공하면 True"""
+        limiter = v.limiter if v else self.limiter
+        if limiter:
+            await limiter.acquire("order", Prio.NEW)
+        loop = asyncio.get_running_loop()
+        t0   = loop.time()
+        try:
+            if len(orders) == 1:
+                _, ex, side, q, _, _, cid = orders[0]
+                res = [await ex.market(side, q, cid=cid)]
+                HEDGE_ORDERS.labels("single").inc()
+            else:
+                res = await (v.ex if v else self.venue).market_many(
+                    [(ex.symbol, side, q, cid) for _, ex, side, q, _, _, cid in orders])
+                HEDGE_ORDERS.labels("batch").inc()
+        except Exception as e:
+            self.log.warning("hedge order error%s: %s", f" ({v.name})" if v else "", e)
+            res = [None] * len(orders)
+
+        by_cid = {r.get("clientOrderId"): r for r in res if r}
+        res    = [by_cid.get(o[6], r) for o, r in zip(orders, res)]    # venue 가 순서를 바꿔 돌려줘도 id 로
+        unk    = [k for k, r in enumerate(res) if r is None]
+        if unk:                             # 응답 없음 – 들어갔는지 cid 로 확인한 뒤에만 되돌린다
+            got = await asyncio.gather(*(self._lookup(v, orders[k]) for k in unk))
+            for k, r in zip(unk, got):
+                res[k] = r
+        done = True
+        for o, r in zip(orders, res):
+            if r is None:
+                self._unknown[o[6]] = (v, o)
+                self.log.warning("hedge %s 결과 모름 – 다음 flush 에 다시 조회", o[6])
+            done = self._apply(o, r) and done
+        if v and self.router:
+            if done:
+                self.router.ok(v, (loop.time() - t0) * 1000)
+            else:
+                self.router.fail(v, "order error")
+        return done
+
+    async def _lookup(self, v, order):
+        """cid 로 주문 조회 – 주문 dict / False (거래소에 없음) / None (조회 실패, 여전히 모름)"""
+        ex, cid = order[1], order[6]
+        limiter = v.limiter if v else self.limiter
+        if limiter:
+            await limiter.acquire("default", Prio.QUERY)
+        try:
+            r = await ex.order_by_cid(cid)
+        except ccxt.OrderNotFound:
+            return False
+        except Exception as e:
+            self.log.warning("hedge %s 조회 실패: %s", cid, e)
+            return None
+        if not r.get("filled") and r.get("status") in ("canceled", "expired", "rejected"):
+            return False
+        return r
+
+    async def _recheck(self):
+        """보류한 주문을 다시 조회 – 결과가 나온 것만 반영"""
+        pend = list(self._unknown.items())
+        got  = await asyncio.gather(*(self._lookup(v, o) for _, (v, o) in pend))
+        for (cid, (v, o)), r in zip(pend, got):
+            if r is not None and self._unknown.pop(cid, None):     # 동시에 돈 다른 flush 가 먼저 반영했으면 건너뜀
+                self._apply(o, r)
+
+    def _apply(self, order, r) -> bool:
+        """주문 결과 반영 – ack 면 ledger, 실패(False / rejected) 면 수량을 leg 로 되돌린다"""
+        leg, ex, side, q, sent, t0_fill, cid = order
+        if r is None:                       # 모름 – 보류 중 (되돌리지도 ack 하지도 않음)
+            return False
+        if r is False or r.get("status") == "rejected":
+            leg.net += sent                 # 되돌려 다음 flush 에 포함
+            leg.t0 = leg.t0 or t0_fill
+            self._gauge(leg)
+            return False
+        self.log.info("HEDGE %s %.8f %s@%s id=%s", side.upper(),
+                      ex.scale.qty_float(q), ex.symbol, ex.id, r.get("id"))
+        if self.ledger:
+            self.ledger.hedged(leg.ex.symbol, ex.id, sent)
+        if tracer.on:
+            tracer.span("fill_hedge_ack", t0_fill, now())
+        self._gauge(leg)
+        return True
@@ -0,0 +1,121 @@
+# core/journal.py
+"""
+메모리 맵 바이너리 틱 저널.
+
+세그먼트 파일 = 64 byte 헤더 + 고정 크기 레코드 × capacity
+  헤더   : magic, version, rec_size, capacity, count, created_ns, venue 별 price_dp / qty_dp
+  레코드 : ts_ex(ns) ts_rx(ns) venue bid ask bid_sz ask_sz   (가격·수량은 Scale 정수)
+
+쓰기는 mmap 에 struct.pack_into 한 번 + count 갱신이 전부 (JSON / 텍스트 없음).
+세그먼트가 가득 차면 새 파일로 교체한다.
+읽기는 read_segment() 가 NumPy structured array 로 zero-copy 노출한다.
+"""
+import mmap, os, struct, time, logging
+from pathlib import Path
+from typing import Iterator
+
+from .fixed import Scale
+
+MAGIC   = b"TKJ1"
+VERSION = 1
+HDR     = 64
+_HDR    = struct.Struct("<4sHHQQQ4B")           # magic ver rec_size capacity count created dps
+_CNT    = struct.Struct("<Q")
+CNT_OFF = 16                                    # count 위치
+_REC    = struct.Struct("<qqB7xqqqq")           # 56 byte
+REC     = _REC.size
+
+VENUES  = ("spot", "hedge")                     # venue 코드 = index
+VENUE_ID = {v: i for i, v in enumerate(VENUES)}
+
+# NumPy 쪽 레코드 정의 (_REC 와 1:1)
+DTYPE = [("ts_ex", "<i8"), ("ts_rx", "<i8"), ("venue", "u1"), ("_pad", "V7"),
+         ("bid", "<i8"), ("ask", "<i8"), ("bid_sz", "<i8"), ("ask_sz", "<i8")]
+
+
+class TickJournal:
+    def __init__(self, dir: str | Path, segment_records: int = 1 << 20,
+                 scales: dict[str, Scale] | None = None):
+        self.dir   = Path(dir)
+        self.cap   = segment_records
+        self.scale = {v: (scales or {}).get(v) or Scale() for v in VENUES}
+        self.log   = logging.getLogger("TickJournal")
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self._mm   = None
+        self._fd   = None
+        self._n    = 0
+        self._seq  = 0
+        self._rotate()
+
+    def _rotate(self):
+        self.close()
+        self._seq += 1
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path  = self.dir / f"ticks-{stamp}-{self._seq:04d}.tkj"
+        size  = HDR + self.cap * REC
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        os.ftruncate(self._fd, size)
+        self._mm = mmap.mmap(self._fd, size)
+        dps = []
+        for v in VENUES:
+            dps += [self.scale[v].price_dp, self.scale[v].qty_dp]
+        _HDR.pack_into(self._mm, 0, MAGIC, VERSION, REC, self.cap, 0, time.time_ns(), *dps)
+        self._n = 0
+        self.path = path
+        self.log.info("segment %s", path.name)
+
+    def append(self, venue: int, ts_ex: int, ts_rx: int,
+               bid: int, ask: int, bid_sz: int = 0, ask_sz: int = 0):
+        if self._n == self.cap:
+            self._rotate()
+        _REC.pack_into(self._mm, HDR + self._n * REC,
+                       ts_ex, ts_rx, venue, bid, ask, bid_sz, ask_sz)
+        self._n += 1
+        _CNT.pack_into(self._mm, CNT_OFF, self._n)
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.flush()
+            self._mm.close()
+            os.close(self._fd)
+            self._mm = self._fd = None
+
+
+class TickRecorder:
+    """feed 뒤에 붙는 기록 단계 – extras(raw) 로 수량 / 거래소 시각을 뽑아 저널에 추가"""
+    __slots__ = ("journal", "venue", "extras")
+
+    def __init__(self, journal: TickJournal, venue: str, extras):
+        self.journal = journal
+        self.venue   = VENUE_ID[venue]
+        self.extras  = extras               # codec.get_extras(...)
+
+    def record(self, raw, quote, ts_rx: int):
+        bid_sz, ask_sz, ts_ms = self.extras(raw)
+        self.journal.append(self.venue, ts_ms * 1_000_000, ts_rx,
+                            quote[0], quote[1], bid_sz, ask_sz)
+
+
+# ────────────────────────────── 읽기
+def header(path: str | Path) -> dict:
+    with open(path, "rb") as f:
+        magic, ver, rec, cap, n, created, *dps = _HDR.unpack(f.read(_HDR.size))
+    if magic != MAGIC:
+        raise ValueError(f"not a tick journal: {path}")
+    scales = {v: Scale(price_dp=dps[2 * i], qty_dp=dps[2 * i + 1])
+              for i, v in enumerate(VENUES)}
+    return {"version": ver, "rec_size": rec, "capacity": cap, "count": n,
+            "created_ns": created, "scale": scales}
+
+
+def read_segment(path: str | Path):
+    """세그먼트를 NumPy structured array 로 (np.memmap – 복사 없음)"""
+    import numpy as np                   # 선택 의존성 – 읽을 때만 필요
+    h = header(path)
+    return np.memmap(path, dtype=np.dtype(DTYPE), mode="r",
+                     offset=HDR, shape=(h["count"],))
+
+
+def segments(dir: str | Path) -> Iterator[Path]:
+    """dir 안의 세그먼트를 시간 순으로"""
+    return iter(sorted(Path(dir).glob("ticks-*.tkj")))
@@ -0,0 +1,171 @@
+# core/ledger.py
+"""
+pair 별 포지션 / 순노출 장부 (메모리, 증분 갱신).
+
+  fill()    : spot 체결 (OMS._fill_loop)               spot += ±qty
+  hedged()  : 헷지 주문 ack (HedgeAggregator._send)    hedge[venue] += ±qty
+  net()     : spot + Σ hedge – 아직 헷지되지 않은 노출, O(1)
+  수량은 모두 pair 의 spot Scale 정수 (HedgeAggregator 가 hedge lot 을 spot 자릿수로 되돌린 값).
+  값은 이번 세션 시작 이후 증감 – 기동 전 잔고 / 포지션은 첫 대사 때 baseline 으로 잡는다.
+
+대사 (run) : reconcile_sec 마다 spot 잔고(fetch_balance) / 헷지 포지션(fetch_positions) 을 조회해
+  (거래소 값 - baseline) 과 장부를 비교. 조회 중 장부가 바뀌었으면 (체결이 오가는 중) 그 항목은 건너뛰고,
+  tolerance 를 넘는 차이가 2 회 연속이면 거래소 값을 채택한다. 대사는 emergency_flat 경로에 없다.
+"""
+import asyncio, logging
+
+from prometheus_client import Counter, Gauge
+
+from .models    import LedgerCfg
+from .ratelimit import Prio, get_scheduler
+
+POS_Q   = Gauge("ledger_position_qty", "세션 시작 이후 포지션 (base)", ["symbol", "venue"])
+NET_Q   = Gauge("ledger_net_exposure", "spot + 헷지 순노출 (base)", ["symbol"])
+DRIFT_C = Counter("ledger_drift_total", "대사에서 거래소 값으로 고친 횟수", ["venue"])
+
+
+class _Pos:
+    __slots__ = ("symbol", "spot_ex", "dp", "spot", "hedge", "net", "seq")
+
+    def __init__(self, spot_ex, hedge_symbol: str):
+        self.symbol  = hedge_symbol
+        self.spot_ex = spot_ex              # 심볼 전용 spot ExchWrapper
+        self.dp      = spot_ex.scale.qty_dp
+        self.spot    = 0
+        self.hedge   = {}                   # venue id → 포지션
+        self.net     = 0
+        self.seq     = 0                    # 갱신마다 +1 (대사 중 변경 감지)
+
+
+class PositionLedger:
+    def __init__(self, cfg: LedgerCfg):
+        self.cfg    = cfg
+        self.pos: dict[str, _Pos] = {}      # hedge symbol → pair 장부
+        self.venues = {}                    # hedge venue id → ExchWrapper (flatten / 대사)
+        self.base   = {}                    # (venue, 키) → 세션 시작 시 거래소 값 (spot Scale 정수)
+        self._miss  = {}                    # (venue, 키) → 연속 불일치 횟수
+        self.log    = logging.getLogger("Ledger")
+
+    def register(self, spot, hedge):
+        """pair 등록 – spot / hedge : 심볼 전용 ExchWrapper"""
+        self.pos[hedge.symbol] = _Pos(spot, hedge.symbol)
+        self.venues.setdefault(hedge.id, hedge)
+
+    def add_venue(self, ex):
+        """헷지 venue 추가 (HedgeRouter backup)"""
+        self.venues.setdefault(ex.id, ex)
+
+    # ── 갱신 (루프 스레드, await 없음)
+    def fill(self, symbol: str, spot_side: str, qty: int):
+        p = self.pos[symbol]
+        d = qty if spot_side == "buy" else -qty
+        p.spot += d
+        p.net  += d
+        p.seq  += 1
+        self._gauge(p, p.spot_ex.id, p.spot)
+
+    def hedged(self, symbol: str, venue: str, qty: int):
+        """qty : spot Scale 정수, +buy / -sell"""
+        p = self.pos[symbol]
+        h = p.hedge[venue] = p.hedge.get(venue, 0) + qty
+        p.net += qty
+        p.seq += 1
+        self._gauge(p, venue, h)
+
+    def _gauge(self, p: _Pos, venue: str, q: int):
+        POS_Q.labels(p.symbol, venue).set(q / 10 ** p.dp)
+        NET_Q.labels(p.symbol).set(p.net / 10 ** p.dp)
+
+    # ── 조회
+    def net(self, symbol: str) -> int:
+        return self.pos[symbol].net
+
+    def spot(self, symbol: str) -> int:
+        return self.pos[symbol].spot
+
+    def hedge(self, symbol: str) -> dict[str, int]:
+        return dict(self.pos[symbol].hedge)
+
+    # ── 대사
+    def _check(self, p: _Pos, venue: str, key, have: int, ours: int, moved: bool) -> int | None:
+        """거래소 값 have 와 장부 ours 비교 – 고쳐야 할 세션 값을 돌려준다 (없으면 None)"""
+        if moved:
+            return None                     # 조회 중 체결 / ack – 다음 회차에
+        k = (venue, key)
+        if k not in self.base:
+            self.base[k] = have - ours      # 첫 대사: 기동 전 잔고 / 포지션
+            return None
+        want = have - self.base[k]
+        if abs(want - ours) <= self.cfg.tolerance * 10 ** p.dp:
+            self._miss.pop(k, None)
+            return None
+        n = self._miss[k] = self._miss.get(k, 0) + 1
+        if n < 2:
+            return None
+        self._miss.pop(k, None)
+        DRIFT_C.labels(venue).inc()
+        self.log.warning("%s %s 장부 %.8f ≠ 거래소 %.8f – 거래소 값 채택", venue, p.symbol,
+                         ours / 10 ** p.dp, want / 10 ** p.dp)
+        return want
+
+    async def _slot(self, venue: str) -> bool:
+        return await get_scheduler(venue).acquire("default", Prio.MONITOR,
+                                                  self.cfg.deadline_ms / 1000)
+
+    async def _spot(self):
+        """spot 잔고 – 같은 base 를 쓰는 pair 는 합쳐서 비교하고 차이는 첫 pair 에 반영"""
+        by_ex = {}
+        for p in self.pos.values():
+            by_ex.setdefault(p.spot_ex.id, []).append(p)
+        for venue, ps in by_ex.items():
+            ex = ps[0].spot_ex.ccxt_ex
+            if not await self._slot(venue):
+                continue
+            seqs = [p.seq for p in ps]
+            bal  = (await ex.fetch_balance()).get("total", {})
+            byb  = {}                       # base 통화 → [(pair, 조회 전 seq)]
+            for p, s in zip(ps, seqs):
+                byb.setdefault(ex.market(p.spot_ex.symbol)["base"], []).append((p, s))
+            for base, grp in byb.items():
+                p0   = grp[0][0]
+                have = round(float(bal.get(base) or 0) * 10 ** p0.dp)
+                ours = sum(p.spot for p, _ in grp)
+                want = self._check(p0, venue, base, have, ours, any(p.seq != s for p, s in grp))
+                if want is not None:
+                    d = want - ours
+                    p0.spot += d
+                    p0.net  += d
+                    p0.seq  += 1
+                    self._gauge(p0, venue, p0.spot)
+
+    async def _hedge(self, venue: str, ex):
+        if not await self._slot(venue):
+            return
+        ps   = list(self.pos.values())
+        seqs = [p.seq for p in ps]
+        have = {}
+        for r in await ex.ccxt_ex.fetch_positions([p.symbol for p in ps]):
+            q = float(r.get("contracts") or 0) * float(r.get("contractSize") or 1)
+            have[r["symbol"]] = have.get(r["symbol"], 0.0) + (-q if r.get("side") == "short" else q)
+        for p, s in zip(ps, seqs):
+            ours = p.hedge.get(venue, 0)
+            want = self._check(p, venue, p.symbol, round(have.get(p.symbol, 0.0) * 10 ** p.dp),
+                               ours, p.seq != s)
+            if want is not None:
+                p.hedge[venue] = want
+                p.net += want - ours
+                p.seq += 1
+                self._gauge(p, venue, want)
+
+    async def reconcile(self):
+        res = await asyncio.gather(self._spot(),
+                                   *(self._hedge(v, ex) for v, ex in self.venues.items()),
+                                   return_exceptions=True)
+        for r in res:
+            if isinstance(r, Exception):
+                self.log.warning("대사 실패: %s", r)
+
+    async def run(self):
+        while True:
+            await self.reconcile()
+            await asyncio.sleep(self.cfg.reconcile_sec)
@@ -0,0 +1,170 @@
+# core/liveness.py
+"""
+수신 데이터 기반 venue 생존 판정 – REST ping 주기(Monitor)를 기다리지 않고 check_ms 마다.
+
+  신호 (venue 별)
+    feed_age   : 마지막 WS 프레임 (MarketBus.t_last) 또는 WS pong 이후 경과
+                 process 피드는 자식이 공유 메모리에 쓰는 프레임 heartbeat 를 ShmBridge 가 t_last 로 옮긴다
+    ws_rtt     : 피드 소켓에 ping_ms 마다 보낸 WS ping 왕복 (응답이 없으면 timeout 값)
+    rest_p99   : 실제 주문 / 취소 REST 왕복 p99 (Transport.rtt, rest_window_sec 안, 샘플이 적으면 생략)
+    rest_stall : 응답 없이 걸려 있는 가장 오래된 REST 요청
+    ex_lag     : 거래소 이벤트 시각 → 수신 (|시계 차이 + 지연|, 피드가 샘플링)
+  신호마다 (pause, dead) 임계값 → venue 등급 0 정상 / 1 pause / 2 dead
+
+  반응 (단계별)
+    헷지 venue 등급 ≥ 1, 다른 헷지 venue 정상  → HedgeRouter 에서 제외 (switch) – 호가는 계속
+    spot 등급 ≥ 1 또는 정상인 헷지 venue 없음  → 모든 OMS 호가 중단 (pause) – 체결 헷지는 계속
+    모든 헷지 venue dead                        → emergency_flat 후 예외 (Monitor 와 같이 종료)
+    spot 이 dead 여도 flat 하지 않는다 – spot 을 못 닫는 채로 헷지만 닫으면 노출이 커진다
+  모든 신호가 recover_ms 동안 정상이면 호가 재개 / venue 복귀.
+"""
+import asyncio, logging, time
+
+from prometheus_client import Gauge
+
+from .models import LivenessCfg
+
+LEVEL   = Gauge("liveness_level", "venue 등급 (0 정상 / 1 pause / 2 dead)", ["venue"])
+SIGNAL  = Gauge("liveness_signal_ms", "venue 별 생존 신호 (ms)", ["venue", "signal"])
+STATE   = Gauge("liveness_state", "호가 상태 (0 정상 / 1 pause / 2 flat)")
+
+SIGNALS = ("feed_age", "ws_rtt", "rest_p99", "rest_stall", "ex_lag")
+
+
+class VenueProbe:
+    """venue 하나의 신호 출처"""
+    def __init__(self, name: str, role: str, bus, feed=None, transport=None, hedge=None):
+        self.name      = name
+        self.role      = role               # "spot" | "hedge"
+        self.bus       = bus                # t_last[role] – 이 venue 의 마지막 수신
+        self.feed      = feed               # AbstractFeed | None (process 피드면 None)
+        self.transport = transport          # core.transport.Transport | None
+        self.hedge     = hedge              # HedgeRouter 의 HedgeVenue | None
+        self.rtt       = 0.0                # 마지막 WS ping 왕복 (ms)
+        self.t_pong    = 0                  # 마지막 pong (ns)
+        self.level     = 0
+        self.t_ok      = 0.0                # 등급 0 이 시작된 loop.time()
+        self.held      = False              # liveness 가 router 에서 뺀 상태
+
+
+class Liveness:
+    def __init__(self, probes: list[VenueProbe], oms: list, cfg: LivenessCfg, router=None):
+        self.probes = probes
+        self.spot   = [p for p in probes if p.role == "spot"]
+        self.hedges = [p for p in probes if p.role == "hedge"]
+        self.oms    = oms
+        self.cfg    = cfg
+        self.router = router
+        self.state  = 0                     # 0 정상 / 1 pause
+        self.t_ok   = 0.0                   # 전체 정상이 시작된 loop.time()
+        self.t0     = 0                     # 시작 시각 (ns) – 한 번도 수신하지 못한 피드의 기준
+        self.log    = logging.getLogger("Liveness")
+
+    # ── 신호
+    def _rest(self, p: VenueProbe, t: float) -> tuple[float, float]:
+        tp = p.transport
+        if tp is None:
+            return 0.0, 0.0
+        lo   = t - self.cfg.rest_window_sec
+        smp  = sorted(ms for te, ms in tp.rtt if te >= lo)
+        p99  = smp[int(len(smp) * 0.99)] if len(smp) >= self.cfg.rest_min_samples else 0.0
+        st   = min(tp.pending.values(), default=t)
+        return p99, (t - st) * 1000
+
+    def signals(self, p: VenueProbe, t: float, t_ns: int) -> dict[str, float]:
+        p99, stall = self._rest(p, t)
+        last = max(p.bus.t_last[p.role], p.t_pong, self.t0)
+        return {"feed_age":   (t_ns - last) / 1e6,
+                "ws_rtt":     p.rtt,
+                "rest_p99":   p99,
+                "rest_stall": stall,
+                "ex_lag":     abs(p.feed.ex_lag) if p.feed is not None else 0.0}
+
+    def grade(self, p: VenueProbe, t: float, t_ns: int) -> tuple[int, str]:
+        lv, why = 0, ""
+        for name, v in self.signals(p, t, t_ns).items():
+            SIGNAL.labels(p.name, name).set(v)
+            pause, dead = getattr(self.cfg, name + "_ms")
+            k = 2 if dead and v > dead else 1 if pause and v > pause else 0
+            if k > lv:
+                lv, why = k, f"{name} {v:.0f} ms"
+        return lv, why
+
+    # ── WS ping
+    async def _ping(self, p: VenueProbe):
+        _, dead = self.cfg.ws_rtt_ms
+        while True:
+            await asyncio.sleep(self.cfg.ping_ms / 1000)
+            ws = p.feed.ws
+            if ws is None:
+                continue
+            try:
+                pong = await ws.ping()
+                p.rtt = await asyncio.wait_for(pong, (dead or 5000) / 1000) * 1000
+                p.t_pong = time.time_ns()
+            except asyncio.TimeoutError:
+                p.rtt = dead or 5000
+            except Exception:
+                pass                        # 닫힌 소켓 – 피드가 재접속, feed_age 가 판정
+
+    # ── 반응
+    async def check(self):
+        loop = asyncio.get_running_loop()
+        t, t_ns, why = loop.time(), time.time_ns(), []
+        for p in self.probes:
+            lv, r = self.grade(p, t, t_ns)
+            if lv != p.level:
+                (self.log.warning if lv else self.log.info)("%s %s → %s %s", p.name,
+                                                            p.level, lv, r)
+                p.level = lv
+                if not lv:
+                    p.t_ok = t
+            LEVEL.labels(p.name).set(lv)
+            if lv:
+                why.append(f"{p.name}: {r}")
+
+        # switch – 아픈 헷지 venue 를 라우팅에서 뺀다
+        if self.router:
+            for p in self.hedges:
+                if p.hedge is None:
+                    continue
+                if p.level:
+                    self.router.hold(p.hedge, "liveness")
+                    p.held = True
+                elif p.held and t - p.t_ok >= self.cfg.recover_ms / 1000:
+                    self.router.release(p.hedge)
+                    p.held = False
+
+        if self.hedges and all(p.level == 2 for p in self.hedges):
+            STATE.set(2)
+            self.log.error("헷지 venue 모두 dead – emergency_flat (%s)", "; ".join(why))
+            await asyncio.gather(*(o.emergency_flat() for o in self.oms))
+            raise RuntimeError("liveness: hedge venues dead")
+
+        if any(p.level for p in self.spot) or not any(p.level == 0 for p in self.hedges):
+            self.t_ok = 0.0
+            if self.state == 0:
+                self.state = 1
+                STATE.set(1)
+                await asyncio.gather(*(o.pause("; ".join(why)) for o in self.oms))
+            return
+
+        if self.state == 1:
+            self.t_ok = self.t_ok or t
+            if t - self.t_ok >= self.cfg.recover_ms / 1000:
+                self.state = 0
+                STATE.set(0)
+                self.log.info("모든 venue 정상 %.1f s – 호가 재개", t - self.t_ok)
+                for o in self.oms:
+                    o.resume()
+
+    async def run(self):
+        self.t0 = time.time_ns()
+        pings = [asyncio.create_task(self._ping(p)) for p in self.probes if p.feed is not None]
+        try:
+            while True:
+                await self.check()
+                await asyncio.sleep(self.cfg.check_ms / 1000)
+        finally:
+            for k in pings:
+                k.cancel()
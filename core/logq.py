@@ -0,0 +1,154 @@
+# core/logq.py
+"""
+이벤트 루프 밖에서 쓰는 로깅.
+
+  호출 쪽 (루프 스레드) : filter (sample / rate) → QueueHandler 가 레코드를 그대로 큐에 넣고 끝
+                          메시지 포맷(msg % args)은 하지 않는다 – 큐가 차면 버리고 개수만 센다
+                          (log_queue_dropped_total, 그리고 다음에 큐에 들어가는 레코드의 dropped)
+  writer 스레드         : QueueListener 가 꺼내 포맷 → 콘솔 (텍스트) / JSON-lines 파일
+  sample : logger 별 N 개 중 1 개만 (틱마다 찍는 DEBUG 용)
+  rate   : logger 별 초당 최대 개수 (틱마다 찍는 INFO 폭주 방지) – 넘친 개수는 다음 통과 레코드에 dropped 로 붙인다
+  WARNING 이상은 sample / rate 와 상관없이 항상 통과 (헷지 실패 / EMERGENCY FLAT 이 묻히지 않게).
+
+설정 키는 logger 이름의 "[" 앞까지 (OMS[USDT/BTC] → OMS), 개수는 logger 마다 (pair 별로) 따로 센다.
+포맷을 writer 스레드에서 하므로 args 로 넘긴 가변 객체는 나중 상태로 찍힐 수 있다 (숫자 / 문자열은 무관).
+"""
+import json, logging, logging.handlers, queue, sys
+
+from prometheus_client import Counter
+
+from .models import LogCfg
+
+try:                                    # 선택 의존성
+    import orjson
+    _dumps = lambda o: orjson.dumps(o, default=str).decode()
+except ImportError:                     # pragma: no cover
+    _dumps = lambda o: json.dumps(o, default=str, ensure_ascii=False)
+
+TEXT_FMT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+Q_DROP   = Counter("log_queue_dropped_total", "로그 큐가 가득 차 버린 레코드 수")
+
+
+class _QHandler(logging.handlers.QueueHandler):
+    """포맷 없이 레코드를 넣는다 (stdlib prepare() 는 호출 스레드에서 msg % args 를 만든다)"""
+    def __init__(self, q):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        """큐가 차서 버린 개수는 다음에 들어가는 레코드의 dropped 에 더한다 (RateFilter 와 같은 필드)"""
+        own = getattr(record, "dropped", 0)             # RateFilter 가 붙인 개수
+        if self.dropped:
+            record.dropped = own + self.dropped
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1 + own                     # 붙어 있던 개수도 함께 넘긴다
+            Q_DROP.inc()
+            return
+        self.dropped = 0
+
+
+class SampleFilter(logging.Filter):
+    """logger 이름 → N : N 개 중 1 개만 통과 (INFO / DEBUG)"""
+    def __init__(self, every: dict[str, int]):
+        super().__init__()
+        self.every = every
+        self.n     = {}
+
+    def filter(self, record) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        k = self.every.get(record.name.partition("[")[0])
+        if not k or k <= 1:
+            return True
+        c = self.n[record.name] = self.n.get(record.name, 0) + 1
+        return c % k == 1
+
+
+class RateFilter(logging.Filter):
+    """logger 이름 → 초당 최대 개수 (INFO / DEBUG, token bucket, burst = 1 초 분량)"""
+    def __init__(self, per_sec: dict[str, float]):
+        super().__init__()
+        self.rate = per_sec
+        self.b    = {}                      # logger 이름 (pair 포함) → [tokens, last, dropped]
+
+    def filter(self, record) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        r = self.rate.get(record.name.partition("[")[0])
+        if not r:
+            return True
+        t = record.created
+        b = self.b.get(record.name)
+        if b is None:
+            b = self.b[record.name] = [r, t, 0]
+        b[0] = min(r, b[0] + (t - b[1]) * r)
+        b[1] = t
+        if b[0] < 1:
+            b[2] += 1
+            return False
+        b[0] -= 1
+        if b[2]:
+            record.dropped, b[2] = b[2], 0
+        return True
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """한 줄에 레코드 하나 – {"t","lvl","name","msg"[,"dropped"][,"exc"]}"""
+    def format(self, record) -> str:
+        o = {"t": round(record.created, 6), "lvl": record.levelname,
+             "name": record.name, "msg": record.getMessage()}
+        if getattr(record, "dropped", 0):
+            o["dropped"] = record.dropped
+        if record.exc_info:
+            o["exc"] = self.formatException(record.exc_info)
+        return _dumps(o)
+
+
+class _TextFormatter(logging.Formatter):
+    def format(self, record) -> str:
+        s = super().format(record)
+        d = getattr(record, "dropped", 0)
+        return f"{s} (+{d} dropped)" if d else s
+
+
+def setup_logging(level: str = "INFO", cfg: LogCfg | None = None):
+    """
+    root logger 를 큐 기반으로 바꾼다. 반환값 listener 는 종료 시 stop() (남은 레코드 flush).
+    cfg.queue: false 면 예전처럼 동기 StreamHandler 만.
+    """
+    cfg  = cfg or LogCfg()
+    root = logging.getLogger()
+    root.setLevel(level)
+    for h in list(root.handlers):
+        root.removeHandler(h)
+
+    sinks = []
+    if cfg.console:
+        h = logging.StreamHandler(sys.stderr)
+        h.setFormatter(_TextFormatter(TEXT_FMT))
+        sinks.append(h)
+    if cfg.json_path:
+        h = logging.FileHandler(cfg.json_path, encoding="utf-8")
+        h.setFormatter(JsonLinesFormatter())
+        sinks.append(h)
+
+    if not cfg.queue:
+        for h in sinks:
+            h.addFilter(SampleFilter(cfg.sample))
+            h.addFilter(RateFilter(cfg.rate))
+            root.addHandler(h)
+        return None
+
+    qh = _QHandler(queue.Queue(cfg.queue_size))
+    qh.addFilter(SampleFilter(cfg.sample))
+    qh.addFilter(RateFilter(cfg.rate))
+    root.addHandler(qh)
+    listener = logging.handlers.QueueListener(qh.queue, *sinks, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -0,0 +1,72 @@
+# core/markets.py
+"""
+ccxt market 메타데이터 디스크 캐시.
+
+  load_markets() 는 venue 의 모든 market 을 내려받는다 (수 초). 재시작 때는
+  data/markets/<venue>.json 에 저장해 둔 설정 심볼의 market 만 set_markets() 로 넣고 바로 시작한다.
+    - 캐시에 모든 심볼이 있으면 : 그대로 사용, ttl_sec 이 지났으면 백그라운드에서 갱신
+    - 없으면                    : load_markets() 후 설정 심볼만 저장
+  ccxt 는 markets 가 채워져 있으면 주문 전에 다시 load_markets() 를 하지 않는다.
+"""
+import asyncio, json, logging, os, time
+from pathlib import Path
+
+from .models import MarketCfg
+
+
+class MarketCache:
+    def __init__(self, cfg: MarketCfg):
+        self.cfg   = cfg
+        self.dir   = Path(cfg.cache_dir)
+        self.log   = logging.getLogger("MarketCache")
+        self._bg   = set()                  # 백그라운드 갱신 task (GC 방지)
+
+    def _path(self, venue: str) -> Path:
+        return self.dir / f"{venue}.json"
+
+    def _read(self, venue: str) -> dict | None:
+        try:
+            return json.loads(self._path(venue).read_text())
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, venue: str, markets: dict):
+        self.dir.mkdir(parents=True, exist_ok=True)
+        p, tmp = self._path(venue), self._path(venue).with_suffix(".tmp")
+        tmp.write_text(json.dumps({"ts": time.time(), "markets": markets}, default=str))
+        os.replace(tmp, p)                  # 쓰는 도중 죽어도 이전 캐시는 온전
+
+    async def load(self, ex, symbols: list[str]) -> str:
+        """
+        ex(ccxt 클라이언트) 에 symbols 의 market 을 채운다 → "hit" | "stale" | "miss"
+        """
+        data = self._read(ex.id) if self.cfg.enabled else None
+        if data and all(s in data["markets"] for s in symbols):
+            ex.set_markets(list(data["markets"].values()))
+            if time.time() - data["ts"] < self.cfg.ttl_sec:
+                return "hit"
+            t = asyncio.create_task(self.refresh(ex, symbols))
+            self._bg.add(t)
+            t.add_done_callback(self._bg.discard)
+            return "stale"
+        await self.refresh(ex, symbols)
+        return "miss"
+
+    async def refresh(self, ex, symbols: list[str]):
+        """전체 load_markets() 후 설정 심볼만 저장 (백그라운드 갱신이면 실패해도 캐시 유지)"""
+        try:
+            await ex.load_markets(reload=True)
+        except Exception as e:
+            if ex.markets:
+                self.log.warning("%s market 갱신 실패 – 캐시 사용: %s", ex.id, e)
+                return
+            raise
+        keep = {}
+        for s in symbols:
+            try:
+                keep[s] = ex.market(s)
+            except Exception:
+                self.log.warning("%s: %s market 없음", ex.id, s)
+        if self.cfg.enabled and keep:
+            self._write(ex.id, keep)
+            self.log.info("%s market 캐시 저장 (%d 심볼)", ex.id, len(keep))
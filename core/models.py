@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 from pathlib   import Path
 from typing    import Optional, Literal
 import yaml, decimal as D
@@ -8,11 +8,18 @@ class RuntimeCfg(BaseModel):
     cancel_tps:int
     log_level: str
     run_mode:  Literal["SIM", "LIVE"] = "LIVE"   # ★ 추가
+    decoder:   Literal["scan", "json", "legacy"] = "json"   # 피드 디코더 (core/codec.py)
+    feeds:     Literal["inproc", "process"] = "inproc"      # process: 피드를 자식 프로세스로 (core/feedproc.py)
+    feed_poll_us: int = 50                  # process 모드에서 공유 메모리 확인 주기 (0 = 매 루프)
+    uvloop:    bool = False                 # uvloop 가 설치돼 있으면 사용
+    ttfq_target_sec: float = 3.0            # 기동 → 첫 호가 목표 (core/startup.py)
+    metrics_port: int = 9100                # Prometheus (0 = 띄우지 않음)
 
 class StratCfg(BaseModel):
     bp_threshold: float = Field(..., gt=0)     # %
     order_size_krw: int  = Field(..., gt=0)
     hedge_leverage: int  = Field(1, gt=0)   # 기본 1 배
+    requote_bp: float    = Field(0, ge=0)   # 걸린 호가와 이 이내 차이면 재호가 안 함 (bp)
     
     @property
     def band(self) -> D.Decimal:
@@ -22,17 +29,164 @@ class ExchDef(BaseModel):
     id: str
     symbol: str
     ws_stream: Optional[str] = None          # spot엔 필요 없음
+    rest_url: Optional[str] = None           # REST scheme://host 대체 (mock 거래소 – bench/loadtest.py)
+    ws_url:   Optional[str] = None           # WS scheme://host 대체
+
+def perp(symbol: str) -> str:
+    """ccxt 무기한 선물 심볼 – settle 이 없으면 quote 로 (BTC/USDT → BTC/USDT:USDT)"""
+    return symbol if ":" in symbol else f"{symbol}:{symbol.split('/')[1]}"
+
+class PairDef(BaseModel):
+    spot:  str                              # 현물 심볼 (Upbit, 예: USDT/BTC)
+    hedge: str                              # 헷지 심볼 (예: BTC/USDT)
+    ws_code:   Optional[str] = None         # Upbit WS 코드 – 없으면 spot 에서 (USDT/BTC → USDT-BTC)
+    ws_stream: Optional[str] = None         # Binance 스트림 – 없으면 hedge 에서 (btcusdt@bookTicker)
+    ws_backup: Optional[str] = None         # Bybit topic – 없으면 hedge 에서 (orderbook.1.BTCUSDT)
+    max_unhedged: Optional[float] = None    # 없으면 hedge.max_unhedged
+
+    @model_validator(mode="after")
+    def _fill(self):
+        self.hedge     = perp(self.hedge)
+        self.ws_code   = self.ws_code or self.spot.replace("/", "-")
+        sym            = self.hedge.split(':')[0].replace('/', '')
+        self.ws_stream = self.ws_stream or f"{sym.lower()}@bookTicker"
+        self.ws_backup = self.ws_backup or f"orderbook.1.{sym.upper()}"
+        return self
+
+    @property
+    def name(self) -> str:
+        return self.ws_code
 
 class FxCfg(BaseModel):
     source: str
     symbol: str
-    poll_sec: int = 10
+    poll_sec: int = 10                      # stream: false 일 때 REST 주기
+    stream: bool = True                     # UpbitFeed WS 에 ticker 로 같이 구독 (REST 는 fallback)
+    ws_code: str = "KRW-USDT"               # Upbit ticker 코드
+    fallback_ms: int = 3000                 # WS 환율이 이보다 오래되면 REST 로 보충
+    stale_ms: int = 15000                   # 이보다 오래된 환율이면 호가 중단 (OMS 수량 0)
+
+class FillCfg(BaseModel):
+    source:  Literal["ws", "rest"] = "ws"  # ws: private myOrder push / rest: 일괄 폴링
+    poll_ms: int = 1000                     # rest 폴링 주기
+
+class TransportCfg(BaseModel):
+    pool_size:     int = 20               # venue 당 최대 연결 수
+    dns_ttl:       int = 300              # DNS 캐시 (초)
+    keepalive_sec: int = 60               # idle keep-alive 유지 시간
+    keep_warm_sec: int = 15               # 이 시간 동안 요청이 없으면 warm 요청 (0 = 끔)
+    warm_conns:    int = 2                # warm 요청 동시 개수 (= 데워 둘 연결 수)
+
+class RateCfg(BaseModel):
+    groups: dict[str, dict[str, float]] = {}    # venue → {group: 초당 요청 수} (기본값 덮어쓰기)
+    query_deadline_ms: int = 2000           # 체결 조회가 이보다 오래 밀리면 이번 회차 생략
+    monitor_deadline_ms: int = 5000         # 모니터링 ping / FX 조회
+
+class JournalCfg(BaseModel):
+    enabled: bool = False
+    dir: str = "data/ticks"                # pair 별 하위 디렉터리 (data/ticks/USDT-BTC)
+    segment_records: int = 1 << 20         # 세그먼트당 레코드 수 (56 byte × 1M ≈ 56 MB)
+
+class SimCfg(BaseModel):
+    ticks_dir: Optional[str] = None         # 없으면 journal.dir/<첫 pair 이름>
+    fx_krw: float = 1400                    # 고정 USDT/KRW
+    latency_ms: float = 30                  # REST 왕복 평균
+    latency_jitter_ms: float = 10
+    maker_fee_bp: float = 5
+    taker_fee_bp: float = 5
+    hedge_fee_bp: float = 4
+    settle_sec: float = 5                   # 재생 종료 후 응답 대기 (가상 시간)
+    seed: int = 0
+
+class RouteCfg(BaseModel):
+    enabled: bool = True                    # exchanges.hedge_backup 이 있으면 주문마다 venue 선택 (core/router.py)
+    probe_sec: float = 5                    # venue 별 REST 왕복 측정 주기 (연결 warm 유지 겸)
+    latency_bp_per_ms: float = 0.01         # 왕복 1 ms 당 비용 (bp)
+    error_bp: float = 5                     # 최근 오류율 1.0 당 비용 (bp)
+    max_rtt_ms: float = 500                 # 왕복 EWMA 가 이보다 크면 cooldown 동안 제외
+    cooldown_ms: int = 30000                # 오류 / 지연으로 제외된 venue 의 재시도 대기
+
+class HedgeCfg(BaseModel):
+    window_ms: int = 50                     # 체결을 모아 상쇄하는 시간 (0 = 체결마다 즉시)
+    max_unhedged: float = 0.002             # pair 별 미헷지 수량 한도 (base) – 닿으면 즉시 주문
+    retry_ms: int = 500                     # 헷지 주문 실패 시 재시도 간격
+    route: RouteCfg = RouteCfg()
+
+class BookCfg(BaseModel):
+    enabled: bool = False                   # L2 호가창 (core/book.py) – runtime.feeds: inproc 전용
+    spot_levels: int = 15                   # Upbit orderbook 레벨 수 (최대 30)
+    hedge_levels: int = 1000                # Binance diff depth 호가창 용량 (= REST snapshot limit)
+    max_slip_bp: float = 2                  # 헷지가 최우선 호가에서 이만큼 넘게 밀리지 않게 주문 수량 상한
+    depth_frac: float = Field(0.5, gt=0, le=1)   # 그 범위 수량 중 사용할 비율
+
+class LedgerCfg(BaseModel):
+    reconcile_sec: float = 30               # 장부 ↔ 거래소 잔고 / 포지션 대사 주기 (core/ledger.py)
+    tolerance: float = 1e-6                 # 이 이하 차이는 무시 (base)
+    deadline_ms: int = 5000                 # 대사 조회가 rate limit 에 이보다 오래 밀리면 이번 회차 생략
+    flat_slip_bp: float = 50                # emergency_flat spot IOC 지정가 – 최우선 호가에서 이만큼 불리하게
+
+class LivenessCfg(BaseModel):
+    enabled: bool = True                    # 수신 데이터 기반 venue 생존 판정 (core/liveness.py)
+    check_ms: int = 100                     # 판정 주기
+    ping_ms: int = 1000                     # 피드 WS ping 주기 (pong 도 수신으로 본다, inproc 피드만)
+    # (pause, dead) 임계값 – 0 = 그 단계 판정 안 함
+    feed_age_ms:   tuple[float, float] = (2000, 10000)   # 마지막 프레임 / pong 이후 경과
+    ws_rtt_ms:     tuple[float, float] = (500, 3000)     # WS ping 왕복 (dead 초과면 timeout)
+    rest_p99_ms:   tuple[float, float] = (1000, 0)       # 최근 주문 / 취소 REST 왕복 p99
+    rest_stall_ms: tuple[float, float] = (3000, 15000)   # 응답 없이 걸려 있는 가장 오래된 REST
+    ex_lag_ms:     tuple[float, float] = (1500, 0)       # 거래소 이벤트 시각 → 수신 (시계 차이 + 지연)
+    rest_window_sec: float = 30             # p99 를 낼 샘플 구간
+    rest_min_samples: int = 5               # 이보다 적으면 p99 판정 안 함
+    recover_ms: int = 3000                  # 모든 신호가 이만큼 정상이면 호가 재개 / venue 복귀
+
+class TraceCfg(BaseModel):
+    enabled: bool = True                    # 구간별 지연 히스토그램 (core/trace.py)
+    ex_sample: int = 16                     # 거래소 시각 파싱은 N 프레임마다 1번
+    order_log: bool = False                 # 주문별 전 구간 시각 JSON 로그
+
+class MarketCfg(BaseModel):
+    enabled: bool = True                    # market 메타데이터 디스크 캐시 (core/markets.py)
+    cache_dir: str = "data/markets"
+    ttl_sec: int = 86400                    # 지나면 캐시로 시작하고 백그라운드에서 갱신
+
+class LogCfg(BaseModel):
+    queue: bool = True                      # 큐 + writer 스레드 (core/logq.py), false = 동기 출력
+    queue_size: int = 10000                 # 가득 차면 버린다 (루프를 막지 않음)
+    console: bool = True
+    json_path: Optional[str] = None         # JSON-lines 파일 sink
+    sample: dict[str, int] = {}             # logger → N 개 중 1 개만 (틱마다 찍는 DEBUG)
+    rate: dict[str, float] = {}             # logger → 초당 최대 개수
 
 class Settings(BaseModel):
     runtime:  RuntimeCfg
     strategy: StratCfg
     exchanges: dict[str, ExchDef]
     fx: FxCfg                             # ★ 추가
+    fills: FillCfg = FillCfg()
+    transport: TransportCfg = TransportCfg()
+    journal: JournalCfg = JournalCfg()
+    sim: SimCfg = SimCfg()
+    trace: TraceCfg = TraceCfg()
+    hedge: HedgeCfg = HedgeCfg()
+    ratelimit: RateCfg = RateCfg()
+    book: BookCfg = BookCfg()
+    log: LogCfg = LogCfg()
+    markets: MarketCfg = MarketCfg()
+    ledger: LedgerCfg = LedgerCfg()
+    liveness: LivenessCfg = LivenessCfg()
+    pairs: list[PairDef] = []               # 비어 있으면 exchanges.spot / hedge_primary 한 쌍
+
+    @model_validator(mode="after")
+    def _default_pair(self):
+        # 헷지 venue 는 USDT 무기한 선물 – BTC/USDT → BTC/USDT:USDT (bybit 는 BTC/USDT 가 현물)
+        for k in ("hedge_primary", "hedge_backup"):
+            if k in self.exchanges:
+                self.exchanges[k].symbol = perp(self.exchanges[k].symbol)
+        if not self.pairs:
+            hedge = self.exchanges["hedge_primary"]
+            self.pairs = [PairDef(spot=self.exchanges["spot"].symbol,
+                                  hedge=hedge.symbol, ws_stream=hedge.ws_stream)]
+        return self
 
 def load_config(path: str | Path = "config.yaml") -> Settings:
     raw = yaml.safe_load(Path(path).read_text())
@@ -1,38 +1,62 @@
 import asyncio, logging
 
+from .ratelimit import Prio
+
 class Monitor:
     """
     30 초마다 두 거래소를 'ping' 하고,
-    2 회 연속 실패하면 OMS.emergency_flat()을 호출해 포지션을 정리한다.
+    2 회 연속 실패하면 모든 pair 의 OMS.emergency_flat()을 호출해 포지션을 정리한다.
+    느린 backstop – 초 단위 감지는 core/liveness.py (WS / 주문 트래픽 기반).
     """
     def __init__(self, upbit, hedge, oms,
-                 interval_sec: int = 30, max_fail: int = 2):
+                 interval_sec: int = 30, max_fail: int = 2,
+                 limiters: dict | None = None,      # {"spot": RateScheduler, "hedge": …}
+                 deadline_ms: int = 5000):
         self.upbit     = upbit      # ExchWrapper
-        self.hedge     = hedge      # ExchWrapper
-        self.oms       = oms        # OMS 인스턴스 (emergency_flat 보유)
+        self.hedge     = hedge if isinstance(hedge, list) else [hedge]   # 헷지 venue ExchWrapper (primary, backup…)
+        self.oms       = oms if isinstance(oms, list) else [oms]   # pair 별 OMS (emergency_flat 보유)
         self.interval  = interval_sec
         self.max_fail  = max_fail
+        self.limiters  = limiters or {}
+        self.deadline  = deadline_ms / 1000
         self.log       = logging.getLogger("Monitor")
 
-    async def _ping(self):
-        # Upbit: fetch_balance() 가 가장 가볍고 안정
-        await self.upbit.ccxt_ex.fetch_ticker("BTC/USDT")
-        # Binance USD‑M 은 fetch_time() 지원
-        await self.hedge.ccxt_ex.fetch_time()
+    async def _slot(self, venue: str, group: str) -> bool:
+        """모니터링은 최하위 우선순위 – 한도가 밀려 deadline 을 넘기면 이번 ping 생략"""
+        rl = self.limiters.get(venue)
+        return not rl or await rl.acquire(group, Prio.MONITOR, self.deadline)
+
+    async def _ping(self) -> bool:
+        # Upbit: 설정 심볼 ticker (공개 API – 가장 가볍다)
+        if not await self._slot("spot", "ticker"):
+            return False
+        await self.upbit.ccxt_ex.fetch_ticker(self.upbit.symbol)
+        # 헷지는 venue 하나라도 살아 있으면 정상 (HedgeRouter 가 살아 있는 쪽으로 보낸다)
+        errs = []
+        for i, ex in enumerate(self.hedge):
+            if not await self._slot("hedge" if i == 0 else ex.id, "default"):
+                return False
+            try:
+                await ex.ccxt_ex.fetch_time()
+                return True
+            except Exception as e:
+                errs.append(f"{ex.id}: {e}")
+        raise RuntimeError("; ".join(errs))
 
     async def run(self):
         fails = 0
         while True:
             try:
-                await self._ping()
-                if fails:
+                if not await self._ping():
+                    self.log.info("rate limit 혼잡 – ping 생략")
+                elif fails:
                     self.log.info("ping 회복 ✅")
-                fails = 0
+                    fails = 0
             except Exception as e:
                 fails += 1
                 self.log.warning("ping fail %d/%d: %s", fails, self.max_fail, e)
                 if fails >= self.max_fail:
                     self.log.error("연속 실패 – emergency_flat 실행")
-                    await self.oms.emergency_flat()
+                    await asyncio.gather(*(o.emergency_flat() for o in self.oms))
                     raise
             await asyncio.sleep(self.interval)
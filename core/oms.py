@@ -1,11 +1,23 @@
-import asyncio, decimal as D
-from .utils import TokenBucket
-from .exchange import ExchWrapper
+import asyncio
+import ccxt.async_support as ccxt
+from prometheus_client import Gauge
+from .exchange import ExchWrapper, new_cid
 from .models import StratCfg
 from .fx       import FxPoller
+from .fixed    import P10, div_half_even, rescale
+from .quote    import QState, SideQuote, Tolerance, diff
+from .trace    import tracer, now
+from .startup  import startup
+from .hedger   import HedgeAggregator
+from .ratelimit import RateScheduler, Prio, get_scheduler
+from .models   import HedgeCfg, LedgerCfg
+from .ledger   import PositionLedger
 import logging
 from typing import Set
-from core.utils import TokenBucket
+
+FLAT_SEC = Gauge("emergency_flat_sec", "emergency_flat 시작 → 모든 청산 주문 응답 (초)", ["symbol"])
+QDEPTH   = Gauge("oms_queue_depth", "꺼낼 때 남아 있던 명령 / 체결 이벤트 수", ["symbol", "queue"])
+LEV_SAME = "110043"                     # Bybit "leverage not modified" – 이미 그 배율
 
 class OMS:  
     def __init__(self,
@@ -15,7 +27,16 @@ class OMS:
                  ord_q,         # asyncio.Queue
                  fill_q,        # asyncio.Queue
                  orders_counter,
-                 fx):
+                 fx,
+                 limiter=None,  # spot venue RateScheduler (pair 간 공유)
+                 watch=None,    # pair 간 공유 {oid: fill_q}
+                 hedger=None,   # pair 간 공유 HedgeAggregator
+                 max_unhedged=None,
+                 books=None,    # core.book.Books | None – hedge 깊이로 주문 수량 상한
+                 row=0,         # books 의 행 (pair index)
+                 book_cfg=None,   # BookCfg
+                 ledger=None,     # pair 간 공유 PositionLedger
+                 bus=None):       # MarketBus – emergency_flat spot 지정가 기준
         self.spot   = spot
         self.hedge  = hedge
         self.cfg    = cfg
@@ -23,111 +44,379 @@ class OMS:
         self.fill_q = fill_q
         self.fx     = fx
 
-        self.open       = {'bid': None, 'ask': None}
-        self.watch_set  = set()
+        self.quotes     = {'bid': SideQuote('bid'), 'ask': SideQuote('ask')}
+        self.tol        = Tolerance(cfg.requote_bp)     # 재호가 허용 오차
+        self.watch      = {} if watch is None else watch   # oid → fill_q (FillTracker 가 라우팅)
         self.orders_c   = orders_counter
-        self.log        = logging.getLogger("OMS")
-        self.limiter = TokenBucket(rps = 5)
-        self._leverage_set = False
-    async def spot_limit(self, side: str, price: D.Decimal, qty_btc: float):
+        self.log        = logging.getLogger(f"OMS[{spot.symbol}]")
+        self.limiter = limiter or RateScheduler(spot.id)
+        self.ledger  = ledger or PositionLedger(LedgerCfg())
+        self.hedger  = hedger or HedgeAggregator(hedge, HedgeCfg(), ledger=self.ledger)
+        self.hedger.register(hedge, spot.scale, max_unhedged)
+        self.ledger.register(spot, hedge)
+        self.bus      = bus
+        self.halted   = False                   # emergency_flat 이후 – 호가 / 헷지 중단
+        self.paused   = False                   # liveness 가 잠시 멈춤 – 호가만 내리고 헷지는 계속
+        self._wake    = {s: asyncio.Event() for s in self.quotes}   # side worker 깨우기
+        self._qd      = {k: QDEPTH.labels(spot.symbol, k) for k in ("ord", "fill")}
+        self._side_lk = {s: asyncio.Lock() for s in self.quotes}    # side 당 주문 흐름 하나
+        self.books    = books
+        self.row      = row
+        self.book_cfg = book_cfg
+        self._leverage_set = False             # 모든 헷지 venue 적용 완료
+        self._lev_done     = set()             # 적용한 venue id
+        self._bg           = set()             # 결과를 모르는 신규 주문 조회 (_orphan)
+    async def spot_limit(self, side: str, price: int, qty_btc: int):
         """
-        Upbit 지정가 주문을 넣고 order_id 를 watch_set 에 등록
+        Upbit 지정가 주문을 넣고 order_id 를 watch 에 등록
         side : 'buy' | 'sell'
+        price / qty_btc : spot Scale 기준 정수
         """
-        ord = await self.spot.limit(side, float(price), qty_btc)
-        self.watch_set.add(ord["id"])        # ← OrderPoller 가 모니터링
+        ord = await self.spot.limit(side, qty_btc, price)
+        self.watch[ord["id"]] = self.fill_q  # ← OrderPoller 가 모니터링
         self.orders_c.labels(side=side).inc()
 
+        sc = self.spot.scale
         self.log.info("SPOT %s %.8f BTC @ %.0f KRW id=%s",
-                      side.upper(), qty_btc, price, ord["id"])
+                      side.upper(), sc.qty_float(qty_btc), sc.px_float(price), ord["id"])
         return ord
     
     async def _ensure_leverage(self):
         """
-        Binanace USD‑M 기준  (set_leverage)
-        호출 비용을 줄이기 위해 최초 1회만 실행
+        헷지 venue 마다 (ledger.venues – primary + router backup) 이 pair 심볼에 set_leverage
+        호출 비용을 줄이기 위해 venue 별 최초 1회만 – 실패한 venue 는 다음 체결 때 다시
         """
         if self._leverage_set:
             return
-        lev = self.cfg.hedge_leverage
-        try:
-            await self.hedge.ccxt_ex.fapiPrivate_post_leverage({
-                "symbol": self.hedge.symbol.replace("/", ""),
-                "leverage": lev
-            })
-            self.log.info("hedge leverage %dx 적용 완료", lev)
-            self._leverage_set = True
-        except Exception as e:
-            self.log.warning("레버리지 설정 실패: %s", e)
+        lev  = self.cfg.hedge_leverage
+        todo = [v for v in self.ledger.venues if v not in self._lev_done]
+        res  = await asyncio.gather(*(self.ledger.venues[v].ccxt_ex.set_leverage(lev, self.hedge.symbol)
+                                      for v in todo), return_exceptions=True)   # Binance POST /fapi/v1/leverage
+        for v, r in zip(todo, res):
+            if isinstance(r, Exception) and LEV_SAME not in str(r):
+                self.log.warning("%s 레버리지 설정 실패: %s", v, r)
+                continue
+            self._lev_done.add(v)
+            self.log.info("%s hedge leverage %dx 적용 완료", v, lev)
+        self._leverage_set = len(self._lev_done) == len(self.ledger.venues)
 
-    async def _size_btc(self, price_usdt: D.Decimal) -> float:
+    SIZE_DP = 8                                # 기존 quantize(1e-8)
+
+    def _size_btc(self, price_usdt: int, side: str | None = None) -> int:
+        """
+        order_size_krw / fx / price  →  spot 수량 (spot Scale 정수)
+        1e-8 half-even 으로 반올림 후 spot lot 으로 절사
+        books 가 있으면 hedge 깊이로 상한 (_cap)
+        """
         krw_per_usdt = self.fx.price
         if krw_per_usdt == 0 or price_usdt == 0:
-            return 0.0                         # 아직 데이터가 없다면 주문 보류
+            return 0                           # 아직 데이터가 없다면 주문 보류
 
-        nominal_usdt = D.Decimal(self.cfg.order_size_krw) / krw_per_usdt
-        btc_amount   = (nominal_usdt / price_usdt).quantize(D.Decimal("0.00000001"))
+        sc  = self.spot.scale
+        num = self.cfg.order_size_krw * P10[self.SIZE_DP + self.fx.scale.price_dp + sc.price_dp]
+        q8  = div_half_even(num, krw_per_usdt * price_usdt)
+        # Upbit 최소 수량 미만이면 0 → 보류
+        q = sc.qty_from(q8, self.SIZE_DP)
+        if self.books is not None and side:
+            q = self._cap(q, side)
+        return q
 
-        if btc_amount == 0:
-            return 0.0                         # Upbit 최소 수량 미만일 때도 보류
-        return float(btc_amount)
-    async def hedge_market(self, side: str, qty_btc: D.Decimal):
+    def _cap(self, qty: int, side: str) -> int:
         """
-        선물 시장가 주문 — side= 'buy' or 'sell'
-        qty_btc: 현물 체결 수량과 동일
+        헷지가 max_slip_bp 안에서 끝나도록 – hedge 호가창의 그 범위 수량 × depth_frac 이 상한.
+        spot 매수(bid) 는 hedge 매도 → hedge bid 를 먹는다. Strategy vwap 기준 수량(ref_qty)도 갱신.
+        """
+        c    = self.book_cfg
+        room = self.books.book["hedge"][self.row].depth(side, c.max_slip_bp)
+        cap  = self.spot.scale.qty_from(int(room * c.depth_frac), self.hedge.scale.qty_dp)
+        if cap < qty:
+            self.log.debug("%s size %d → %d (hedge depth)", side, qty, cap)
+            qty = cap
+        self.books.ref_qty[self.row] = self._hedge_qty(qty)
+        return qty
+
+    def _hedge_qty(self, qty_spot: int) -> int:
+        """spot 수량 → hedge lot 기준 정수"""
+        return self.hedge.scale.qty_from(qty_spot, self.spot.scale.qty_dp)
+    async def hedge_market(self, side: str, qty_btc: int):
+        """
+        선물 시장가 주문 — side= 'buy' or 'sell'
+        qty_btc: 현물 체결 수량과 동일 (spot Scale 정수)
         """
         await self._ensure_leverage()
 
-        ord = await self.hedge.market(side, float(qty_btc))
+        qty = self._hedge_qty(qty_btc)
+        if qty == 0:
+            return
+        ord = await self.hedge.market(side, qty)
         self.log.info("HEDGE %s %.8f BTC (lev %dx) id=%s",
-                      side.upper(), qty_btc, self.cfg.hedge_leverage, ord["id"])
+                      side.upper(), self.hedge.scale.qty_float(qty),
+                      self.cfg.hedge_leverage, ord["id"])
     async def _ord_loop(self):
-        """Strategy 가 넣은 ord_q 명령 처리"""
+        """
+        Strategy 가 넣은 ord_q 명령 처리 – 밀린 명령은 side 별 마지막 것만 반영.
+        want 만 바꾸고 side worker 를 깨운다 (REST 응답을 기다리지 않음)
+        """
+        while True:
+            cmd    = await self.ord_q.get()
+            t_deq  = now() if tracer.on else 0
+            self._qd["ord"].set(self.ord_q.qsize())
+            latest = {cmd["side"]: cmd}
+            while not self.ord_q.empty():
+                cmd = self.ord_q.get_nowait()
+                latest[cmd["side"]] = cmd
+            if self.halted:
+                continue
+            for side, cmd in latest.items():
+                q = self.quotes[side]
+                t = cmd.get("t")
+                if t:
+                    tracer.span("decide_deq", t[1], t_deq)
+                    q.t = (t[0], t[1], t_deq)
+                if cmd["action"] == "update":
+                    qty    = self._size_btc(cmd["price"], side)
+                    q.want = (cmd["price"], qty) if qty else None
+                else:
+                    q.want = None
+                self._wake[side].set()
+
+    async def _side_loop(self, side):
+        """
+        side 하나의 주문 흐름 – 같은 side 는 취소 → 신규 순서대로 하나씩, 두 side 는 동시에.
+        REST 를 기다리는 동안 바뀐 want 는 끝난 뒤 최신 값 하나로만 반영된다.
+        """
+        wake = self._wake[side]
         while True:
-            cmd = await self.ord_q.get()
-            side, act = cmd["side"], cmd["action"]
-            if act == "update":
-                await self._update(side, cmd["price"])
-            elif act == "cancel":
-                await self._cancel(side)
+            await wake.wait()
+            wake.clear()
+            async with self._side_lk[side]:
+                if not (self.halted or self.paused):
+                    await self._reconcile(side)
+
+    async def pause(self, reason: str = ""):
+        """호가를 모두 내리고 멈춘다 – 체결 헷지는 계속 (core/liveness.py)"""
+        if self.paused or self.halted:
+            return
+        self.paused = True
+        self.log.warning("호가 중단: %s", reason)
+        await asyncio.gather(*(self._pull(s) for s in self.quotes))
+
+    def resume(self):
+        """멈춘 동안 받은 최신 want 로 다시 호가"""
+        if not self.paused:
+            return
+        self.paused = False
+        self.log.info("호가 재개")
+        for w in self._wake.values():
+            w.set()
 
     async def _fill_loop(self):
-        """Upbit 체결 알림 처리 → 선물 헷지"""
+        """Upbit 체결 알림 처리 → 장부 반영 + HedgeAggregator 가 상쇄 / 묶어서 선물 헷지"""
         while True:
             ev = await self.fill_q.get()
-            side     = ev["side"]                    # spot side
-            qty_btc  = ev["filled"]
-            hedge_sd = "sell" if side == "buy" else "buy"
-            await self.hedge_market(hedge_sd, qty_btc)
+            self._qd["fill"].set(self.fill_q.qsize())
+            self.ledger.fill(self.hedge.symbol, ev["side"], ev["filled"])
+            if self.halted:                     # 청산 주문 / 취소가 늦은 호가의 체결 – 장부만
+                self.log.warning("halted 후 체결 %s %d – 순노출 %d", ev["side"], ev["filled"],
+                                 self.ledger.net(self.hedge.symbol))
+                continue
+            await self._ensure_leverage()
+            await self.hedger.add(self.hedge.symbol, ev["side"], ev["filled"],
+                                  ev.get("t_fill", 0))
 
     async def run(self):
-        await asyncio.gather(self._ord_loop(), self._fill_loop())
+        await asyncio.gather(self._ord_loop(), self._fill_loop(),
+                             *(self._side_loop(s) for s in self.quotes))
 
-    async def _update(self, side, price):
-        qty = await self._size_btc(price)
-        if self.open[side]:
+    async def _reconcile(self, side):
+        """원하는 호가(want)와 걸린 주문을 비교해 최소한의 REST 만 보낸다"""
+        q = self.quotes[side]
+        if q.state is QState.LIVE and q.oid not in self.watch:
+            q.reset()                   # poller 가 체결/취소 확인 후 제거한 주문
+        act = diff(q, self.tol)
+        if act == "none":
+            return
+        if act in ("cancel", "replace"):
             await self._cancel(side)
-        await self.limiter.acquire()
+        if act in ("new", "replace") and q.state is QState.IDLE:
+            await self._place(side)
+
+    async def _place(self, side):
+        q = self.quotes[side]
+        q.state = QState.PENDING_NEW
+        await self.limiter.acquire("order", Prio.NEW)
+        if q.want is None:                      # 토큰을 기다리는 동안 호가 내림 – 보내지 않는다
+            q.reset()
+            return
+        price, qty = q.want                     # 그 사이 바뀌었으면 최신 값으로
+        qt = q.t                                # 응답 대기 중 다음 명령이 덮어쓰기 전에
         spot_side = "buy" if side=="bid" else "sell"
-        ord = await self.spot.limit(spot_side, qty, float(price))
+        cid = new_cid()
+        self.watch[cid] = self.fill_q           # ack 전에 도착하는 체결 push 도 이 pair 로
+        t_sent = now() if tracer.on else 0
+        try:
+            ord = await self.spot.limit(spot_side, qty, price, cid)
+        except (ccxt.InvalidOrder, ccxt.InsufficientFunds) as e:   # 거절 – 들어가지 않은 주문
+            self.watch.pop(cid, None)
+            self.log.warning("%s 신규 거절: %s", side, e)
+            q.reset()
+            return
+        except Exception as e:                  # timeout / 네트워크 – 들어갔을 수 있다
+            self.log.warning("%s 신규 응답 없음: %s – cid 로 조회", side, e)
+            ord = await self._lookup(cid)
+            if not ord:
+                if ord is False:                # 거래소에 없음
+                    self.watch.pop(cid, None)
+                else:                           # 조회도 실패 – cid 는 watch 에 두고 뒤에서 확인
+                    t = asyncio.create_task(self._orphan(cid))
+                    self._bg.add(t)
+                    t.add_done_callback(self._bg.discard)
+                q.reset()
+                return
+        if t_sent and qt:
+            t_ack = now()
+            t_rx, t_dec, t_deq = qt
+            tracer.span("deq_sent", t_deq, t_sent)
+            tracer.span("sent_ack", t_sent, t_ack)
+            tracer.order(oid=ord["id"], side=side, rx=t_rx, decide=t_dec,
+                         deq=t_deq, sent=t_sent, ack=t_ack)
         self.orders_c.labels(side=side).inc()   # 🔢 카운터 +1
-        self.open[side] = ord["id"]
+        oid = ord["id"]
+        if self.watch.pop(cid, None) is not None:
+            self.watch[oid] = self.fill_q       # ← OrderPoller 가 모니터링
+        if oid not in self.watch:               # ack 전에 push 로 체결 완료 / 취소까지 끝남
+            q.reset()
+            return
+        q.state, q.oid, q.price, q.qty = QState.LIVE, oid, price, qty
+        if not startup.quoted:
+            startup.first_quote()               # time_to_first_quote_sec
+        # 헷지는 체결이 확인된 수량만 (_fill_loop → HedgeAggregator)
+
+    LOOKUP_SEC = 1.0                            # 결과를 모르는 신규 주문 재조회 간격
 
-        hedge_side = "sell" if side=="bid" else "buy"
-        await self.hedge.market(hedge_side, qty)   # 즉시 헷지
+    async def _lookup(self, cid: str):
+        """cid 로 신규 주문 조회 – 주문 dict / False (거래소에 없음) / None (조회 실패)"""
+        await self.limiter.acquire("default", Prio.QUERY)
+        try:
+            return await self.spot.order_by_cid(cid)
+        except ccxt.OrderNotFound:
+            return False
+        except Exception as e:
+            self.log.warning("신규 %s 조회 실패: %s", cid, e)
+            return None
+
+    async def _orphan(self, cid: str):
+        """
+        응답도 조회 결과도 없던 신규 주문 – 결과가 나올 때까지 다시 조회한다.
+        들어간 주문이면 watch 를 oid 로 옮기고 (체결은 그대로 헷지) 아직 걸려 있으면 취소.
+        """
+        while True:
+            await asyncio.sleep(self.LOOKUP_SEC)
+            r = await self._lookup(cid)
+            if r is None:
+                continue
+            if r is False:
+                self.watch.pop(cid, None)
+                return
+            oid = r["id"]
+            if self.watch.pop(cid, None) is not None:
+                self.watch[oid] = self.fill_q
+            self.log.warning("응답 없던 신규 %s → id=%s (%s)", cid, oid, r.get("status"))
+            if r.get("status") != "open":
+                return
+            await self.limiter.acquire("default", Prio.CANCEL)
+            try:
+                await self.spot.cancel(oid)
+                return
+            except ccxt.OrderNotFound:
+                return                          # 그 사이 체결 / 취소
+            except Exception as e:
+                self.log.warning("응답 없던 신규 %s 취소 실패: %s", oid, e)
 
     async def _cancel(self, side):
-        if not self.open[side]: return
-        await self.limiter.acquire()
-        await self.spot.cancel(self.open[side])
-        self.open[side] = None
+        q = self.quotes[side]
+        if not q.oid: return
+        q.state = QState.PENDING_CANCEL
+        await self.limiter.acquire("default", Prio.CANCEL)
+        try:
+            await self.spot.cancel(q.oid)
+        except ccxt.OrderNotFound:
+            pass                        # 이미 체결/취소됨
+        except Exception as e:
+            self.log.warning("%s 취소 실패: %s", side, e)
+            q.state = QState.LIVE       # 다음 명령에서 재시도
+            return
+        q.reset()
 
     # --- 긴급 청산 (모니터용)
     async def emergency_flat(self):
+        """
+        호가 중단 → 걸린 주문 취소 → 장부(PositionLedger)의 세션 잔여 포지션을
+        spot / 헷지 venue 에 동시에 반대 주문. 수량 조회 REST 는 없다.
+        """
+        loop = asyncio.get_running_loop()
+        t0   = loop.time()
+        sym  = self.hedge.symbol
+        self.halted = True
         self.log.warning("EMERGENCY FLAT start")
-        for s in ('bid','ask'):
-            if self.open_orders[s]:
-                await self._cancel_order(s)
-        # hedge 포지션 정리
-        await self.hedge.market("buy", 999)   # ← 실제 구현 시 포지션 사이즈 조회 후 반대 주문
-        self.log.warning("EMERGENCY FLAT done")
+        for q in self.quotes.values():
+            q.want = None
+        await asyncio.gather(*(self._pull(s) for s in self.quotes))
+        await self.hedger.drain(sym)            # 진행 중인 헷지 ack 까지 장부에 반영
+        spot, hedge = self.ledger.spot(sym), self.ledger.hedge(sym)
+        res = await asyncio.gather(self._flat_spot(spot),
+                                   *(self._flat_hedge(v, q) for v, q in hedge.items() if q),
+                                   return_exceptions=True)
+        for r in res:
+            if isinstance(r, Exception):
+                self.log.error("EMERGENCY FLAT 주문 실패: %s", r)
+        dt = loop.time() - t0
+        FLAT_SEC.labels(sym).set(dt)
+        self.log.warning("EMERGENCY FLAT done %.0f ms – spot %.8f hedge %s", dt * 1000,
+                         self.spot.scale.qty_float(spot),
+                         {v: self.spot.scale.qty_float(q) for v, q in hedge.items()})
+
+    async def _pull(self, side):
+        """진행 중인 신규 / 취소가 끝나길 기다렸다가 걸린 주문 취소 (want 는 그대로)"""
+        async with self._side_lk[side]:
+            await self._cancel(side)
+
+    async def _flat_spot(self, pos: int):
+        """spot 세션 포지션 pos 를 되돌린다 – 최우선 호가 ± flat_slip_bp IOC 지정가"""
+        sc  = self.spot.scale
+        qty = sc.qty_from(abs(pos), sc.qty_dp)
+        if not qty:
+            return
+        side = "sell" if pos > 0 else "buy"
+        px   = 0
+        if self.bus is not None:
+            px = int((self.bus.bid if side == "sell" else self.bus.ask)["spot"][self.row])
+        if not px and side == "buy":
+            raise RuntimeError(f"spot 매수 청산 {sc.qty_float(qty):.8f} – 기준 호가 없음")
+        await self.limiter.acquire("order", Prio.NEW)
+        cid = new_cid()
+        self.watch[cid] = self.fill_q           # 체결은 _fill_loop 가 장부에 반영
+        if px:
+            slip = self.ledger.cfg.flat_slip_bp / 1e4
+            ord  = await self.spot.ioc(side, qty, int(px * (1 - slip if side == "sell" else 1 + slip)),
+                                       cid)
+        else:
+            ord  = await self.spot.market(side, qty, cid=cid)
+        if self.watch.pop(cid, None) is not None:
+            self.watch[ord["id"]] = self.fill_q
+        self.log.warning("FLAT SPOT %s %.8f id=%s", side.upper(), sc.qty_float(qty), ord["id"])
+
+    async def _flat_hedge(self, venue: str, pos: int):
+        """헷지 venue 의 세션 포지션 pos (spot Scale 정수) 를 reduce-only 시장가로 닫는다"""
+        ex   = self.ledger.venues[venue].view(self.hedge.symbol)
+        dp   = self.spot.scale.qty_dp
+        qty  = ex.scale.qty_from(abs(pos), dp)
+        if not qty:
+            return
+        side = "sell" if pos > 0 else "buy"
+        await get_scheduler(venue).acquire("order", Prio.NEW)
+        ord  = await ex.market(side, qty, reduce_only=True, cid=new_cid())
+        sent = rescale(qty, ex.scale.qty_dp, dp)
+        self.ledger.hedged(self.hedge.symbol, venue, -sent if pos > 0 else sent)
+        self.log.warning("FLAT HEDGE %s %.8f %s@%s id=%s", side.upper(),
+                         ex.scale.qty_float(qty), ex.symbol, venue, ord["id"])
@@ -1,23 +1,32 @@
 # core/order_poller.py
-import asyncio, logging, decimal as D
-from typing import Dict, Set
+import asyncio, logging
 
+from .exchange  import CID_PREFIX
+from .fills     import FillSource, FillTracker
+from .ratelimit import Prio
 
-class UpbitOrderPoller:
+
+class UpbitOrderPoller(FillSource):
     """
-    ① OMS 가 생성한 주문 id 를 watch_set 에 추가
-    ② 1초마다 fetch_order(id) 호출 → 체결/취소 여부 확인
-    ③ filled > 0 이면 fill_q 로 이벤트 전파
+    REST 폴백 체결 감지.
+    ① OMS 가 생성한 주문 id 를 watch 에 추가
+    ② poll_ms 마다 미체결 / 체결완료 / 취소 주문을 한꺼번에 조회
+       (watch 크기와 무관하게 호출 수 일정 – 심볼이 여럿이면 마켓 지정 없이 전체 조회)
+    ③ 누적 체결량이 늘었으면 FillTracker 가 fill_q 로 증가분만 전파
+    목록에서 빠진 id 만 fetch_order 로 개별 확인한다.
     """
+    BATCH = 100                               # Upbit 목록 조회 최대 건수
+
     def __init__(self,
                  upbit,                       # ExchWrapper (ccxt.upbit)
-                 watch_set: Set[str],
-                 fill_q: asyncio.Queue,
-                 poll_ms: int = 1000):
-        self.upbit     = upbit
-        self.watch_set = watch_set           # 공유 set() – OMS 가 주문 id push
-        self.fill_q    = fill_q
+                 tracker: FillTracker,
+                 poll_ms: int = 1000,
+                 limiter=None,                # RateScheduler | None
+                 deadline_ms: int = 2000):
+        super().__init__(upbit, tracker)
         self.poll_ms   = poll_ms
+        self.limiter   = limiter
+        self.deadline  = deadline_ms / 1000
         self.log       = logging.getLogger("UpbitOrderPoller")
 
     async def run(self):
@@ -25,24 +34,52 @@ class UpbitOrderPoller:
             await self._poll_once()
             await asyncio.sleep(self.poll_ms / 1000)
 
+    async def _slot(self, cost: int = 1) -> bool:
+        """조회 우선순위로 토큰 대기 – deadline 을 넘기면 이번 회차는 건너뜀"""
+        return not self.limiter or \
+            await self.limiter.acquire("default", Prio.QUERY, self.deadline, cost)
+
+    async def _fetch_batch(self) -> dict:
+        ex, syms = self.upbit.ccxt_ex, self.symbols
+        sym = syms[0] if len(syms) == 1 else None
+        lists = await asyncio.gather(
+            ex.fetch_open_orders(sym, limit=self.BATCH),
+            ex.fetch_closed_orders(sym, limit=self.BATCH),
+            ex.fetch_canceled_orders(sym, limit=self.BATCH),
+        )
+        return {o["id"]: o for orders in lists for o in orders}
+
     async def _poll_once(self):
-        to_remove = set()
-        for oid in list(self.watch_set):
-            try:
-                ord = await self.upbit.ccxt_ex.fetch_order(oid)
-                if ord["status"] == "closed":
-                    filled = D.Decimal(ord["filled"])
-                    if filled > 0:
-                        side = ord["side"]             # 'buy' or 'sell'
-                        await self.fill_q.put({
-                            "side":    side,
-                            "filled":  filled
-                        })
-                        self.log.info("fill %s %.8f BTC id=%s", side, filled, oid)
-                    to_remove.add(oid)                 # done 처리
-                elif ord["status"] == "canceled":
-                    to_remove.add(oid)
-            except Exception as e:
-                self.log.warning("fetch_order %s error: %s", oid, e)
-
-        self.watch_set -= to_remove                    # 완료·취소 제거
+        watch = self.tracker.watch
+        if not watch:
+            return
+        if not await self._slot(3):
+            return
+        try:
+            seen = await self._fetch_batch()
+        except Exception as e:
+            self.log.warning("batch fetch error: %s", e)
+            return
+
+        for oid in list(watch):
+            if oid.startswith(CID_PREFIX):     # ack 대기 중 (아직 거래소 id 없음)
+                continue
+            ord = seen.get(oid)
+            if ord is None:                    # 목록 밖 → 개별 조회
+                if not await self._slot():
+                    return
+                try:
+                    ord = await self.upbit.ccxt_ex.fetch_order(oid, self.upbit.symbol)
+                except Exception as e:
+                    self.log.warning("fetch_order %s error: %s", oid, e)
+                    continue
+            await self._apply(oid, ord)
+
+    async def _apply(self, oid: str, ord: dict):
+        sc     = self.scale_of(ord.get("symbol"))
+        filled = sc.qty(ord["filled"] or 0)                 # spot Scale 정수
+        done   = ord["status"] in ("closed", "canceled")
+        if filled and done:
+            self.log.info("fill %s %.8f BTC id=%s", ord["side"],
+                          sc.qty_float(filled), oid)
+        await self.tracker.update(oid, ord["side"], filled, done)
@@ -0,0 +1,67 @@
+# core/quote.py
+from enum import Enum
+from fractions import Fraction
+
+
+class QState(str, Enum):
+    IDLE           = "idle"             # 걸린 주문 없음
+    PENDING_NEW    = "pending_new"      # 신규 주문 REST 응답 대기
+    LIVE           = "live"             # 호가창에 걸려 있음
+    PENDING_CANCEL = "pending_cancel"   # 취소 REST 응답 대기
+
+
+class SideQuote:
+    """
+    한쪽(bid / ask) 호가의 상태.
+
+    want  : Strategy 가 원하는 (price, qty) – None 이면 호가 내림
+    t     : want 를 만든 시세의 (수신, 판단, OMS 꺼냄) 시각 – 지연 추적용
+    price / qty / oid : 현재 걸려 있는 주문
+    """
+    __slots__ = ("side", "state", "oid", "price", "qty", "want", "t")
+
+    def __init__(self, side: str):
+        self.side  = side
+        self.state = QState.IDLE
+        self.oid   = None
+        self.price = 0
+        self.qty   = 0
+        self.want  = None
+        self.t     = None
+
+    def reset(self):
+        self.state = QState.IDLE
+        self.oid   = None
+        self.price = self.qty = 0
+
+
+class Tolerance:
+    """|want - resting| <= resting × bp/10000 이면 같은 호가로 본다 (정수 비교)"""
+    def __init__(self, bp: float):
+        f = Fraction(bp) / 10000
+        self.n, self.d = f.numerator, f.denominator
+
+    def same(self, want: int, rest: int) -> bool:
+        return abs(want - rest) * self.d <= self.n * rest
+
+
+def diff(q: SideQuote, tol: Tolerance) -> str:
+    """
+    원하는 상태와 걸린 주문을 비교해 필요한 최소 동작을 돌려준다.
+      "none"    : 할 일 없음
+      "new"     : 신규
+      "cancel"  : 취소만
+      "replace" : 취소 후 신규
+    PENDING_* 상태에서는 응답이 올 때까지 아무것도 하지 않는다.
+    """
+    if q.state in (QState.PENDING_NEW, QState.PENDING_CANCEL):
+        return "none"
+    if q.state is QState.IDLE:
+        return "new" if q.want else "none"
+    # LIVE
+    if q.want is None:
+        return "cancel"
+    price, qty = q.want
+    if tol.same(price, q.price) and tol.same(qty, q.qty):
+        return "none"
+    return "replace"
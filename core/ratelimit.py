@@ -0,0 +1,195 @@
+# core/ratelimit.py
+"""
+venue × endpoint group 별 REST 요청 스케줄러 (OMS / poller / monitor / FX 공용).
+
+  group    : 거래소가 한도를 따로 세는 묶음 (Upbit: order / default / ticker …)
+  priority : CANCEL > NEW > QUERY > MONITOR – 토큰이 모자라면 높은 우선순위부터 통과
+  deadline : 기다리는 동안 deadline 이 지나면 버리고 False (오래된 조회 / 모니터링 작업)
+  header   : Transport 가 넘겨 주는 응답 헤더로 남은 한도를 맞춘다
+               Upbit   Remaining-Req: group=order; min=..; sec=N
+               Binance X-MBX-USED-WEIGHT-1M / X-MBX-ORDER-COUNT-10S|1M
+               429 / 418 → Retry-After 동안 해당 group 정지
+  loop.time() 기준 – SIM 의 가상 시계에서도 그대로 동작
+"""
+import asyncio, heapq, itertools, logging, math, time
+from enum import IntEnum
+from typing import Dict
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from .models    import RateCfg
+from .transport import get_transport
+
+
+class Prio(IntEnum):
+    CANCEL  = 0
+    NEW     = 1
+    QUERY   = 2
+    MONITOR = 3
+
+
+RL_WAIT   = Histogram("rl_wait_ms", "rate limit 대기 시간 (ms)", ["venue", "group", "prio"],
+                      buckets=(0.1, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000))
+RL_DROP   = Counter("rl_dropped_total", "deadline 초과로 버린 요청", ["venue", "group", "prio"])
+RL_REMAIN = Gauge("rl_remaining", "서버가 알려 준 남은 요청 수 (초 단위)", ["venue", "group"])
+
+# 기본 초당 요청 수 – RateCfg.groups 로 덮어쓴다
+DEFAULT_RPS = {
+    "upbit":       {"order": 8,  "default": 30, "ticker": 10},
+    "binanceusdm": {"order": 20, "default": 30},
+    "bybit":       {"order": 10, "default": 50},
+}
+
+# Binance 사용량 헤더 → (group, 한도, 창 길이 초)
+_MBX = {
+    "x-mbx-used-weight-1m":   ("default", 2400, 60),
+    "x-mbx-order-count-10s":  ("order",   300,  10),
+    "x-mbx-order-count-1m":   ("order",   1200, 60),
+}
+_MBX_HIGH = 0.9                             # 한도의 90% 를 넘으면 창이 끝날 때까지 정지
+_EPS      = 1e-9                            # 토큰 비교 float 오차 (t + 1e-17 == t 로 무한 재예약 방지)
+
+
+class _Group:
+    __slots__ = ("name", "rate", "tokens", "last", "paused", "heap", "timer")
+
+    def __init__(self, name: str, rate: float):
+        self.name   = name
+        self.rate   = rate
+        self.tokens = rate                  # burst = 1 초 분량
+        self.last   = None
+        self.paused = 0.0                   # loop.time() 이 이 값 전이면 통과 불가
+        self.heap   = []                    # (prio, seq, cost, future, deadline, t_enq)
+        self.timer  = None
+
+    def refill(self, t: float):
+        if self.last is not None:
+            self.tokens = min(self.rate, self.tokens + (t - self.last) * self.rate)
+        self.last = t
+
+
+class RateScheduler:
+    def __init__(self, venue: str, rps: Dict[str, float] | None = None):
+        self.venue   = venue
+        rates        = {**DEFAULT_RPS.get(venue, {"default": 10}), **(rps or {})}
+        self._groups = {g: _Group(g, r) for g, r in rates.items()}
+        self._seq    = itertools.count()
+        self.log     = logging.getLogger(f"RateScheduler[{venue}]")
+
+    def group(self, name: str) -> _Group:
+        return self._groups.get(name) or self._groups["default"]
+
+    async def acquire(self, group: str, prio: Prio, deadline: float | None = None,
+                      cost: int = 1) -> bool:
+        """
+        토큰 cost 개를 얻을 때까지 대기. deadline(초) 안에 못 얻으면 False.
+        같은 group 에서는 priority 가 높은 요청이 먼저, 같은 priority 는 도착 순.
+        """
+        g    = self.group(group)
+        loop = asyncio.get_running_loop()
+        t    = loop.time()
+        g.refill(t)
+        if not g.heap and t >= g.paused and g.tokens + _EPS >= cost:
+            g.tokens -= cost
+            RL_WAIT.labels(self.venue, g.name, prio.name).observe(0)
+            return True
+        fut = loop.create_future()
+        dl  = t + deadline if deadline is not None else math.inf
+        heapq.heappush(g.heap, (prio, next(self._seq), cost, fut, dl, t))
+        self._arm(g, loop)
+        return await fut
+
+    def _arm(self, g: _Group, loop):
+        """다음으로 통과시킬 수 있는 시각(또는 가장 이른 deadline)에 _drain 예약"""
+        if g.timer:
+            g.timer.cancel()
+        if not g.heap:
+            g.timer = None
+            return
+        t    = loop.time()
+        need = g.heap[0][2] - g.tokens
+        when = max(g.paused, t + max(need / g.rate, 1e-6) if need > _EPS else t)
+        when = min(when, min(w[4] for w in g.heap))
+        g.timer = loop.call_at(when, self._drain, g, loop)
+
+    def _drain(self, g: _Group, loop):
+        g.timer = None
+        t = loop.time()
+        g.refill(t)
+        # deadline 지난 요청은 우선순위와 상관없이 버린다
+        if any(w[4] <= t or w[3].done() for w in g.heap):
+            keep = []
+            for w in g.heap:
+                prio, _, _, fut, dl, _ = w
+                if fut.done():
+                    continue
+                if dl <= t:
+                    RL_DROP.labels(self.venue, g.name, prio.name).inc()
+                    fut.set_result(False)
+                    continue
+                keep.append(w)
+            heapq.heapify(keep)
+            g.heap = keep
+        while g.heap and t >= g.paused and g.tokens + _EPS >= g.heap[0][2]:
+            prio, _, cost, fut, _, t_enq = heapq.heappop(g.heap)
+            if fut.done():                  # 호출자가 취소
+                continue
+            g.tokens -= cost
+            RL_WAIT.labels(self.venue, g.name, prio.name).observe((t - t_enq) * 1000)
+            fut.set_result(True)
+        self._arm(g, loop)
+
+    def pause(self, group: str, sec: float):
+        g = self.group(group)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        g.paused = max(g.paused, loop.time() + sec)
+        g.tokens = min(g.tokens, 0)
+        self.log.warning("group %s paused %.1f s", g.name, sec)
+        self._arm(g, loop)
+
+    # ── 응답 헤더 (Transport listener)
+    def on_response(self, group: str, status: int, headers):
+        rem = headers.get("Remaining-Req")              # Upbit
+        if rem:
+            kv  = dict(p.strip().split("=", 1) for p in rem.split(";") if "=" in p)
+            g   = self._groups.get(kv.get("group", ""))
+            sec = int(kv.get("sec", -1))
+            if g and sec >= 0:
+                RL_REMAIN.labels(self.venue, g.name).set(sec)
+                g.tokens = min(g.tokens, sec)
+                if sec == 0:
+                    self.pause(g.name, 1.0)
+        for h, (name, limit, win) in _MBX.items():      # Binance
+            used = headers.get(h)
+            if used is not None and int(used) >= limit * _MBX_HIGH:
+                self.pause(name, win - time.time() % win)
+        if status in (418, 429):
+            self.pause(group, float(headers.get("Retry-After") or 1))
+
+
+# ────────────────────────────── 요청 → group 분류 (Transport 가 헤더를 넘길 때)
+# 신규 주문만 order group, 취소는 양쪽 모두 default 한도(Upbit 30/s, Binance weight)에 들어간다
+def classify(venue: str, method: str, path: str) -> str:
+    if method == "POST" and "order" in path.lower():
+        return "order"
+    if venue == "upbit" and path.startswith(("/v1/ticker", "/v1/orderbook", "/v1/trades",
+                                             "/v1/candles", "/v1/market")):
+        return "ticker"
+    return "default"
+
+
+_pool: Dict[str, RateScheduler] = {}
+
+
+def get_scheduler(venue: str, cfg: RateCfg | None = None) -> RateScheduler:
+    """venue 별 공용 스케줄러 – 같은 venue 의 Transport 응답 헤더를 구독"""
+    s = _pool.get(venue)
+    if s is None:
+        s = _pool[venue] = RateScheduler(venue, (cfg or RateCfg()).groups.get(venue))
+        get_transport(venue).listeners.append(
+            lambda method, url, status, headers:
+                s.on_response(classify(venue, method, url.path), status, headers))
+    return s
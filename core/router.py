@@ -0,0 +1,138 @@
+# core/router.py
+"""
+헷지 venue 선택 – primary(binanceusdm) + hot-standby(bybit).
+
+  두 venue 모두 WS 시세와 REST 커넥션을 항상 유지하고, 헷지 주문마다 점수가 가장 낮은 venue 로 보낸다
+    score(bp) = 최선 호가 대비 가격 불리함 + rtt_ewma × latency_bp_per_ms + err_ewma × error_bp
+  REST 왕복 : 실제 헷지 주문 + probe_sec 마다 fetch_time() (EWMA, 연결 warm 유지 겸)
+  제외      : 주문 오류 / 거절 → 즉시 cooldown_ms 동안 제외 (다음 flush 는 바로 다른 venue 로)
+              rtt EWMA 가 max_rtt_ms 를 넘어도 제외. 모두 제외되면 primary 로 보낸다
+  시각은 loop.time() 기준.
+"""
+import asyncio, logging
+
+from prometheus_client import Counter, Gauge
+
+from .bus       import MarketBus
+from .models    import RouteCfg
+from .ratelimit import Prio
+
+ROUTE_C  = Counter("hedge_route_total", "venue 별 헷지 주문 라우팅 수", ["venue"])
+ROUTE_RT = Gauge("hedge_rtt_ms", "venue 별 REST 왕복 EWMA (ms)", ["venue"])
+ROUTE_UP = Gauge("hedge_venue_up", "라우팅 대상 여부 (1 = 사용 가능)", ["venue"])
+
+_A_RTT = 0.2                                # EWMA 가중치
+_A_ERR = 0.1
+
+
+class HedgeVenue:
+    """헷지 venue 하나 – bus 의 'hedge' 슬롯이 이 venue 의 최우선 호가"""
+    def __init__(self, ex, bus: MarketBus, limiter=None):
+        self.name    = ex.id
+        self.ex      = ex                   # init(symbols=…) 된 ExchWrapper – batch 주문용
+        self.bus     = bus
+        self.limiter = limiter              # venue RateScheduler | None
+        self.rtt     = 0.0                  # ms (EWMA, 0 = 아직 모름)
+        self.err     = 0.0                  # 최근 오류율 (EWMA)
+        self.down    = 0.0                  # loop.time() 이 이 값 전이면 제외
+        self._views  = {}
+
+    def view(self, symbol: str):
+        v = self._views.get(symbol)
+        if v is None:
+            v = self._views[symbol] = self.ex.view(symbol)
+        return v
+
+    def top(self, i: int, side: str) -> float:
+        """hedge side 로 바로 체결될 가격 (buy → ask, sell → bid), 없으면 0"""
+        px = (self.bus.ask if side == "buy" else self.bus.bid)["hedge"][i]
+        return self.bus.scales[i]["hedge"].px_float(int(px)) if px else 0.0
+
+
+class HedgeRouter:
+    def __init__(self, venues: list[HedgeVenue], cfg: RouteCfg, rows: dict[str, int],
+                 deadline_ms: int = 5000):
+        self.venues   = venues              # [0] = primary
+        self.cfg      = cfg
+        self.rows     = rows                # hedge symbol → bus 행
+        self.deadline = deadline_ms / 1000
+        self.log      = logging.getLogger("HedgeRouter")
+        for v in venues:
+            ROUTE_UP.labels(v.name).set(1)
+
+    @staticmethod
+    def _now() -> float:
+        return asyncio.get_running_loop().time()
+
+    def up(self, v: HedgeVenue) -> bool:
+        return v.down <= self._now()
+
+    def healthy(self) -> bool:
+        return any(self.up(v) for v in self.venues)
+
+    def pick(self, symbol: str, side: str) -> HedgeVenue:
+        """이번 헷지 주문을 보낼 venue"""
+        i, c  = self.rows[symbol], self.cfg
+        quote = [(v, v.top(i, side)) for v in self.venues if self.up(v)]
+        quote = [(v, px) for v, px in quote if px]
+        if not quote:
+            v = next((v for v in self.venues if self.up(v)), self.venues[0])
+        elif len(quote) == 1:
+            v = quote[0][0]
+        else:
+            best = min(px for _, px in quote) if side == "buy" else max(px for _, px in quote)
+            sign = 1 if side == "buy" else -1
+
+            def score(vp):
+                v, px = vp
+                return (sign * (px - best) / best * 1e4
+                        + v.rtt * c.latency_bp_per_ms + v.err * c.error_bp)
+            v = min(quote, key=score)[0]
+        ROUTE_C.labels(v.name).inc()
+        return v
+
+    # ── 결과 기록 (HedgeAggregator / probe)
+    def ok(self, v: HedgeVenue, rtt_ms: float):
+        v.rtt = rtt_ms if not v.rtt else v.rtt + _A_RTT * (rtt_ms - v.rtt)
+        v.err *= 1 - _A_ERR
+        ROUTE_RT.labels(v.name).set(v.rtt)
+        if v.rtt > self.cfg.max_rtt_ms and self.up(v):
+            self._down(v, f"rtt {v.rtt:.0f} ms")
+
+    def fail(self, v: HedgeVenue, reason):
+        v.err += _A_ERR * (1 - v.err)
+        self._down(v, reason)
+
+    def hold(self, v: HedgeVenue, reason):
+        """외부 판정 (core/liveness.py) 으로 제외 – 오류율은 올리지 않는다"""
+        if self.up(v):
+            self._down(v, reason)
+
+    def release(self, v: HedgeVenue):
+        v.down = 0.0
+        ROUTE_UP.labels(v.name).set(1)
+        self.log.info("%s 복귀", v.name)
+
+    def _down(self, v: HedgeVenue, reason):
+        v.down = self._now() + self.cfg.cooldown_ms / 1000
+        ROUTE_UP.labels(v.name).set(0)
+        self.log.warning("%s 제외 %.0f s (%s)", v.name, self.cfg.cooldown_ms / 1000, reason)
+
+    # ── 주기 측정 – 쉬는 동안에도 rtt 를 알고, cooldown 이 끝난 venue 를 다시 확인
+    async def _probe(self, v: HedgeVenue):
+        if v.limiter and not await v.limiter.acquire("default", Prio.MONITOR, self.deadline):
+            return
+        t0 = self._now()
+        try:
+            await v.ex.ccxt_ex.fetch_time()
+        except Exception as e:
+            self.fail(v, e)
+            return
+        self.ok(v, (self._now() - t0) * 1000)
+        if self.up(v):
+            ROUTE_UP.labels(v.name).set(1)
+
+    async def run(self):
+        while True:
+            await asyncio.gather(*(self._probe(v) for v in self.venues))
+            await asyncio.sleep(self.cfg.probe_sec)
@@ -0,0 +1,340 @@
+# core/sim.py
+"""
+run_mode: SIM – 기록된 틱(core/journal.py)을 실제 Strategy / OMS 에 재생하는 백테스트.
+
+  - VirtualClockLoop : loop.time() 이 가상 시계. 할 일이 없으면 다음 타이머 시각으로 바로 점프
+                       → REST 지연 / rate limit / 폴링 주기가 모두 가상 시간으로 흐른다
+  - SimExchange      : ExchWrapper 대역. 주문 접수 지연, 호가 대기열(queue position) 체결,
+                       taker 즉시 체결, 수수료 모델
+  - run_sim()        : 한 번 실행 → PnL / 체결 수 / 헷지 슬리피지 / 주문 churn 통계
+  - sweep()          : 파라미터 조합을 프로세스 풀로 병렬 실행
+
+python -m core.sim --grid strategy.bp_threshold=0.3,0.5 --grid strategy.order_size_krw=100000,200000
+"""
+import asyncio, argparse, itertools, json, logging, random, selectors
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import ccxt.async_support as ccxt
+
+from .bus      import MarketBus
+from .fills    import FillTracker
+from .hedger   import HedgeAggregator
+from .fixed    import Scale
+from .journal  import VENUES, header, read_segment, segments
+from .ledger   import PositionLedger
+from .models   import Settings, SimCfg, load_config
+from .oms      import OMS
+from .strategy import Strategy
+
+
+# ────────────────────────────── 가상 시계 이벤트 루프
+class _VirtualSelector:
+    """실제 selector 는 self-pipe 용으로만 쓰고, 대기 시간만큼 가상 시계를 앞당긴다"""
+    def __init__(self):
+        self._sel = selectors.DefaultSelector()
+        self.loop = None
+
+    def select(self, timeout=None):
+        if timeout is None:                 # 타이머도 없음 → 외부(스레드) 깨우기만 확인
+            return self._sel.select(0)
+        if timeout > 0:
+            self.loop._now += timeout
+        return []
+
+    def __getattr__(self, name):            # register / unregister / get_map / close …
+        return getattr(self._sel, name)
+
+
+class VirtualClockLoop(asyncio.SelectorEventLoop):
+    def __init__(self, start: float = 0.0):
+        self._now = start
+        sel = _VirtualSelector()
+        super().__init__(sel)
+        sel.loop = self
+
+    def time(self) -> float:
+        return self._now
+
+
+# ────────────────────────────── 모의 거래소
+class SimOrder:
+    __slots__ = ("oid", "side", "price", "qty", "filled", "ahead", "cid")
+
+    def __init__(self, oid, side, price, qty, ahead=0, cid=None):
+        self.oid, self.side, self.price, self.qty = oid, side, price, qty
+        self.filled, self.ahead, self.cid = 0, ahead, cid
+
+
+class SimStats:
+    def __init__(self):
+        self.limits = self.cancels = self.markets = 0
+        self.fills  = 0
+        self.fees   = 0.0
+        self.slip_bp: list[float] = []
+
+
+class SimExchange:
+    """ExchWrapper 와 같은 인터페이스 (limit / market / cancel, 가격·수량은 Scale 정수)"""
+    def __init__(self, id: str, symbol: str, scale: Scale, sim: SimCfg,
+                 rng: random.Random, stats: SimStats, maker_bp: float, taker_bp: float):
+        self.id, self.symbol, self.scale = id, symbol, scale
+        self.ccxt_ex = None
+        self.sim, self.rng, self.stats   = sim, rng, stats
+        self.maker, self.taker = maker_bp / 1e4, taker_bp / 1e4
+        self.tracker: FillTracker | None = None      # spot 만 – 체결 통지
+        self.book   = (0, 0, 0, 0)                   # bid ask bid_sz ask_sz
+        self.orders: dict[str, SimOrder] = {}
+        self.pos    = 0                              # 순포지션 (qty 정수)
+        self.cash   = 0.0                            # quote 통화
+        self._seq   = 0
+
+    async def _latency(self):
+        ms = self.rng.gauss(self.sim.latency_ms, self.sim.latency_jitter_ms)
+        await asyncio.sleep(max(ms, 0.0) / 1000)
+
+    def _oid(self) -> str:
+        self._seq += 1
+        return f"{self.id}-{self._seq}"
+
+    # ── REST 대역
+    async def limit(self, side: str, amount: int, price: int, cid: str | None = None):
+        await self._latency()
+        self.stats.limits += 1
+        bid, ask, bsz, asz = self.book
+        o = SimOrder(self._oid(), side, price, amount, cid=cid)
+        self.orders[o.oid] = o
+        loop = asyncio.get_running_loop()
+        if (side == "buy" and ask and price >= ask) or (side == "sell" and bid and price <= bid):
+            # 즉시 체결 – 응답을 돌려준 뒤에 통지 (OMS 가 watch 에 먼저 등록)
+            loop.call_soon(self._fill, o, amount, ask if side == "buy" else bid, self.taker)
+        else:
+            o.ahead = bsz if (side == "buy" and price == bid) else \
+                      asz if (side == "sell" and price == ask) else 0
+        return {"id": o.oid, "clientOrderId": cid}
+
+    async def cancel(self, order_id: str):
+        await self._latency()
+        self.stats.cancels += 1
+        o = self.orders.pop(order_id, None)
+        if o is None:
+            raise ccxt.OrderNotFound(order_id)
+        self._notify(o, True)
+
+    async def market(self, side: str, amount: int, reduce_only: bool = False,
+                     cid: str | None = None):
+        ref = self.book[1] if side == "buy" else self.book[0]   # 주문 시점 호가
+        await self._latency()
+        self.stats.markets += 1
+        px  = self.book[1] if side == "buy" else self.book[0]   # 도착 시점 호가
+        if ref:
+            adverse = (px - ref) if side == "buy" else (ref - px)
+            self.stats.slip_bp.append(adverse / ref * 1e4)
+        self._book_trade(side, amount, px, self.taker)
+        return {"id": self._oid(), "clientOrderId": cid}
+
+    # ── 시세 반영 / 체결
+    def on_tick(self, bid: int, ask: int, bsz: int, asz: int):
+        pbid, pask, pbsz, pasz = self.book
+        self.book = (bid, ask, bsz, asz)
+        for o in list(self.orders.values()):
+            if o.side == "buy":
+                if ask and ask <= o.price:                       # 가격이 우리 호가를 관통
+                    self._fill(o, o.qty - o.filled, o.price, self.maker)
+                elif bid == o.price == pbid and bsz < pbsz:      # 같은 호가에서 앞 물량 소진
+                    o.ahead -= pbsz - bsz
+            else:
+                if bid and bid >= o.price:
+                    self._fill(o, o.qty - o.filled, o.price, self.maker)
+                elif ask == o.price == pask and asz < pasz:
+                    o.ahead -= pasz - asz
+            if o.oid in self.orders and o.ahead < 0:
+                self._fill(o, min(o.qty - o.filled, -o.ahead), o.price, self.maker)
+                o.ahead = 0
+
+    def _book_trade(self, side: str, qty: int, px: int, fee: float):
+        notional = self.scale.px_float(px) * self.scale.qty_float(qty)
+        sign     = 1 if side == "buy" else -1
+        self.pos  += sign * qty
+        self.cash -= sign * notional + notional * fee
+        self.stats.fees += notional * fee
+
+    def _fill(self, o: SimOrder, qty: int, px: int, fee: float):
+        if qty <= 0 or o.oid not in self.orders:
+            return
+        o.filled += qty
+        self.stats.fills += 1
+        self._book_trade(o.side, qty, px, fee)
+        done = o.filled >= o.qty
+        if done:
+            del self.orders[o.oid]
+        self._notify(o, done)
+
+    def _notify(self, o: SimOrder, done: bool):
+        if self.tracker:
+            asyncio.get_running_loop().create_task(
+                self.tracker.update(o.oid, o.side, o.filled, done, o.cid))
+
+    def mark(self) -> float:
+        bid, ask = self.book[0], self.book[1]
+        mid = (self.scale.px_float(bid) + self.scale.px_float(ask)) / 2 if bid and ask else 0.0
+        return self.cash + self.scale.qty_float(self.pos) * mid
+
+
+class _FixedFx:
+    def __init__(self, krw: float):
+        self.scale = Scale(price_dp=8)
+        self.price = self.scale.px(krw)
+
+
+class _Null:
+    """prometheus 대역 (SIM 은 여러 번 돌 수 있어 레지스트리에 등록하지 않음)"""
+    def labels(self, **_):
+        return self
+    def inc(self, *_):
+        pass
+    def observe(self, *_):
+        pass
+
+
+# ────────────────────────────── 실행
+async def _replay(paths, bus: MarketBus, ex: dict, speed_log: logging.Logger):
+    loop  = asyncio.get_running_loop()
+    base  = loop.time()
+    t0    = None
+    n     = 0
+    for p in paths:
+        arr = read_segment(p)
+        if not len(arr):
+            continue
+        ts, vs = arr["ts_rx"].tolist(), arr["venue"].tolist()
+        bids, asks = arr["bid"].tolist(), arr["ask"].tolist()
+        bsz, asz   = arr["bid_sz"].tolist(), arr["ask_sz"].tolist()
+        if t0 is None:
+            t0 = ts[0]
+        for i in range(len(ts)):
+            d = base + (ts[i] - t0) / 1e9 - loop.time()
+            await asyncio.sleep(d if d > 0 else 0)
+            venue = VENUES[vs[i]]
+            ex[venue].on_tick(bids[i], asks[i], bsz[i], asz[i])
+            bus.publish(venue, bids[i], asks[i])
+        n += len(ts)
+        speed_log.info("replayed %s (%d ticks)", Path(p).name, len(ts))
+    return n, (loop.time() - base)
+
+
+async def _run(cfg: Settings) -> dict:
+    sim   = cfg.sim
+    pair  = cfg.pairs[0]                    # 재생은 pair 하나씩 (저널도 pair 별 디렉터리)
+    tdir  = sim.ticks_dir or Path(cfg.journal.dir) / pair.name
+    paths = list(segments(tdir))
+    if not paths:
+        raise FileNotFoundError(f"no tick segments in {tdir}")
+    scales = header(paths[0])["scale"]
+    rng    = random.Random(sim.seed)
+    stats  = SimStats()
+
+    spot_d, hedge_d = cfg.exchanges["spot"], cfg.exchanges["hedge_primary"]
+    spot  = SimExchange(spot_d.id,  pair.spot,  scales["spot"],  sim, rng, stats,
+                        sim.maker_fee_bp, sim.taker_fee_bp)
+    hedge = SimExchange(hedge_d.id, pair.hedge, scales["hedge"], sim, rng, stats,
+                        sim.hedge_fee_bp, sim.hedge_fee_bp)
+    bus   = MarketBus(scales)
+    ord_q, fill_q = asyncio.Queue(), asyncio.Queue()
+
+    strat = Strategy(cfg.strategy, bus, ord_q, _Null())
+    ledger = PositionLedger(cfg.ledger)
+    oms   = OMS(spot, hedge, cfg.strategy, ord_q, fill_q, _Null(), _FixedFx(sim.fx_krw),
+                hedger=HedgeAggregator(hedge, cfg.hedge, ledger=ledger), ledger=ledger)
+    oms._leverage_set = True
+    spot.tracker = FillTracker(oms.watch, fill_q)
+
+    tasks = [asyncio.create_task(strat.run()), asyncio.create_task(oms.run())]
+    ticks, span = await _replay(paths, bus, {"spot": spot, "hedge": hedge},
+                                logging.getLogger("Sim"))
+    await asyncio.sleep(sim.settle_sec)          # 마지막 헷지 / 취소 응답 대기
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    slip = sorted(stats.slip_bp)
+    return {
+        "bp_threshold":   cfg.strategy.bp_threshold,
+        "order_size_krw": cfg.strategy.order_size_krw,
+        "ticks":          ticks,
+        "sim_sec":        round(span, 3),
+        "pnl":            round(spot.mark() + hedge.mark(), 6),
+        "fees":           round(stats.fees, 6),
+        "fills":          stats.fills,
+        "limit_orders":   stats.limits,
+        "cancels":        stats.cancels,
+        "hedge_orders":   stats.markets,
+        "cancel_per_fill": round(stats.cancels / stats.fills, 3) if stats.fills else None,
+        "hedge_slip_bp_mean": round(sum(slip) / len(slip), 4) if slip else None,
+        "hedge_slip_bp_p99":  round(slip[int(len(slip) * 0.99)], 4) if slip else None,
+        "spot_pos":       spot.scale.qty_float(spot.pos),
+        "hedge_pos":      hedge.scale.qty_float(hedge.pos),
+    }
+
+
+def run_sim(cfg: Settings) -> dict:
+    """가상 시계 루프에서 한 번 실행 (스레드 / 프로세스 어디서든 호출 가능)"""
+    loop = VirtualClockLoop()
+    try:
+        return loop.run_until_complete(_run(cfg))
+    finally:
+        loop.close()
+
+
+# ────────────────────────────── 파라미터 스윕
+def _override(raw: dict, dotted: dict) -> dict:
+    for key, val in dotted.items():
+        node = raw
+        *path, last = key.split(".")
+        for k in path:
+            node = node.setdefault(k, {})
+        node[last] = val
+    return raw
+
+
+def _sweep_one(args) -> dict:
+    raw, dotted = args
+    return run_sim(Settings(**_override(json.loads(json.dumps(raw)), dotted)))
+
+
+def sweep(cfg: Settings, grid: dict[str, list], procs: int | None = None) -> list[dict]:
+    """grid = {"strategy.bp_threshold": [0.3, 0.5], ...} 의 모든 조합을 병렬 실행"""
+    keys  = list(grid)
+    jobs  = [(cfg.model_dump(), dict(zip(keys, vals)))
+             for vals in itertools.product(*(grid[k] for k in keys))]
+    with ProcessPoolExecutor(max_workers=procs) as pool:
+        return list(pool.map(_sweep_one, jobs))
+
+
+def _cli():
+    ap = argparse.ArgumentParser(description="tick replay backtest / parameter sweep")
+    ap.add_argument("-c", "--config", default="config.yaml")
+    ap.add_argument("--ticks", help="틱 세그먼트 디렉터리 (기본: sim.ticks_dir / journal.dir/<첫 pair>)")
+    ap.add_argument("--grid", action="append", default=[],
+                    help="key=v1,v2 (예: strategy.bp_threshold=0.3,0.5)")
+    ap.add_argument("--procs", type=int, default=None)
+    a = ap.parse_args()
+
+    cfg = load_config(a.config)
+    if a.ticks:
+        cfg.sim.ticks_dir = a.ticks
+    logging.basicConfig(level=cfg.runtime.log_level,
+                        format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    if not a.grid:
+        print(json.dumps(run_sim(cfg)))
+        return
+    grid = {}
+    for g in a.grid:
+        k, _, vs = g.partition("=")
+        grid[k] = [json.loads(v) for v in vs.split(",")]
+    for r in sweep(cfg, grid, a.procs):
+        print(json.dumps(r))
+
+
+if __name__ == "__main__":
+    _cli()
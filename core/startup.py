@@ -0,0 +1,53 @@
+# core/startup.py
+"""
+기동 단계별 소요 시간 – 재시작 후 첫 호가까지가 미헷지 위험 구간.
+
+  startup.begin()         : main() 진입 시각 (이 시점부터 잰다)
+  startup.mark(phase)     : 단계 완료 – 처음 한 번만 기록 (startup_phase_sec{phase})
+  startup.first_quote()   : OMS 가 첫 호가를 걸었을 때 → time_to_first_quote_sec, 목표 초과면 경고
+
+시간은 time.monotonic(). begin() 전에는 아무것도 하지 않는다 (SIM / bench).
+"""
+import logging, time
+
+from prometheus_client import Gauge
+
+PHASE_SEC = Gauge("startup_phase_sec", "기동 후 각 단계 완료까지 걸린 시간 (초)", ["phase"])
+TTFQ_SEC  = Gauge("time_to_first_quote_sec", "기동 후 첫 호가까지 걸린 시간 (초)")
+TTFQ_GOAL = Gauge("time_to_first_quote_target_sec", "첫 호가 목표 시간 (초)")
+
+
+class Startup:
+    def __init__(self):
+        self.t0     = 0.0
+        self.target = 0.0
+        self.done   = set()
+        self.quoted = False
+        self.log    = logging.getLogger("Startup")
+
+    def begin(self, target_sec: float = 0.0):
+        self.t0, self.target = time.monotonic(), target_sec
+        self.done.clear()
+        self.quoted = False
+        TTFQ_GOAL.set(target_sec)
+
+    def mark(self, phase: str) -> float:
+        if not self.t0 or phase in self.done:
+            return 0.0
+        self.done.add(phase)
+        dt = time.monotonic() - self.t0
+        PHASE_SEC.labels(phase).set(dt)
+        self.log.info("%-12s %.3f s", phase, dt)
+        return dt
+
+    def first_quote(self):
+        if self.quoted or not self.t0:
+            return
+        self.quoted = True
+        dt = self.mark("first_quote")
+        TTFQ_SEC.set(dt)
+        if self.target and dt > self.target:
+            self.log.warning("첫 호가 %.2f s – 목표 %.2f s 초과", dt, self.target)
+
+
+startup = Startup()
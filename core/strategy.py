@@ -1,58 +1,148 @@
-import asyncio, decimal as D
+import asyncio
+from fractions import Fraction
 from .models import StratCfg
+from .fixed  import P10, div_half_even
+from .trace  import tracer, now
+from .startup import startup
+import numpy as np
 import time
 import logging
 class Strategy:
+    IMPLIED_DP = 8                     # implied 가격 자릿수 (기존 quantize 1e-8)
+    EPS        = 1e-9                  # float 판정이 이 이내로 경계에 붙으면 정수로 재확인
+
     def __init__(self,
                  cfg,               # StratCfg
-                 mkt_q,             # asyncio.Queue
-                 ord_q,             # asyncio.Queue
+                 bus,               # MarketBus
+                 ord_q,             # asyncio.Queue | pair 별 asyncio.Queue 리스트
                  loop_metric,       # prometheus_client.Summary
-                 loop_ms: int = 100
+                 books=None,        # core.book.Books | None – 있으면 hedge vwap 기준 스프레드
                  ):
         self.cfg        = cfg
-        self.mkt_q      = mkt_q
-        self.ord_q      = ord_q
+        self.bus        = bus
+        self.books      = books
+        self.ord_q      = ord_q if isinstance(ord_q, list) else [ord_q]
         self.loop_metric= loop_metric
-        self.loop_ms = loop_ms
-        self.loop_s     = loop_ms / 1000     # 100 ms → 0.1
-        self.snap       = {}
         self.log        = logging.getLogger("Strategy")
 
+        # ── 정수 연산용 상수 (pair 별)
+        band            = Fraction(cfg.band)            # Decimal → 정확한 유리수
+        self._band_n    = band.numerator
+        self._band_d    = band.denominator
+        self._imp_num, self._imp_mul, self._spot_mul = [], [], []
+        for sc in bus.scales:
+            s_dp, h_dp = sc["spot"].price_dp, sc["hedge"].price_dp
+            cmp_dp     = max(self.IMPLIED_DP, s_dp)     # 비교 스케일
+            self._imp_num.append(2 * P10[h_dp + self.IMPLIED_DP])   # 1 / ((b+a)/2)
+            self._imp_mul.append(P10[cmp_dp - self.IMPLIED_DP])
+            self._spot_mul.append(P10[cmp_dp - s_dp])
+
+        # ── 벡터 계산용 (float64) – 경계 근처만 정수 경로로 재확인
+        self._v_band    = float(band)
+        self._v_imp_num = np.array(self._imp_num, np.float64)
+        self._v_imp_mul = np.array(self._imp_mul, np.float64)
+        self._v_spot_mul= np.array(self._spot_mul, np.float64)
+
+    def spreads(self, bid: int, ask: int, bid_f: int, ask_f: int, i: int = 0):
+        """
+        pair i 의 (buy_ok, sell_ok, implied) – 모두 정수 연산
+          implied = round(1 / f_mid, 8)
+          buy_sp  = (implied - ask) / ask  >= band
+          sell_sp = (bid - implied) / bid  >= band
+        """
+        implied = div_half_even(self._imp_num[i], bid_f + ask_f)
+        imp_c   = implied * self._imp_mul[i]
+        ask_c   = ask * self._spot_mul[i]
+        bid_c   = bid * self._spot_mul[i]
+        n, d    = self._band_n, self._band_d
+        buy_ok  = (imp_c - ask_c) * d >= n * ask_c
+        sell_ok = (bid_c - imp_c) * d >= n * bid_c
+        return buy_ok, sell_ok, implied
+
+    def spreads_vec(self, idx: np.ndarray):
+        """
+        행 idx 의 (buy_ok, sell_ok) 를 NumPy 로 한 번에.
+        float 결과가 반올림 / band 경계에서 EPS 이내인 행만 spreads() 로 다시 계산해
+        정수 경로와 항상 같은 결과를 낸다.
+        """
+        bus = self.bus
+        return self._vec(idx, bus.bid["hedge"][idx], bus.ask["hedge"][idx])
+
+    def spreads_depth(self, idx: np.ndarray):
+        """
+        slippage 반영 – implied 를 f_mid 대신 헷지가 실제로 체결될 vwap (ref_qty 기준) 으로.
+          buy  (spot 매수 → hedge 매도) : implied = 1 / hedge bid vwap
+          sell (spot 매도 → hedge 매수) : implied = 1 / hedge ask vwap
+        hedge 호가창 깊이가 모자라면 (vwap 0) 해당 방향은 False.
+        """
+        hb, ha = self.books.hedge_vwap(idx)
+        buy_ok, _  = self._vec(idx, hb, hb)
+        _, sell_ok = self._vec(idx, ha, ha)
+        return buy_ok & (hb > 0), sell_ok & (ha > 0)
+
+    def _vec(self, idx: np.ndarray, bid_f: np.ndarray, ask_f: np.ndarray):
+        bus      = self.bus
+        bid, ask = bus.bid["spot"][idx], bus.ask["spot"][idx]
+
+        with np.errstate(divide="ignore", invalid="ignore"):    # vwap 0 행 (inf / nan → 호출자가 버림)
+            q     = self._v_imp_num[idx] / (bid_f + ask_f)
+            imp   = np.rint(q)                          # half-even
+            imp_c = imp * self._v_imp_mul[idx]
+            sm    = self._v_spot_mul[idx]
+            ask_c, bid_c = ask * sm, bid * sm
+            buy_m  = (imp_c - ask_c) / ask_c - self._v_band
+            sell_m = (bid_c - imp_c) / bid_c - self._v_band
+            buy_ok, sell_ok = buy_m >= 0, sell_m >= 0
+
+            near = (np.abs(q - np.floor(q) - 0.5) < self.EPS) | \
+                   (np.abs(buy_m) < self.EPS) | (np.abs(sell_m) < self.EPS)
+        for k in np.flatnonzero(near):
+            buy_ok[k], sell_ok[k], _ = self.spreads(int(bid[k]), int(ask[k]),
+                                                    int(bid_f[k]), int(ask_f[k]), int(idx[k]))
+        return buy_ok, sell_ok
+
     async def run(self):
+        seen = 0
+        bus  = self.bus
         while True:
+            # 1) 시세가 바뀔 때까지 대기 (바뀌지 않았으면 깨어나지 않음)
+            seen  = await bus.wait(seen)
             start = time.perf_counter()
 
-            # 1) 큐 비우기
-            try:
-                while True:
-                    ev = self.mkt_q.get_nowait()
-                    self.snap.update(ev)
-            except asyncio.QueueEmpty:
-                pass
-            if 0 in (self.snap.get('ask', 0), self.snap.get('bid', 0),
-                    self.snap.get('ask_f', 0), self.snap.get('bid_f', 0)):
-                await asyncio.sleep(self.loop_s)
+            # 2) 바뀐 pair 중 네 가격이 모두 있는 것만 한 번에 계산
+            idx = bus.drain()
+            idx = idx[bus.ready_mask()[idx]]
+            if not idx.size:
                 continue
-            # 2) 데이터가 충분할 때만 스프레드 계산
-            if {'bid','ask','bid_f','ask_f'} <= self.snap.keys():
-                f_mid = (self.snap['bid_f'] + self.snap['ask_f']) / 2
-                implied = (D.Decimal(1) / f_mid).quantize(D.Decimal('0.00000001'))
-
-                buy_sp  = (implied - self.snap['ask']) / self.snap['ask']
-                sell_sp = (self.snap['bid'] - implied) / self.snap['bid']
-
-                # 주문 업데이트
-                await self.ord_q.put({"side":"bid",
-                                    "action":"update" if buy_sp>=self.cfg.band else "cancel",
-                                    "price": self.snap['ask']})
-                await self.ord_q.put({"side":"ask",
-                                    "action":"update" if sell_sp>=self.cfg.band else "cancel",
-                                    "price": self.snap['bid']})
-                # 디버그 로그
-                self.log.debug("buy_sp=%+.4f%% sell_sp=%+.4f%%",
-                            float(buy_sp*100), float(sell_sp*100))
-
-            # 루프 종료까지의 시간 기록
+            if not startup.quoted:
+                startup.mark("market_data")     # 네 가격이 처음 모두 들어온 시각
+            buy_ok, sell_ok = self.spreads_depth(idx) if self.books else self.spreads_vec(idx)
+            t_dec = now() if tracer.on else 0
+
+            # 3) pair 별 주문 업데이트
+            for k, i in enumerate(idx.tolist()):
+                ask, bid = int(bus.ask["spot"][i]), int(bus.bid["spot"][i])
+                # 지연 추적: 이번 판단을 일으킨 시세의 수신 / 디코드 시각
+                t = None
+                if t_dec:
+                    tracer.span("decode_decide", int(bus.t_dec[i]), t_dec)
+                    t = (int(bus.t_rx[i]), t_dec)
+                q = self.ord_q[i]
+                await q.put({"side":"bid",
+                             "action":"update" if buy_ok[k] else "cancel",
+                             "price": ask, "t": t})
+                await q.put({"side":"ask",
+                             "action":"update" if sell_ok[k] else "cancel",
+                             "price": bid, "t": t})
+                # 디버그 로그 (float 변환은 DEBUG 일 때만)
+                if self.log.isEnabledFor(logging.DEBUG):
+                    _, _, implied = self.spreads(bid, ask, int(bus.bid["hedge"][i]),
+                                                 int(bus.ask["hedge"][i]), i)
+                    imp = implied / P10[self.IMPLIED_DP]
+                    sc  = bus.scales[i]["spot"]
+                    a, b = sc.px_float(ask), sc.px_float(bid)
+                    self.log.debug("[%d] buy_sp=%+.4f%% sell_sp=%+.4f%%",
+                                   i, (imp - a) / a * 100, (b - imp) / b * 100)
+
+            # 판단 1회에 걸린 시간 기록
             self.loop_metric.observe((time.perf_counter()-start)*1000)
-            
\ No newline at end of file
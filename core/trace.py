@@ -0,0 +1,55 @@
+# core/trace.py
+"""
+시세 → 주문 파이프라인 구간별 지연 추적.
+
+  ex_rx          거래소 이벤트 시각 → WS 수신            (ex_sample 프레임마다 1번)
+  rx_decode      WS 수신 → 디코드 완료
+  decode_decide  디코드 완료 → Strategy 판단 (bus 에서 기다린 시간 포함)
+  decide_deq     Strategy 판단 → OMS 가 명령을 꺼냄
+  deq_sent       OMS 꺼냄 → REST 요청 송신 (rate limiter 대기 포함)
+  sent_ack       REST 송신 → 응답
+  fill_hedge_ack 체결 감지 → 헷지 주문 응답
+
+모든 시각은 time.time_ns(). 구간 값은 Prometheus Histogram (ms) 하나에 stage 라벨로 들어간다.
+order_log 를 켜면 주문마다 전 구간 시각을 "Trace" 로거에 JSON 한 줄로 남긴다.
+"""
+import json, logging, time
+
+from prometheus_client import Histogram
+
+from .models import TraceCfg
+
+STAGES = ("ex_rx", "rx_decode", "decode_decide", "decide_deq",
+          "deq_sent", "sent_ack", "fill_hedge_ack")
+
+STAGE_MS = Histogram(
+    "stage_latency_ms", "파이프라인 구간별 지연 (ms)", ["stage"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50,
+             100, 250, 500, 1000, 2500, 5000))
+
+now = time.time_ns
+
+
+class Tracer:
+    def __init__(self):
+        self.on        = False          # configure() 전에는 아무것도 하지 않음 (SIM / bench)
+        self.ex_sample = 16
+        self.order_log = False
+        self._h        = {s: STAGE_MS.labels(s) for s in STAGES}
+        self.log       = logging.getLogger("Trace")
+
+    def configure(self, cfg: TraceCfg):
+        self.on        = cfg.enabled
+        self.ex_sample = max(1, cfg.ex_sample)
+        self.order_log = cfg.enabled and cfg.order_log
+
+    def span(self, stage: str, t0: int, t1: int):
+        if t0:
+            self._h[stage].observe((t1 - t0) / 1e6)
+
+    def order(self, **ts):
+        if self.order_log:
+            self.log.info(json.dumps(ts, separators=(",", ":")))
+
+
+tracer = Tracer()
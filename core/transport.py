@@ -0,0 +1,153 @@
+# core/transport.py
+"""
+venue 별 공용 HTTP 전송 계층.
+
+ExchWrapper / FxPoller 등 REST 사용자는 모두 같은 aiohttp 세션(커넥션 풀)을 쓴다.
+  - keep-alive 풀 (pool_size), DNS 캐시 (dns_ttl)
+  - TCP_NODELAY : aiohttp 가 모든 클라이언트 소켓에 기본 적용
+  - keep-warm   : keep_warm_sec 동안 요청이 없으면 가벼운 GET 으로 연결을 데워 둠
+                  → 한산할 때 다음 주문이 TLS 핸드셰이크를 새로 하지 않게
+  - Prometheus  : 사용 중 요청 수, 핸드셰이크(신규 연결), 재사용 비율
+  - listeners   : 응답마다 (method, url, status, headers) 를 넘긴다 → core/ratelimit.py
+  - 지연        : 주문 계열(POST / DELETE / PUT) 요청의 왕복 시간 최근 샘플 + 응답 대기 중인 요청 시작 시각
+                  → core/liveness.py 가 percentile / 멈춘 요청을 본다
+"""
+import asyncio, logging
+from collections import deque
+from typing import Dict
+
+import aiohttp
+from prometheus_client import Counter, Gauge
+
+from .models import TransportCfg
+
+
+HTTP_INFLIGHT = Gauge("http_inflight", "사용 중인 HTTP 요청(연결) 수", ["venue"])
+HTTP_NEWCONN  = Counter("http_handshakes_total", "신규 TCP/TLS 연결 수", ["venue"])
+HTTP_REUSE    = Counter("http_conn_reused_total", "풀에서 재사용한 연결 수", ["venue"])
+HTTP_REUSE_R  = Gauge("http_conn_reuse_ratio", "연결 재사용 비율", ["venue"])
+
+# 가벼운 keep-warm 엔드포인트 (ccxt id 기준)
+ORDER_METHODS = ("POST", "DELETE", "PUT")   # 실제 주문 / 취소 (조회 / keep-warm 은 GET)
+RTT_SAMPLES   = 256
+
+WARM_URL = {
+    "upbit":       "https://api.upbit.com/v1/ticker?markets=KRW-BTC",
+    "binanceusdm": "https://fapi.binance.com/fapi/v1/ping",
+    "bybit":       "https://api.bybit.com/v5/market/time",
+}
+
+
+class Transport:
+    def __init__(self, venue: str, cfg: TransportCfg):
+        self.venue    = venue
+        self.cfg      = cfg
+        self.log      = logging.getLogger(f"Transport[{venue}]")
+        self.created  = 0
+        self.reused   = 0
+        self.last_use = 0.0
+        self._warm_task = None
+        self.listeners  = []                # fn(method, url, status, headers)
+        self.rtt      = deque(maxlen=RTT_SAMPLES)   # (끝난 loop.time(), ms) – 주문 계열만
+        self.pending  = {}                  # id(요청 ctx) → 시작 loop.time()
+
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(self._on_start)
+        trace.on_request_end.append(self._on_resp)
+        trace.on_request_exception.append(self._on_end)
+        trace.on_connection_create_end.append(self._on_create)
+        trace.on_connection_reuseconn.append(self._on_reuse)
+
+        self.connector = aiohttp.TCPConnector(
+            limit=cfg.pool_size,
+            limit_per_host=cfg.pool_size,
+            ttl_dns_cache=cfg.dns_ttl,
+            keepalive_timeout=cfg.keepalive_sec,
+            enable_cleanup_closed=True,
+        )
+        self.session = aiohttp.ClientSession(connector=self.connector,
+                                             trace_configs=[trace])
+
+    # ── trace hooks
+    async def _on_start(self, session, ctx, params):
+        HTTP_INFLIGHT.labels(self.venue).inc()
+        self.pending[id(ctx)] = asyncio.get_running_loop().time()
+
+    async def _on_end(self, session, ctx, params):
+        HTTP_INFLIGHT.labels(self.venue).dec()
+        t  = self.last_use = asyncio.get_running_loop().time()
+        t0 = self.pending.pop(id(ctx), None)
+        if t0 is not None and params.method in ORDER_METHODS:
+            self.rtt.append((t, (t - t0) * 1000))
+
+    async def _on_resp(self, session, ctx, params):
+        await self._on_end(session, ctx, params)
+        r = params.response
+        for fn in self.listeners:
+            fn(params.method, params.url, r.status, r.headers)
+
+    async def _on_create(self, *_):
+        self.created += 1
+        HTTP_NEWCONN.labels(self.venue).inc()
+        self._ratio()
+
+    async def _on_reuse(self, *_):
+        self.reused += 1
+        HTTP_REUSE.labels(self.venue).inc()
+        self._ratio()
+
+    def _ratio(self):
+        HTTP_REUSE_R.labels(self.venue).set(self.reused / (self.created + self.reused))
+
+    # ── keep-warm
+    def start_keep_warm(self, url: str | None = None):
+        url = url or WARM_URL.get(self.venue)
+        if not url or not self.cfg.keep_warm_sec or self._warm_task:
+            return
+        self._warm_task = asyncio.create_task(self._keep_warm(url))
+
+    async def _keep_warm(self, url: str):
+        loop, period = asyncio.get_running_loop(), self.cfg.keep_warm_sec
+        while True:
+            idle = loop.time() - self.last_use
+            if idle >= period:
+                await asyncio.gather(*(self._warm(url) for _ in range(self.cfg.warm_conns)))
+                idle = 0
+            await asyncio.sleep(period - idle)
+
+    async def _warm(self, url: str):
+        try:
+            async with self.session.get(url) as r:
+                await r.read()
+        except Exception as e:
+            self.log.debug("keep-warm fail: %s", e)
+
+    async def close(self):
+        if self._warm_task:
+            self._warm_task.cancel()
+        await self.session.close()
+
+
+def rehost(url: str, base: str | None) -> str:
+    """url 의 scheme://host 를 base 로 바꾼다 (mock 거래소 / 프록시) – base 가 없으면 그대로"""
+    if not base:
+        return url
+    i = url.find("/", url.find("//") + 2)
+    return base.rstrip("/") + (url[i:] if i > 0 else "")
+
+
+_pool: Dict[str, Transport] = {}
+
+
+def get_transport(venue: str, cfg: TransportCfg | None = None) -> Transport:
+    """venue 별 공용 Transport (최초 호출 시 생성 – 실행 중인 이벤트 루프 안에서)"""
+    t = _pool.get(venue)
+    if t is None:
+        t = _pool[venue] = Transport(venue, cfg or TransportCfg())
+    return t
+
+
+async def close_all():
+    for t in list(_pool.values()):
+        await t.close()
+    _pool.clear()
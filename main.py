@@ -1,16 +1,33 @@
-import asyncio, signal, logging, time
+import asyncio, json, signal, logging, time
+from pathlib import Path
 
 from dotenv         import dotenv_values
 from prometheus_client import start_http_server, Summary, Counter
 
 from core.models    import load_config
-from core.feed      import UpbitFeed, BinanceFeed
+from core.feed      import UpbitFeed, BinanceFeed, BybitFeed
+from core.feedproc  import ShmBridge, FeedProcess, run_loop
+from core.bus       import MarketBus
+from core.book      import Books
+from core.codec     import get_extras
+from core.journal   import TickJournal, TickRecorder
 from core.exchange  import ExchWrapper
 from core.strategy  import Strategy
 from core.oms       import OMS
 from core.fx        import FxPoller
 from core.monitor   import Monitor
+from core.liveness  import Liveness, VenueProbe
 from core.order_poller import UpbitOrderPoller
+from core.fills     import FillTracker, UpbitFillFeed
+from core.transport import close_all as close_transports, get_transport
+from core.ratelimit import get_scheduler
+from core.hedger    import HedgeAggregator
+from core.router    import HedgeRouter, HedgeVenue
+from core.ledger    import PositionLedger
+from core.trace     import tracer
+from core.logq      import setup_logging
+from core.markets   import MarketCache
+from core.startup   import startup
 import logging
 
 # ─── quiet websockets DEBUG ───────────────────────
@@ -18,62 +35,199 @@ logging.getLogger("websockets.client").setLevel(logging.INFO)
 # 필요하다면 서버 측도
 logging.getLogger("websockets.server").setLevel(logging.INFO)
 # ──────────────────────────────────────────────────
-async def main() -> None:
+async def main(cfg=None) -> None:
     # ─────────────────────────── 설정 로드
-    cfg = load_config()                    # 반드시 runtime.run_mode: LIVE 로 되어 있어야 함
+    cfg = cfg or load_config()             # 반드시 runtime.run_mode: LIVE 로 되어 있어야 함
+
+    # ─────────────────────────── SIM : 기록된 틱 재생 (가상 시계 루프는 별도 스레드)
+    if cfg.runtime.run_mode == "SIM":
+        from core.sim import run_sim
+        result = await asyncio.get_running_loop().run_in_executor(None, run_sim, cfg)
+        logging.getLogger("Sim").info("result %s", result)
+        print(json.dumps(result), flush=True)
+        return
 
     # ─────────────────────────── Prometheus
-    start_http_server(9100)
-    LOOP_LAT = Summary("strategy_loop_ms", "Strategy loop latency (ms)")
+    startup.begin(cfg.runtime.ttfq_target_sec)   # 기동 단계별 시간 / time_to_first_quote_sec
+    if cfg.runtime.metrics_port:
+        start_http_server(cfg.runtime.metrics_port)
+    LOOP_LAT = Summary("strategy_loop_ms", "Strategy decision latency (ms)")
     ORDERS_C = Counter("orders_total", "Spot limit‑주문 건수", ['side'])
-
-    # ─────────────────────────── 큐
-    mkt_q, ord_q, fill_q = asyncio.Queue(), asyncio.Queue(), asyncio.Queue()
-
-    # ─────────────────────────── WebSocket 피드
-    feeds = [
-    UpbitFeed(mkt_q, symbol="USDT-BTC"),          # 현물
-    BinanceFeed(mkt_q, stream="btcusdt@bookTicker")]  # 선물
+    tracer.configure(cfg.trace)            # 구간별 지연 stage_latency_ms{stage}
 
     # ─────────────────────────── REST 거래소 초기화
     keys = dotenv_values(".env")  # .env 에 UPBIT_KEY=…, BINANCEUSDM_KEY=…  형식
     upbit  = ExchWrapper(**cfg.exchanges['spot'].dict())
     hedge  = ExchWrapper(**cfg.exchanges['hedge_primary'].dict())
-    await asyncio.gather(upbit.init(keys), hedge.init(keys))
+    backup = ExchWrapper(**cfg.exchanges['hedge_backup'].dict()) \
+             if cfg.hedge.route.enabled and "hedge_backup" in cfg.exchanges else None  # hot-standby 헷지 venue
+    pairs  = cfg.pairs
+    cache  = MarketCache(cfg.markets)      # 설정 심볼 market 만 디스크 캐시 (load_markets 생략)
+    hsyms  = [p.hedge for p in pairs]
+    res = await asyncio.gather(            # venue 병렬 초기화 – venue 별 공용 커넥션 풀
+        upbit.init(keys, cfg.transport, [p.spot for p in pairs], cache),
+        hedge.init(keys, cfg.transport, hsyms, cache),
+        *([backup.init(keys, cfg.transport, hsyms, cache)] if backup else []),
+        return_exceptions=True)
+    for r in res[:2]:
+        if isinstance(r, BaseException):
+            raise r
+    if backup and isinstance(res[2], BaseException):     # backup 은 실패해도 primary 만으로 진행
+        logging.getLogger("main").error("hedge_backup(%s) 초기화 실패 – primary 만 사용: %s",
+                                        backup.id, res[2])
+        await backup.ccxt_ex.close()
+        backup = None
+    startup.mark("exchanges")
+
+    # ─────────────────────────── 시세 버스 / 큐 (pair 별 행)
+    bus = MarketBus([{"spot":  upbit.scales[p.spot],    # pair×venue×side 최신값 (conflating)
+                      "hedge": hedge.scales[p.hedge]}   # 가격은 market 메타 기반 고정소수점
+                     for p in pairs])
+    bk_bus  = MarketBus([{"hedge": backup.scales[p.hedge]} for p in pairs]) \
+              if backup else None          # backup 시세 – 라우팅 전용 (Strategy 는 보지 않음)
+    books   = None                         # L2 호가창 (선택) – vwap 스프레드 / 주문 수량 상한
+    if cfg.book.enabled:
+        if cfg.runtime.feeds == "process":
+            logging.getLogger("main").warning("process 피드 모드에서는 L2 호가창을 쓰지 않음")
+        else:
+            books = Books(bus.scales, {"spot": min(cfg.book.spot_levels, 30),
+                                       "hedge": cfg.book.hedge_levels})
+    ord_qs  = [asyncio.Queue() for _ in pairs]
+    fill_qs = [asyncio.Queue() for _ in pairs]
+
+    # ─────────────────────────── 틱 저널 (선택, pair 별 디렉터리)
+    journals, rec_spot, rec_hedge = [], None, None
+    if cfg.journal.enabled:
+        rec_spot, rec_hedge = [], []
+        for i, p in enumerate(pairs):
+            j = TickJournal(Path(cfg.journal.dir) / p.name, cfg.journal.segment_records, bus.scales[i])
+            journals.append(j)
+            rec_spot.append(TickRecorder(j, "spot",  get_extras("upbit",   bus.scales[i]["spot"])))
+            rec_hedge.append(TickRecorder(j, "hedge", get_extras("binance", bus.scales[i]["hedge"])))
+
+    # ─────────────────────────── REST 요청 스케줄러 (venue × group)
+    rl = cfg.ratelimit
+    spot_rl  = get_scheduler(upbit.id, rl)  # venue 공용 – 우선순위: 취소 > 신규 > 조회 > 모니터링
+    hedge_rl = get_scheduler(hedge.id, rl)
+    bk_rl    = get_scheduler(backup.id, rl) if backup else None
 
-    # ─────────────────────────── FX Poller (USDT/KRW 환율)
-    fx = FxPoller(cfg.fx)
+    # ─────────────────────────── FX (USDT/KRW 환율 – Upbit WS ticker, REST fallback)
+    fx_cfg = cfg.fx
+    if fx_cfg.stream and (cfg.runtime.feeds == "process" or fx_cfg.source != upbit.id):
+        logging.getLogger("main").warning(
+            "%s – 환율 ticker 를 WS 로 받지 않고 REST %d s 폴링",
+            "process 피드 모드" if cfg.runtime.feeds == "process" else f"fx.source {fx_cfg.source}",
+            fx_cfg.poll_sec)
+        fx_cfg = fx_cfg.model_copy(update={"stream": False})
+    fx = FxPoller(fx_cfg, upbit.ccxt_ex if fx_cfg.source == upbit.id else None,
+                  limiter=get_scheduler(fx_cfg.source, rl), deadline_ms=rl.monitor_deadline_ms)
+
+    # ─────────────────────────── WebSocket 피드 (venue 당 연결 하나)
+    ex_d   = cfg.exchanges                  # ws_url / rest_url : mock 거래소 (bench/loadtest.py)
+    ws_bk  = ex_d["hedge_backup"].ws_url if backup else None
+    codes, streams = [p.ws_code for p in pairs], [p.ws_stream for p in pairs]
+    topics = [p.ws_backup for p in pairs]
+    bridge = bk_bridge = None
+    if cfg.runtime.feeds == "process":     # 피드는 자식 프로세스 → 공유 메모리 → bus
+        if journals:
+            logging.getLogger("main").warning("process 피드 모드에서는 틱 저널을 기록하지 않음")
+        bridge = ShmBridge(bus, cfg.runtime.feed_poll_us)
+        feeds  = [bridge,
+                  FeedProcess("upbit",   codes,   bridge, cfg.runtime.decoder, cfg.trace,
+                              cfg.runtime.uvloop, cfg.runtime.log_level, url=ex_d["spot"].ws_url),
+                  FeedProcess("binance", streams, bridge, cfg.runtime.decoder, cfg.trace,
+                              cfg.runtime.uvloop, cfg.runtime.log_level,
+                              url=ex_d["hedge_primary"].ws_url)]
+        if backup:
+            bk_bridge = ShmBridge(bk_bus, cfg.runtime.feed_poll_us)
+            feeds += [bk_bridge,
+                      FeedProcess("bybit", topics, bk_bridge, cfg.runtime.decoder, cfg.trace,
+                                  cfg.runtime.uvloop, cfg.runtime.log_level, url=ws_bk)]
+    else:
+        feeds = [
+        UpbitFeed(bus, codes=codes, decoder=cfg.runtime.decoder, recorders=rec_spot,            # 현물
+                  books=books and books.book["spot"],
+                  fx=fx if fx_cfg.stream else None,                                       # + 환율 ticker
+                  url=ex_d["spot"].ws_url),
+        BinanceFeed(bus, streams=streams, decoder=cfg.runtime.decoder, recorders=rec_hedge,     # 선물
+                    books=books and books.book["hedge"],
+                    url=ex_d["hedge_primary"].ws_url, rest_url=ex_d["hedge_primary"].rest_url)]
+        if backup:
+            feeds.append(BybitFeed(bk_bus, topics=topics, decoder=cfg.runtime.decoder,          # 선물 backup
+                                   url=ws_bk))
 
     # ─────────────────────────── 핵심 모듈
     strat = Strategy(
         cfg.strategy,
-        mkt_q, ord_q,
+        bus, ord_qs,
         LOOP_LAT,
-        cfg.runtime.loop_ms
+        books=books
     )
-    oms = OMS(
-        upbit,         # spot
-        hedge,         # hedge
+    watch   = {}                           # oid → 주문 낸 OMS 의 fill_q
+    router  = HedgeRouter([HedgeVenue(hedge, bus, hedge_rl),          # 주문마다 헷지 venue 선택
+                           HedgeVenue(backup, bk_bus, bk_rl)],
+                          cfg.hedge.route, {p.hedge: i for i, p in enumerate(pairs)},
+                          deadline_ms=rl.monitor_deadline_ms) if backup else None
+    ledger  = PositionLedger(cfg.ledger)   # pair 별 포지션 / 순노출 (체결 + 헷지 ack, 주기 대사)
+    if backup:
+        ledger.add_venue(backup)
+    hedger  = HedgeAggregator(hedge, cfg.hedge, hedge_rl, router, ledger)   # 체결 상쇄 + batch 헷지 (pair 공유)
+    omss = [OMS(
+        upbit.view(p.spot),     # spot
+        hedge.view(p.hedge),    # hedge
         cfg.strategy,  # cfg
-        ord_q,
-        fill_q,
+        ord_qs[i],
+        fill_qs[i],
         ORDERS_C,      # prometheus counter 등
-        fx
-    )
-    poller = UpbitOrderPoller(upbit, oms.watch_set, fill_q, poll_ms=1000)
+        fx,
+        limiter=spot_rl,
+        watch=watch,
+        hedger=hedger,
+        max_unhedged=p.max_unhedged,
+        books=books, row=i, book_cfg=cfg.book,
+        ledger=ledger, bus=bus
+    ) for i, p in enumerate(pairs)]
+    tracker = FillTracker(watch, fill_qs[0])            # 누적 체결량 dedupe
+    poller  = UpbitOrderPoller(upbit, tracker, poll_ms=cfg.fills.poll_ms,
+                               limiter=spot_rl, deadline_ms=rl.query_deadline_ms)
+    fills   = UpbitFillFeed(upbit, tracker, resync=poller, url=ex_d["spot"].ws_url) \
+              if cfg.fills.source == "ws" else poller
+
+    monitor = Monitor(upbit, [hedge, backup] if backup else hedge, omss,
+                      limiters={"spot": spot_rl, "hedge": hedge_rl,
+                                **({backup.id: bk_rl} if backup else {})},
+                      deadline_ms=rl.monitor_deadline_ms)
 
-    monitor = Monitor(upbit, hedge, oms)
+    # ─────────────────────────── 수신 데이터 기반 생존 판정 (초 단위 – Monitor 는 느린 backstop)
+    def feed_of(kind):                     # process 피드면 소켓이 자식 프로세스에 있음 → None
+        return next((f for f in feeds if isinstance(f, kind)), None)
+    hv = router.venues if router else [None, None]
+    probes = [VenueProbe(upbit.id, "spot", bus, feed_of(UpbitFeed), get_transport(upbit.id)),
+              VenueProbe(hedge.id, "hedge", bus, feed_of(BinanceFeed), get_transport(hedge.id), hv[0])]
+    if backup:
+        probes.append(VenueProbe(backup.id, "hedge", bk_bus, feed_of(BybitFeed),
+                                 get_transport(backup.id), hv[1]))
+    liveness = Liveness(probes, omss, cfg.liveness, router)
+
+    async def quoting():                   # 첫 호가 전에 spot / primary REST 확인 – 실패하면 기동 중단
+        await asyncio.gather(upbit.ready(), hedge.ready())
+        startup.mark("rest")
+        await asyncio.gather(*(o.run() for o in omss))
 
     # ─────────────────────────── Task 묶음
     tasks = [
         fx.run(),
         monitor.run(),
-        poller.run(),
+        *([liveness.run()] if cfg.liveness.enabled else []),
+        ledger.run(),
+        fills.run(),
         *(f.run() for f in feeds),
         strat.run(),
-        oms.run()
+        quoting(),
+        *([router.run()] if router else [])
     ]
 
+    startup.mark("tasks")
     # ─────────────────────────── Graceful Shutdown
     loop_task = asyncio.gather(*tasks)
     for sig in (signal.SIGINT, signal.SIGTERM):
@@ -86,15 +240,30 @@ async def main() -> None:
             await upbit.ccxt_ex.close()
         if hasattr(hedge, "ccxt_ex"):
             await hedge.ccxt_ex.close()
+        if backup:
+            await backup.ccxt_ex.close()
+        await fx.close()
+        await close_transports()
+        for j in journals:
+            j.close()
+        if bridge:
+            for f in feeds:
+                if isinstance(f, FeedProcess):
+                    f.stop()
+            for b in (bridge, bk_bridge):
+                if b:
+                    b.close()
 
 
 
 # ─────────────────────────── 실행 진입점
 if __name__ == "__main__":
-    logging.basicConfig(
-        level=logging.DEBUG,
-        format="%(asc" \
-        "time)s %(levelname)s %(name)s: %(message)s")
+    cfg = load_config()
+    listener = setup_logging(cfg.runtime.log_level, cfg.log)   # 큐 + writer 스레드 (core/logq.py)
     logging.getLogger("ccxt.base.exchange").setLevel(logging.INFO)
 
-    asyncio.run(main())
+    try:
+        run_loop(main(cfg), cfg.runtime.uvloop)    # runtime.uvloop: uvloop 가 있으면 사용
+    finally:
+        if listener:
+            listener.stop()                        # 남은 로그 flush
@@ -0,0 +1,124 @@
+# tests/test_book.py
+"""
+L2Book / DiffSync – Binance USD-M diff depth 규칙.
+  snapshot 뒤 첫 이벤트 : U <= lastUpdateId <= u (u < lastUpdateId 는 버림, U > lastUpdateId 면 gap)
+  그 다음부터           : pu == 직전 u, 아니면 gap → 책을 비우고 resync
+"""
+import pytest
+
+from core.book import DiffSync, L2Book
+
+
+def _book(cap=50):
+    return L2Book(cap=cap)
+
+
+def _synced(last_id=100):
+    s = DiffSync(_book())
+    assert s.on_snapshot(last_id, [(1000, 5), (999, 3)], [(1001, 4), (1002, 6)])
+    return s
+
+
+# ────────────────────────────── DiffSync
+def test_first_event_rule():
+    """버퍼 재생 – snapshot 에 이미 든 이벤트는 버리고 U <= id <= u 인 이벤트부터 적용"""
+    s = DiffSync(_book())
+    s.on_event(90, 95, 89, [(1000, 1)], [])             # u < 100 → 버림
+    s.on_event(96, 100, 95, [(998, 7)], [])             # u == 100 → 첫 이벤트
+    s.on_event(101, 104, 100, [], [(1001, 0)])
+    assert not s.synced and s.book.n["bid"] == 0
+    assert s.on_snapshot(100, [(1000, 5)], [(1001, 4), (1002, 6)])
+    assert s.synced and s.book.seq == 104
+    assert s.book.best("bid") == (1000, 5)              # 90..95 이벤트는 반영되지 않음
+    assert s.book.n["bid"] == 2 and s.book.best("ask") == (1002, 6)
+
+
+def test_first_event_straddles_snapshot():
+    s = DiffSync(_book())
+    s.on_event(95, 105, 94, [(1000, 9)], [])
+    assert s.on_snapshot(100, [(1000, 5)], [(1001, 4)])
+    assert s.book.seq == 105 and s.book.best("bid") == (1000, 9)
+
+
+def test_first_event_after_snapshot_gap():
+    """첫 이벤트의 U 가 lastUpdateId 보다 크면 사이가 빠졌다 – 책을 비우고 snapshot 다시"""
+    s = DiffSync(_book())
+    s.on_event(101, 110, 100, [(1000, 9)], [])
+    assert not s.on_snapshot(100, [(1000, 5)], [(1001, 4)])
+    assert not s.synced and s.book.n["bid"] == s.book.n["ask"] == 0 and s.buf == []
+
+
+def test_pu_chaining():
+    s = _synced()
+    s.on_event(95, 102, 94, [(1000, 1)], [])            # 첫 이벤트
+    for U, u, pu in ((103, 103, 102), (104, 110, 103), (111, 111, 110)):
+        assert s.on_event(U, u, pu, [(999, u)], [])
+    assert s.book.seq == 111 and s.book.best("bid") == (1000, 1)
+    assert int(s.book.qty["bid"][1]) == 111
+
+
+def test_gap_resyncs():
+    """pu 가 직전 u 와 다르면 False – 책을 비우고 다음 이벤트부터 버퍼 (호출자가 snapshot 재요청)"""
+    s = _synced()
+    assert s.on_event(95, 102, 94, [], [])
+    assert not s.on_event(104, 106, 103, [(1000, 1)], [])    # 103 이 빠짐
+    assert not s.synced and s.book.seq == 0 and s.book.n["bid"] == 0
+    assert s.on_event(107, 108, 106, [(1000, 2)], [])         # 버퍼로
+    assert s.buf == [(107, 108, 106, [(1000, 2)], [])]
+    assert s.on_snapshot(107, [(1000, 5)], [(1001, 4)])
+    assert s.synced and s.book.seq == 108 and s.book.best("bid") == (1000, 2)
+
+
+def test_buffer_bounded():
+    s = DiffSync(_book())
+    s.BUF_MAX = 3
+    for k in range(5):
+        s.on_event(k, k, k - 1, [], [])
+    assert len(s.buf) == 3
+
+
+# ────────────────────────────── L2Book
+def test_set_keeps_order_and_cap():
+    b = _book(cap=3)
+    for px, q in ((100, 1), (103, 1), (101, 1), (102, 1)):
+        b.set("ask", px, q)
+    assert [int(k) for k in b.key["ask"][:b.n["ask"]]] == [100, 101, 102]    # 가장 먼 103 은 버림
+    b.set("ask", 101, 0)
+    assert [int(k) for k in b.key["ask"][:b.n["ask"]]] == [100, 102]
+    b.set("bid", 99, 2)
+    b.set("bid", 98, 3)
+    assert b.best("bid") == (99, 2)
+
+
+def _ladder():
+    b = _book()
+    b.snapshot([(10000, 1), (9990, 2), (9989, 4), (9900, 8)],
+               [(10000 + 1, 1), (10011, 2), (10012, 4), (10100, 8)])
+    return b
+
+
+@pytest.mark.parametrize("side, bp, want", [
+    ("bid", 0,   1),            # 최우선 호가만
+    ("bid", 9,   1),            # 10000 · 9 bp = 9 → 9991 까지
+    ("bid", 10,  3),            # 9990 포함 (경계 포함)
+    ("bid", 11,  7),            # 9989
+    ("bid", 100, 15),
+    ("ask", 10,  3),            # best 10001 + 10 = 10011 포함
+    ("ask", 10.9, 3),           # off 는 절사 (10.90 → 10)
+    ("ask", 11,  7),
+    ("ask", 1e4, 15),
+])
+def test_depth_bounds(side, bp, want):
+    assert _ladder().depth(side, bp) == want
+
+
+def test_depth_empty():
+    assert _book().depth("bid", 50) == 0
+
+
+def test_vwap():
+    b = _ladder()
+    assert b.vwap("bid", 0) == 10000
+    assert b.vwap("bid", 3) == 9993                                    # 29980 / 3 = 9993.3
+    assert b.vwap("ask", 15) == 10058                                  # 150871 / 15 = 10058.07
+    assert b.vwap("ask", 16) == 0                                      # 깊이 부족
@@ -0,0 +1,47 @@
+# tests/test_exchange.py
+"""ExchWrapper – init 의 백그라운드 REST 확인이 첫 주문 전 ready() 에서 기동을 막는지"""
+import asyncio, logging
+from types import SimpleNamespace
+
+import ccxt.async_support as ccxt
+import pytest
+
+from core.exchange import ExchWrapper
+
+
+class StubTicker:
+    def __init__(self, err=None):
+        self.err = err
+
+    async def fetch_ticker(self, symbol):
+        await asyncio.sleep(0.01)
+        if self.err:
+            raise self.err
+        return {"symbol": symbol, "last": 1.0}
+
+
+def _ready(err):
+    async def go():
+        warm = []
+        ex   = ExchWrapper(id="upbit", symbol="USDT/BTC", ccxt_ex=StubTicker(err))
+        tp   = SimpleNamespace(start_keep_warm=warm.append)
+        ex._ping_task = asyncio.create_task(ex._ping(tp, logging.getLogger("test")))
+        try:
+            await ex.ready()
+            await ex.ready()                    # 두 번 불러도 같은 결과
+        finally:
+            assert len(warm) == 1               # keep-warm 은 결과와 무관하게 시작
+    asyncio.run(go())
+
+
+def test_ready_ok():
+    _ready(None)
+
+
+def test_ready_raises_ping_error():
+    with pytest.raises(ccxt.ExchangeNotAvailable):
+        _ready(ccxt.ExchangeNotAvailable("503"))
+
+
+def test_ready_without_init():
+    asyncio.run(ExchWrapper(id="upbit", symbol="USDT/BTC").ready())
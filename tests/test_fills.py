@@ -0,0 +1,192 @@
+# tests/test_fills.py
+"""
+FillTracker dedupe – push(WS) / REST 중복 보고, cid → oid 이동, 종료 뒤 늦게 온 보고.
+마지막 테스트는 로컬 mock WebSocket 서버에 UpbitFillFeed 를 붙여 재접속 resync 까지 돌린다.
+"""
+import asyncio, json
+from types import SimpleNamespace
+
+import websockets
+
+from core.exchange     import CID_PREFIX
+from core.fills        import FillTracker, UpbitFillFeed
+from core.fixed        import Scale
+from core.order_poller import UpbitOrderPoller
+
+SPOT = Scale(price_dp=10, qty_dp=8)
+SYM  = "USDT/BTC"
+
+
+def _drain(q: asyncio.Queue) -> list:
+    out = []
+    while not q.empty():
+        out.append(q.get_nowait()["filled"])
+    return out
+
+
+class StubUpbit:
+    """UpbitFillFeed / UpbitOrderPoller 가 쓰는 ccxt.upbit 부분만 – 주문 상태는 orders 에서"""
+    apiKey, secret = "key", "secret"
+
+    def __init__(self):
+        self.orders   = {}                  # oid → ccxt order dict
+        self.on_fetch = None                # fetch_order 중 끼어들 코루틴 (await 사이 경합 재현)
+
+    def jwt(self, *a):
+        return "token"
+
+    def encode(self, s):
+        return s.encode()
+
+    def uuid(self):
+        return "nonce"
+
+    def market_id(self, symbol):
+        return "USDT-BTC"
+
+    async def _list(self, status):
+        await asyncio.sleep(0)
+        return [o for o in self.orders.values() if o["status"] == status]
+
+    async def fetch_open_orders(self, *a, **k):
+        return await self._list("open")
+
+    async def fetch_closed_orders(self, *a, **k):
+        return await self._list("closed")
+
+    async def fetch_canceled_orders(self, *a, **k):
+        return await self._list("canceled")
+
+    async def fetch_order(self, oid, *a, **k):
+        if self.on_fetch:
+            await self.on_fetch(oid)
+        return self.orders[oid]
+
+
+def _wrapper(ex):
+    return SimpleNamespace(ccxt_ex=ex, symbol=SYM, scale=SPOT, scales={SYM: SPOT})
+
+
+def _order(oid, filled, status):
+    return {"id": oid, "symbol": SYM, "side": "buy", "filled": filled, "status": status}
+
+
+# ────────────────────────────── FillTracker
+def test_push_rest_dedupe():
+    async def go():
+        q  = asyncio.Queue()
+        tr = FillTracker({"o1": q}, asyncio.Queue())
+        await tr.update("o1", "buy", 30, False)          # push
+        await tr.update("o1", "buy", 30, False)          # 같은 체결의 REST 보고
+        await tr.update("o1", "buy", 20, False)          # 더 오래된 REST 보고
+        await tr.update("o1", "buy", 50, False)          # REST 가 먼저 본 증가분
+        await tr.update("o1", "buy", 50, False)          # 뒤늦은 push
+        return _drain(q)
+    assert asyncio.run(go()) == [30, 20]
+
+
+def test_cid_to_oid():
+    async def go():
+        q, other = asyncio.Queue(), asyncio.Queue()
+        cid   = CID_PREFIX + "abc"
+        watch = {cid: q}
+        tr    = FillTracker(watch, other)
+        await tr.update("o1", "buy", 10, False, cid)     # REST ack 보다 먼저 온 push
+        assert watch == {"o1": q}
+        await tr.update("o1", "buy", 10, False)          # 폴러가 같은 체결을 oid 로
+        await tr.update("o1", "buy", 40, True)
+        return _drain(q), _drain(other), watch
+    assert asyncio.run(go()) == ([10, 30], [], {})
+
+
+def test_late_report_after_done():
+    async def go():
+        q  = asyncio.Queue()
+        tr = FillTracker({"o1": q}, q)
+        await tr.update("o1", "buy", 100, True)          # push: 전량 체결로 종료
+        await tr.update("o1", "buy", 100, True)          # 폴러가 들고 있던 closed 보고
+        await tr.update("o1", "buy", 60, False)          # 더 오래된 open 보고
+        return _drain(q)
+    assert asyncio.run(go()) == [100]
+
+
+def test_done_tombstone_bounded():
+    async def go():
+        tr = FillTracker({}, asyncio.Queue())
+        tr.DONE_MAX = 3
+        for i in range(5):
+            await tr.update(f"o{i}", "buy", 1, True)
+        return list(tr._done)
+    assert asyncio.run(go()) == ["o2", "o3", "o4"]
+
+
+def test_poller_fetch_order_race():
+    """fetch_order 를 기다리는 사이 push 가 다른 주문을 끝낸다 – 그 주문의 늦은 REST 보고는 무시"""
+    async def go():
+        q     = asyncio.Queue()
+        ex    = StubUpbit()
+        tr    = FillTracker({"o1": q, "o2": q}, q)
+        ex.orders = {"o1": _order("o1", 0.1, "open"), "o2": _order("o2", 0.5, "closed")}
+        p     = UpbitOrderPoller(_wrapper(ex), tr)
+        seen  = {"o2": ex.orders["o2"]}                 # o1 은 목록 밖 → fetch_order
+        async def batch():
+            return seen
+        p._fetch_batch = batch
+
+        async def push(oid):
+            if oid == "o1":
+                await tr.update("o2", "buy", SPOT.qty(0.5), True)
+        ex.on_fetch = push
+        await p._poll_once()
+        return _drain(q)
+    # o2 : push 0.5 한 번 / o1 : 0.1 – 순서는 await 순서대로
+    assert asyncio.run(go()) == [SPOT.qty(0.5), SPOT.qty(0.1)]
+
+
+# ────────────────────────────── mock WebSocket 서버
+def test_ws_feed_resync():
+    """
+    접속 1 : cid 로만 등록된 주문의 부분 체결 push → oid 로 이동
+    재접속 : resync(REST) 가 끊긴 동안의 전량 체결을 메움 → 종료
+    접속 2 : 늦게 온 done push / 오래된 부분 체결 push – 둘 다 무시
+    """
+    cid = CID_PREFIX + "x1"
+
+    def frame(vol, state):
+        return json.dumps({"type": "myOrder", "code": "USDT-BTC", "uuid": "o1",
+                           "identifier": cid, "ask_bid": "BID", "state": state,
+                           "executed_volume": vol})
+
+    async def go():
+        n, subs = [0], []
+
+        async def handler(ws):
+            subs.append(json.loads(await ws.recv()))
+            n[0] += 1
+            if n[0] == 1:
+                ex.orders["o1"] = _order("o1", 0.3, "open")
+                await ws.send(frame(0.3, "wait"))
+                ex.orders["o1"] = _order("o1", 1.0, "closed")
+            else:
+                await ws.send(frame(1.0, "done"))
+                await ws.send(frame(0.3, "wait"))
+                done.set()
+                await ws.wait_closed()
+
+        q, done = asyncio.Queue(), asyncio.Event()
+        ex      = StubUpbit()
+        tr      = FillTracker({cid: q}, asyncio.Queue())
+        feed    = UpbitFillFeed(_wrapper(ex), tr, resync=UpbitOrderPoller(_wrapper(ex), tr))
+        feed.RECONNECT_SEC = 0
+        async with websockets.serve(handler, "127.0.0.1", 0) as srv:
+            port     = srv.sockets[0].getsockname()[1]
+            feed.URL = f"ws://127.0.0.1:{port}/websocket/v1/private"
+            task     = asyncio.create_task(feed.run())
+            await asyncio.wait_for(done.wait(), 5)
+            await asyncio.sleep(0.05)
+            task.cancel()
+        return _drain(q), tr.watch, subs[0][1]
+    got, watch, sub = asyncio.run(go())
+    assert got == [SPOT.qty(0.3), SPOT.qty(0.7)]
+    assert watch == {}
+    assert sub == {"type": "myOrder", "codes": ["USDT-BTC"]}
@@ -0,0 +1,177 @@
+# tests/test_fixed.py
+"""
+고정소수점 경로 == 예전 Decimal 경로 (user-003 이전 strategy.py / oms.py 공식을 그대로 옮겨 비교).
+
+무작위 입력 (seed 고정) + tick 반올림 / band / implied half-even 경계에 딱 붙인 입력.
+경계 입력은 spreads_vec 의 float 판정이 EPS 안으로 들어가 정수 경로로 넘어가는 경우를 덮는다.
+"""
+import decimal as D
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from core.bus      import MarketBus
+from core.fixed    import P10, Scale, div_half_even
+from core.models   import StratCfg
+from core.oms      import OMS
+from core.strategy import Strategy
+
+SEED  = 3
+N     = 5000
+SPOT  = Scale(price_dp=10, qty_dp=8)
+HEDGE = Scale(price_dp=1,  qty_dp=3)
+FX    = Scale(price_dp=8)
+Q8    = D.Decimal("0.00000001")
+
+
+# ────────────────────────────── 예전 Decimal 공식
+def old_spreads(cfg, bid, ask, bid_f, ask_f, sp=SPOT, hp=HEDGE):
+    bid, ask         = sp.px_dec(bid), sp.px_dec(ask)
+    f_mid            = (hp.px_dec(bid_f) + hp.px_dec(ask_f)) / 2
+    implied          = (D.Decimal(1) / f_mid).quantize(Q8)
+    buy_sp           = (implied - ask) / ask
+    sell_sp          = (bid - implied) / bid
+    return buy_sp >= cfg.band, sell_sp >= cfg.band, int(implied.scaleb(8))
+
+
+def old_size(cfg, krw_per_usdt: D.Decimal, price_usdt: D.Decimal) -> D.Decimal:
+    if krw_per_usdt == 0 or price_usdt == 0:
+        return D.Decimal(0)
+    nominal_usdt = D.Decimal(cfg.order_size_krw) / krw_per_usdt
+    return (nominal_usdt / price_usdt).quantize(Q8)
+
+
+def old_round(v: int, tick: int) -> int:
+    return int((D.Decimal(v) / tick).quantize(D.Decimal(1), D.ROUND_HALF_EVEN)) * tick
+
+
+# ────────────────────────────── 입력
+def _cfg(bp):
+    return StratCfg(bp_threshold=bp, order_size_krw=100000)
+
+
+def _random_quotes(r: random.Random, n: int):
+    out = []
+    for _ in range(n):
+        f   = r.randint(100000, 1200000)            # 10000.0 ~ 120000.0
+        imp = 2 * P10[HEDGE.price_dp + 8 + SPOT.price_dp - 8] // (2 * f + 1)
+        off = r.randint(-imp // 50, imp // 50)
+        w   = r.randint(1, imp // 100)
+        out.append((imp + off - w, imp + off + w, f, f + r.randint(1, 5)))
+    return out
+
+
+def _edge_quotes(bp):
+    """
+    implied 가 정확히 x.5 (half-even) / buy_sp·sell_sp 가 정확히 band 인 입력 (± 1 단위)
+    band = bp% 가 k / 100 꼴이라 ask = implied · 100 / (100 + bp) 가 나누어떨어지는 f 를 찾는다
+    """
+    # 1 / ((63999.9 + 64000.1) / 2) = 1562.5e-8 → 1562e-8 – 1563 이었다면 band 1% 판정이 둘 다 뒤집힌다
+    out = [(157800, 154700, 639999, 640001)]
+    num, den = 100, 100 + int(bp)
+    mul = P10[SPOT.price_dp - 8]
+    for f in range(600000, 700000):
+        s   = 2 * f + 1
+        imp = div_half_even(2 * P10[HEDGE.price_dp + 8], s) * mul
+        if imp * num % den == 0:
+            ask = imp * num // den                          # (imp - ask) / ask == band
+            if (imp * (100 - int(bp))) % 100 == 0:
+                bid = imp * 100 // (100 - int(bp))          # (bid - imp) / bid == band
+            else:
+                bid = ask + 2
+            for d in (-1, 0, 1):
+                out.append((bid + d, ask + d, f, f + 1))
+        if len(out) > 40:
+            break
+    return out
+
+
+# ────────────────────────────── Strategy
+@pytest.mark.parametrize("bp", [0.5, 1, 0.25, 2])
+def test_spreads_random(bp):
+    cfg   = _cfg(bp)
+    strat = Strategy(cfg, MarketBus({"spot": SPOT, "hedge": HEDGE}), None, None)
+    for q in _random_quotes(random.Random(SEED), N):
+        assert strat.spreads(*q) == old_spreads(cfg, *q), q
+
+
+@pytest.mark.parametrize("bp", [1, 2, 4])
+def test_spreads_edge(bp):
+    cfg   = _cfg(bp)
+    strat = Strategy(cfg, MarketBus({"spot": SPOT, "hedge": HEDGE}), None, None)
+    qs    = _edge_quotes(bp)
+    assert any(old_spreads(cfg, *q)[0] and not old_spreads(cfg, q[0], q[1] + 1, *q[2:])[0]
+               for q in qs)                           # 실제로 band 경계에 붙은 입력이 있다
+    for q in qs:
+        assert strat.spreads(*q) == old_spreads(cfg, *q), q
+
+
+@pytest.mark.parametrize("bp", [0.5, 1, 2])
+def test_spreads_vec(bp):
+    """NumPy 경로 (EPS 안이면 정수 재확인) == Decimal – 무작위 + 경계 입력을 한 번에"""
+    cfg = _cfg(bp)
+    qs  = _random_quotes(random.Random(SEED + 1), 512) + _edge_quotes(int(bp) or 1)
+    bus = MarketBus([{"spot": SPOT, "hedge": HEDGE}] * len(qs))
+    for i, (bid, ask, bid_f, ask_f) in enumerate(qs):
+        bus.publish("spot", bid, ask, i=i)
+        bus.publish("hedge", bid_f, ask_f, i=i)
+    strat = Strategy(cfg, bus, None, None)
+    buy, sell = strat.spreads_vec(bus.drain())
+    for k, q in enumerate(qs):
+        ob, os_, _ = old_spreads(cfg, *q)
+        assert (bool(buy[k]), bool(sell[k])) == (ob, os_), q
+
+
+# ────────────────────────────── OMS sizing
+def _sizer(krw: int, size_krw: int):
+    """OMS._size_btc 가 쓰는 속성만 (거래소 / 큐 없이)"""
+    return SimpleNamespace(SIZE_DP=OMS.SIZE_DP, books=None, spot=SimpleNamespace(scale=SPOT),
+                           cfg=StratCfg(bp_threshold=1, order_size_krw=size_krw),
+                           fx=SimpleNamespace(scale=FX, price=krw))
+
+
+def test_size_btc_random():
+    r = random.Random(SEED)
+    for _ in range(N):
+        krw   = r.randint(1_000 * P10[8], 2_000 * P10[8])
+        px    = r.randint(P10[5], P10[7])               # 1e-5 ~ 1e-3 (spot 10 dp)
+        size  = r.choice((100000, 2_000_000, r.randint(1, 10**8)))
+        s     = _sizer(krw, size)
+        want  = old_size(s.cfg, FX.px_dec(krw), SPOT.px_dec(px))
+        assert OMS._size_btc(s, px) == int(want.scaleb(8)), (krw, px, size)
+
+
+def test_size_btc_half_even():
+    """size / (1 KRW · 2e8 USDT) · 1e8 == q + 0.5 → 1e-8 half-even 은 짝수 쪽"""
+    krw, px = P10[8], 2 * P10[18]
+    for q in (0, 1, 2, 7, 12344, 12345):
+        s    = _sizer(krw, 2 * q + 1)
+        want = old_size(s.cfg, FX.px_dec(krw), SPOT.px_dec(px))
+        assert OMS._size_btc(s, px) == int(want.scaleb(8)) == q + (q & 1)
+
+
+def test_size_btc_zero():
+    s = _sizer(0, 100000)
+    assert OMS._size_btc(s, 123) == 0
+    s = _sizer(P10[8], 100000)
+    assert OMS._size_btc(s, 0) == 0
+
+
+# ────────────────────────────── 반올림 / tick
+def test_div_half_even_random():
+    r = random.Random(SEED)
+    for _ in range(N):
+        n, d = r.randint(-10**20, 10**20), r.choice((-1, 1)) * r.randint(1, 10**12)
+        want = (D.Decimal(n) / D.Decimal(d)).to_integral_value(D.ROUND_HALF_EVEN)
+        assert div_half_even(n, d) == int(want), (n, d)
+
+
+@pytest.mark.parametrize("tick", [1, 2, 5, 10, 25, 1000])
+def test_round_px(tick):
+    sc = Scale(price_dp=4, tick=tick)
+    r  = random.Random(SEED + tick)
+    vs = [r.randint(0, 10**9) for _ in range(N)]
+    vs += [k * tick + off for k in range(0, 200) for off in (0, tick // 2, (tick + 1) // 2, tick - 1)]
+    for v in vs:
+        assert sc.round_px(v) == old_round(v, tick), (v, tick)
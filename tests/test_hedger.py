@@ -0,0 +1,134 @@
+# tests/test_hedger.py
+"""
+HedgeAggregator batch 실패 처리 – chunk 하나가 실패해도 다른 chunk 의 leg 는 ack,
+응답을 못 받은 leg 는 client order id 로 조회한 뒤에만 되돌리거나 다시 보낸다.
+"""
+import asyncio
+
+import ccxt.async_support as ccxt
+
+from core.exchange import ExchWrapper
+from core.fixed    import Scale
+from core.hedger   import HedgeAggregator
+from core.ledger   import PositionLedger
+from core.models   import HedgeCfg, LedgerCfg
+
+SPOT  = Scale(price_dp=10, qty_dp=8)
+HEDGE = Scale(price_dp=1,  qty_dp=3)
+SYMS  = [f"C{i}/USDT:USDT" for i in range(7)]          # BATCH 5 → chunk 2 개 (5 + 2)
+
+
+class StubBinance:
+    """create_orders / 시장가 / fetch_order 만 – fail 에 따라 두 번째 chunk 를 실패시킨다"""
+    has = {"createOrders": True}
+
+    def __init__(self, fail: str, lookup_fail: int = 0):
+        self.fail        = fail             # "" / "lost" (들어갔지만 응답 없음) / "down" (안 들어감)
+        self.lookup_fail = lookup_fail      # 처음 n 번의 조회는 네트워크 오류
+        self.placed      = {}               # cid → 주문
+        self.calls       = 0
+
+    async def create_orders(self, reqs):
+        self.calls += 1
+        k = self.calls
+        if self.fail == "down" and k == 2:
+            raise ccxt.ExchangeNotAvailable("503")
+        out = []
+        for r in reqs:
+            cid = r["params"]["clientOrderId"]
+            out.append(self.placed.setdefault(cid, {"id": f"o{len(self.placed)}", "clientOrderId": cid,
+                                                    "symbol": r["symbol"], "status": "closed",
+                                                    "filled": r["amount"]}))
+        if self.fail == "lost" and k == 2:
+            raise ccxt.RequestTimeout("timeout")
+        return out
+
+    async def create_market_sell_order(self, symbol, amount, params):
+        return (await self.create_orders([{"symbol": symbol, "amount": amount, "params": params}]))[0]
+
+    async def fetch_order(self, oid, symbol, params):
+        if self.lookup_fail:
+            self.lookup_fail -= 1
+            raise ccxt.NetworkError("lookup timeout")
+        o = self.placed.get(params["clientOrderId"])
+        if o is None:
+            raise ccxt.OrderNotFound(params["clientOrderId"])
+        return o
+
+
+def _run(ex: StubBinance, flushes: int = 1):
+    async def go():
+        venue  = ExchWrapper(id="binanceusdm", symbol=SYMS[0], ccxt_ex=ex,
+                             scale=HEDGE, scales=dict.fromkeys(SYMS, HEDGE))
+        ledger = PositionLedger(LedgerCfg())
+        h      = HedgeAggregator(venue, HedgeCfg(window_ms=10**6, retry_ms=10**6), ledger=ledger)
+        for s in SYMS:
+            v = venue.view(s)
+            h.register(v, SPOT)
+            ledger.register(type("Spot", (), {"id": "upbit", "scale": SPOT})(), v)
+            await h.add(s, "buy", SPOT.qty("0.001"))
+        for _ in range(flushes):
+            await h.flush()
+        h._timer and h._timer.cancel()
+        return ({s: ledger.hedge(s).get("binanceusdm", 0) for s in SYMS},
+                {s: h.legs[s].net for s in SYMS}, len(h._unknown))
+    return asyncio.run(go())
+
+
+Q = -SPOT.qty("0.001")                                  # spot buy → hedge sell
+
+
+def test_all_ok():
+    ex = StubBinance("")
+    hedged, net, unk = _run(ex)
+    assert set(hedged.values()) == {Q} and set(net.values()) == {0} and not unk
+    assert ex.calls == 2
+
+
+def test_chunk_down_reverts_only_its_legs():
+    ex = StubBinance("down")
+    hedged, net, unk = _run(ex)
+    assert [hedged[s] for s in SYMS] == [Q] * 5 + [0] * 2
+    assert [net[s] for s in SYMS] == [0] * 5 + [Q] * 2      # 되돌려 다음 flush 에
+    assert not unk and len(ex.placed) == 5
+
+
+def test_chunk_lost_is_acked_by_cid():
+    """들어갔지만 응답을 못 받은 chunk – cid 조회로 ack, 다시 보내지 않는다"""
+    ex = StubBinance("lost")
+    hedged, net, unk = _run(ex, flushes=2)
+    assert set(hedged.values()) == {Q} and set(net.values()) == {0} and not unk
+    assert ex.calls == 2 and len(ex.placed) == 7
+
+
+def test_lookup_fails_then_resolves():
+    """조회도 실패하면 보류 – 다음 flush 에서 다시 조회해 ack (그 사이 재주문 없음)"""
+    ex = StubBinance("lost", lookup_fail=2)
+    hedged, net, unk = _run(ex, flushes=1)
+    assert [hedged[s] for s in SYMS] == [Q] * 5 + [0] * 2
+    assert set(net.values()) == {0} and unk == 2
+    ex = StubBinance("lost", lookup_fail=2)
+    hedged, net, unk = _run(ex, flushes=2)
+    assert set(hedged.values()) == {Q} and set(net.values()) == {0} and not unk
+    assert ex.calls == 2
+
+
+def test_limit_flushes_despite_pending_window():
+    """window_ms 타이머가 걸린 뒤 max_unhedged 에 닿으면 window 를 기다리지 않고 바로 보낸다"""
+    async def go():
+        ex     = StubBinance("")
+        venue  = ExchWrapper(id="binanceusdm", symbol=SYMS[0], ccxt_ex=ex,
+                             scale=HEDGE, scales=dict.fromkeys(SYMS, HEDGE))
+        ledger = PositionLedger(LedgerCfg())
+        h      = HedgeAggregator(venue, HedgeCfg(window_ms=2000, max_unhedged=0.002), ledger=ledger)
+        v      = venue.view(SYMS[0])
+        h.register(v, SPOT)
+        ledger.register(type("Spot", (), {"id": "upbit", "scale": SPOT})(), v)
+        await h.add(SYMS[0], "buy", SPOT.qty("0.0005"))      # window 2 s 예약
+        await h.add(SYMS[0], "buy", SPOT.qty("0.005"))       # 한도 초과 → 즉시
+        await asyncio.sleep(0.1)
+        sent = ledger.hedge(SYMS[0]).get("binanceusdm", 0)
+        h._timer and h._timer.cancel()
+        return sent, h.legs[SYMS[0]].net
+    sent, net = asyncio.run(go())
+    assert sent == -SPOT.qty("0.005") and net == -SPOT.qty("0.0005")
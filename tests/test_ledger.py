@@ -0,0 +1,215 @@
+# tests/test_ledger.py
+"""
+PositionLedger 대사 (첫 회차 baseline, tolerance 밖 차이 2 회 연속이면 거래소 값 채택, 조회 중 변경은 건너뜀)
+와 emergency_flat 이 장부의 venue 별 포지션만큼 청산 주문을 내는지.
+"""
+import asyncio
+
+import pytest
+
+import core.ledger, core.oms
+from core.bus       import MarketBus
+from core.exchange  import ExchWrapper
+from core.fixed     import Scale
+from core.ledger    import DRIFT_C, PositionLedger
+from core.models    import LedgerCfg, StratCfg
+from core.oms       import OMS
+from core.ratelimit import RateScheduler
+
+SPOT  = Scale(price_dp=10, qty_dp=8)
+HEDGE = Scale(price_dp=1,  qty_dp=3)
+SSYM  = "USDT/BTC"
+HSYM  = "BTC/USDT:USDT"
+
+
+@pytest.fixture(autouse=True)
+def _no_transport(monkeypatch):
+    """venue 공용 스케줄러 대신 Transport 없는 RateScheduler"""
+    pool = {}
+    sched = lambda v, cfg=None: pool.setdefault(v, RateScheduler(v))
+    monkeypatch.setattr(core.ledger, "get_scheduler", sched)
+    monkeypatch.setattr(core.oms, "get_scheduler", sched)
+
+
+class StubSpot:
+    """fetch_balance / market / 주문 – on_fetch 는 잔고 조회 도중 끼어들 함수"""
+    def __init__(self, btc=0.0):
+        self.btc      = btc
+        self.on_fetch = None
+        self.orders   = []
+
+    def market(self, symbol):
+        return {"base": "BTC", "quote": "USDT"}
+
+    async def fetch_balance(self):
+        if self.on_fetch:
+            self.on_fetch()
+        return {"total": {"BTC": self.btc, "USDT": 1000.0}}
+
+    async def create_order(self, symbol, type, side, amount, price, params):
+        self.orders.append((side, amount, price, params.get("timeInForce")))
+        return {"id": f"s{len(self.orders)}"}
+
+
+class StubFutures:
+    """fetch_positions / 시장가 – pos 는 계약 수 (+long / -short)"""
+    def __init__(self, pos=0.0):
+        self.pos    = pos
+        self.orders = []
+
+    async def fetch_positions(self, symbols):
+        if not self.pos:
+            return []
+        return [{"symbol": HSYM, "contracts": abs(self.pos), "contractSize": 1,
+                 "side": "long" if self.pos > 0 else "short"}]
+
+    async def _mkt(self, side, symbol, amount, params):
+        self.orders.append((side, amount, params.get("reduceOnly")))
+        return {"id": f"h{len(self.orders)}"}
+
+    async def create_market_buy_order(self, symbol, amount, params):
+        return await self._mkt("buy", symbol, amount, params)
+
+    async def create_market_sell_order(self, symbol, amount, params):
+        return await self._mkt("sell", symbol, amount, params)
+
+
+def _ledger(spot_ex, venues):
+    led  = PositionLedger(LedgerCfg())
+    spot = ExchWrapper(id="upbit", symbol=SSYM, ccxt_ex=spot_ex, scale=SPOT)
+    hws  = [ExchWrapper(id=v, symbol=HSYM, ccxt_ex=c, scale=HEDGE, scales={HSYM: HEDGE})
+            for v, c in venues.items()]
+    led.register(spot, hws[0])
+    for h in hws[1:]:
+        led.add_venue(h)
+    return led, spot, hws
+
+
+def _drift(venue):
+    return DRIFT_C.labels(venue)._value.get()
+
+
+# ────────────────────────────── 대사
+def test_reconcile_baseline_and_drift():
+    async def go():
+        sx, fx = StubSpot(0.5), StubFutures(-0.2)
+        led, _, _ = _ledger(sx, {"binanceusdm": fx})
+        d0 = _drift("upbit"), _drift("binanceusdm")
+        await led.reconcile()                           # 기동 전 잔고 / 포지션 → baseline
+        out = [(led.spot(HSYM), led.hedge(HSYM), led.net(HSYM))]
+
+        led.fill(HSYM, "buy", SPOT.qty("0.01"))         # 세션 체결 + 헷지 – 거래소도 같이 움직임
+        led.hedged(HSYM, "binanceusdm", -SPOT.qty("0.01"))
+        sx.btc, fx.pos = 0.51, -0.21
+        await led.reconcile()
+        out.append((led.spot(HSYM), led.hedge(HSYM), led.net(HSYM)))
+
+        sx.btc = 0.52                                   # 장부가 놓친 spot 체결 0.01
+        await led.reconcile()                           # 1 회 – 아직 그대로
+        out.append((led.spot(HSYM), led.net(HSYM)))
+        await led.reconcile()                           # 2 회 연속 – 거래소 값 채택
+        out.append((led.spot(HSYM), led.net(HSYM)))
+        return out, (_drift("upbit") - d0[0], _drift("binanceusdm") - d0[1])
+    out, drift = asyncio.run(go())
+    q = SPOT.qty
+    assert out[0] == (0, {}, 0)
+    assert out[1] == (q("0.01"), {"binanceusdm": -q("0.01")}, 0)
+    assert out[2] == (q("0.01"), 0)
+    assert out[3] == (q("0.02"), q("0.01"))
+    assert drift == (1, 0)
+
+
+def test_reconcile_blip_and_tolerance():
+    """한 번만 어긋난 값 / tolerance 이내 차이는 고치지 않는다 (연속 횟수는 초기화)"""
+    async def go():
+        sx, fx = StubSpot(0.5), StubFutures(-0.2)
+        led, _, _ = _ledger(sx, {"binanceusdm": fx})
+        await led.reconcile()
+        fx.pos = -0.25                                  # 한 번 튄 값
+        await led.reconcile()
+        fx.pos = -0.2
+        await led.reconcile()
+        fx.pos = -0.25
+        await led.reconcile()                           # 다시 1 회째
+        first = led.hedge(HSYM)
+        sx.btc, fx.pos = 0.5000005, -0.2                # 5e-7 – tolerance 1e-6 이내
+        await led.reconcile()
+        await led.reconcile()
+        return first, led.hedge(HSYM), led.spot(HSYM)
+    assert asyncio.run(go()) == ({}, {}, 0)
+
+
+def test_reconcile_skips_when_ledger_moves():
+    """조회하는 사이 체결이 장부에 들어오면 그 회차는 비교하지 않는다 (불일치 횟수도 안 셈)"""
+    async def go():
+        sx, fx = StubSpot(0.5), StubFutures()
+        led, _, _ = _ledger(sx, {"binanceusdm": fx})
+        await led.reconcile()
+        sx.btc = 0.6
+        sx.on_fetch = lambda: led.fill(HSYM, "buy", 1)
+        await led.reconcile()
+        await led.reconcile()
+        sx.on_fetch = None
+        moved = led.spot(HSYM)
+        await led.reconcile()                           # 처음으로 센 불일치 – 아직 그대로
+        return moved, led.spot(HSYM)
+    assert asyncio.run(go()) == (2, 2)
+
+
+def test_reconcile_backup_venue_baseline():
+    """backup venue 포지션은 따로 baseline – primary 와 섞지 않는다"""
+    async def go():
+        sx, bn, by = StubSpot(0.5), StubFutures(-0.2), StubFutures(-0.1)
+        led, _, _ = _ledger(sx, {"binanceusdm": bn, "bybit": by})
+        await led.reconcile()
+        led.hedged(HSYM, "bybit", -SPOT.qty("0.003"))
+        by.pos = -0.103
+        await led.reconcile()
+        await led.reconcile()
+        return led.hedge(HSYM)
+    assert asyncio.run(go()) == {"bybit": -SPOT.qty("0.003")}
+
+
+# ────────────────────────────── emergency_flat
+class _Counter:
+    def labels(self, **k):
+        return self
+
+    def inc(self):
+        pass
+
+
+def test_emergency_flat_sizes_from_ledger():
+    """
+    spot +0.01 / binanceusdm -0.006 / bybit -0.0035 →
+      spot 0.01 매도 IOC (bid - flat_slip_bp), binanceusdm 0.006 / bybit 0.003 (lot 절사) reduce-only 매수
+    """
+    async def go():
+        sx, bn, by = StubSpot(), StubFutures(), StubFutures()
+        led, spot, hws = _ledger(sx, {"binanceusdm": bn, "bybit": by})
+        bus = MarketBus({"spot": SPOT, "hedge": HEDGE})
+        bus.publish("spot", SPOT.px("0.0000158"), SPOT.px("0.0000159"))
+        oms = OMS(spot, hws[0], StratCfg(bp_threshold=1, order_size_krw=100000),
+                  asyncio.Queue(), asyncio.Queue(), _Counter(), None, ledger=led, bus=bus)
+        led.fill(HSYM, "buy", SPOT.qty("0.01"))
+        led.hedged(HSYM, "binanceusdm", -SPOT.qty("0.006"))
+        led.hedged(HSYM, "bybit", -SPOT.qty("0.0035"))
+        await oms.emergency_flat()
+        return sx.orders, bn.orders, by.orders, led.hedge(HSYM), oms.halted
+    spot, bn, by, hedge, halted = asyncio.run(go())
+    assert spot == [("sell", 0.01, SPOT.px_float(SPOT.px("0.000015721")), "IOC")]   # bid · (1 - 50 bp)
+    assert bn == [("buy", 0.006, True)] and by == [("buy", 0.003, True)]
+    assert hedge == {"binanceusdm": 0, "bybit": -SPOT.qty("0.0005")} and halted
+
+
+def test_emergency_flat_nothing_to_close():
+    async def go():
+        sx, bn = StubSpot(), StubFutures()
+        led, spot, hws = _ledger(sx, {"binanceusdm": bn})
+        oms = OMS(spot, hws[0], StratCfg(bp_threshold=1, order_size_krw=100000),
+                  asyncio.Queue(), asyncio.Queue(), _Counter(), None, ledger=led)
+        led.fill(HSYM, "buy", SPOT.qty("0.001"))
+        led.fill(HSYM, "sell", SPOT.qty("0.001"))
+        await oms.emergency_flat()
+        return sx.orders, bn.orders
+    assert asyncio.run(go()) == ([], [])
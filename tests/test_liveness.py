@@ -0,0 +1,99 @@
+# tests/test_liveness.py
+"""
+feed_age – 값이 바뀌지 않는 조용한 호가창도 프레임이 오는 동안은 살아 있다.
+  thread 피드  : MarketBus.publish 가 값이 같아도 t_last 갱신
+  process 피드 : ShmWriter 가 값이 같아도 heartbeat 를 쓰고 ShmBridge.pump 가 t_last 로 옮긴다
+"""
+import time
+
+import pytest
+
+from core.bus      import MarketBus
+from core.feedproc import ShmBridge, ShmWriter
+from core.fixed    import Scale
+from core.liveness import Liveness, VenueProbe
+from core.models   import LivenessCfg
+
+SCALES = {"spot": Scale(price_dp=10, qty_dp=8), "hedge": Scale(price_dp=1, qty_dp=3)}
+MS     = 1_000_000
+
+
+def _liveness(bus, t0):
+    lv = Liveness([VenueProbe("upbit", "spot", bus), VenueProbe("binanceusdm", "hedge", bus)],
+                  [], LivenessCfg())
+    lv.t0 = t0
+    return lv
+
+
+def _ages(lv, t_ns):
+    return [lv.signals(p, 0.0, t_ns)["feed_age"] for p in lv.probes]
+
+
+def _levels(lv, t_ns):
+    return [lv.grade(p, 0.0, t_ns)[0] for p in lv.probes]
+
+
+def test_thread_feed_unchanged_frames():
+    bus = MarketBus(SCALES)
+    t0  = time.time_ns()
+    lv  = _liveness(bus, t0)
+    bus.publish("spot", 100, 101, t0)
+    bus.publish("hedge", 50, 51, t0)
+    seq = bus.seq
+    for k in range(1, 6):                               # 1 s 마다 같은 호가
+        bus.publish("spot", 100, 101, t0 + k * 1000 * MS)
+    assert bus.seq == seq                               # Strategy 는 깨우지 않는다
+    now = t0 + 5500 * MS
+    assert _ages(lv, now) == [500, 5500]
+    assert _levels(lv, now) == [0, 1]                   # hedge 만 조용함 (pause 2 s)
+
+
+@pytest.fixture
+def shm():
+    bus    = MarketBus([SCALES, SCALES])
+    bridge = ShmBridge(bus)
+    yield bus, bridge, ShmWriter(bridge.shm, bus.scales)
+    bridge.close()
+
+
+def test_process_feed_heartbeat(shm):
+    bus, bridge, w = shm
+    t0 = time.time_ns()
+    lv = _liveness(bus, t0)
+    assert w.publish("spot", 100, 101, t0, 0, i=1)
+    assert w.publish("hedge", 50, 51, t0, 0, i=1)
+    assert bridge.pump() == 2
+    seq = bus.seq
+    for k in range(1, 13):                              # 1 s 마다 같은 호가 – 슬롯은 그대로
+        assert not w.publish("spot", 100, 101, t0 + k * 1000 * MS, 0, i=1)
+        assert bridge.pump() == 0
+    assert bus.seq == seq
+    assert bus.t_last["spot"] == t0 + 12000 * MS and bus.t_last["hedge"] == t0
+    now = t0 + 12500 * MS
+    assert _ages(lv, now) == [500, 12500]
+    assert _levels(lv, now) == [0, 2]                   # spot 정상, hedge 는 10 s 넘게 프레임 없음
+
+
+def test_process_feed_heartbeat_any_pair(shm):
+    """pair 가 여럿이면 어느 pair 의 프레임이든 venue heartbeat"""
+    bus, bridge, w = shm
+    t0 = time.time_ns()
+    w.publish("hedge", 50, 51, t0, 0, i=0)
+    w.publish("hedge", 60, 61, t0, 0, i=1)
+    bridge.pump()
+    w.publish("hedge", 60, 61, t0 + 3000 * MS, 0, i=1)
+    bridge.pump()
+    assert bus.t_last["hedge"] == t0 + 3000 * MS
+    assert (bus.bid["hedge"].tolist(), bus.ask["hedge"].tolist()) == ([50, 60], [51, 61])
+
+
+def test_process_heartbeat_not_moved_back(shm):
+    """pump 가 늦게 읽은 슬롯의 t_rx 가 그 뒤 heartbeat 보다 오래돼도 t_last 는 heartbeat"""
+    bus, bridge, w = shm
+    t0 = time.time_ns()
+    w.publish("spot", 100, 101, t0, 0, i=0)
+    bridge.pump()
+    w.publish("spot", 70, 71, t0 + 1000 * MS, 0, i=1)   # 바뀐 슬롯
+    w.publish("spot", 100, 101, t0 + 2000 * MS, 0, i=0) # 그 뒤 같은 값 프레임
+    assert bridge.pump() == 1
+    assert bus.t_last["spot"] == t0 + 2000 * MS and bus.t_rx.tolist() == [t0, t0 + 1000 * MS]
@@ -0,0 +1,80 @@
+# tests/test_logq.py
+"""로그 큐가 가득 차 버린 레코드 수가 다음 레코드 / metric 으로 드러나는지, sample / rate 가 거르는 범위"""
+import logging, queue
+
+from core.logq import JsonLinesFormatter, Q_DROP, RateFilter, SampleFilter, _QHandler
+
+
+def _logger(h, name):
+    lg = logging.getLogger(name)
+    lg.handlers[:] = [h]
+    lg.propagate = False
+    lg.setLevel(logging.DEBUG)
+    return lg
+
+
+def _msgs(q) -> list:
+    out = []
+    while not q.empty():
+        out.append(q.get_nowait().getMessage())
+    return out
+
+
+def test_queue_full_reported_on_next_record():
+    q  = queue.Queue(2)
+    h  = _QHandler(q)
+    lg = _logger(h, "test.logq.full")
+    c0 = Q_DROP._value.get()
+    for i in range(5):
+        lg.warning("m%d", i)
+    assert [q.get_nowait().getMessage() for _ in range(2)] == ["m0", "m1"]
+    assert Q_DROP._value.get() - c0 == 3
+    lg.warning("next")
+    r = q.get_nowait()
+    assert r.dropped == 3 and '"dropped":3' in JsonLinesFormatter().format(r)
+    lg.warning("again")
+    assert not getattr(q.get_nowait(), "dropped", 0)
+
+
+def test_rate_and_queue_drops_add_up():
+    """RateFilter 가 붙인 개수를 실은 레코드가 큐에서 버려져도 합계는 다음 레코드로 넘어간다"""
+    q  = queue.Queue(1)
+    h  = _QHandler(q)
+    rf = RateFilter({"test": 1})
+    h.addFilter(rf)
+    lg = _logger(h, "test[logq]")           # 한도는 "[" 앞까지의 설정 키로
+    lg.info("a")                            # 통과 (큐 1 칸)
+    lg.info("b")                            # rate 로 버림
+    rf.b["test[logq]"][0] = 1               # 다음 1 개 통과 – dropped=1 을 달고 오지만 큐가 참
+    lg.info("c")
+    q.get_nowait()
+    rf.b["test[logq]"][0] = 1
+    lg.info("d")
+    assert q.get_nowait().dropped == 2      # b (rate) + c (queue)
+
+
+def test_warnings_bypass_filters():
+    """sample / rate 는 INFO / DEBUG 만 – WARNING 이상은 폭주 중에도 모두 남는다"""
+    q  = queue.Queue()
+    h  = _QHandler(q)
+    h.addFilter(SampleFilter({"test": 100}))
+    h.addFilter(RateFilter({"test": 1}))
+    lg = _logger(h, "test[warn]")
+    for i in range(5):
+        lg.info("i%d", i)
+        lg.warning("w%d", i)
+    lg.error("e")
+    assert _msgs(q) == ["i0", "w0", "w1", "w2", "w3", "w4", "e"]
+
+
+def test_rate_bucket_per_pair():
+    """OMS[A] 폭주가 OMS[B] 의 한도를 쓰지 않는다"""
+    q  = queue.Queue()
+    h  = _QHandler(q)
+    h.addFilter(RateFilter({"test": 2}))
+    a, b = _logger(h, "test[A]"), _logger(h, "test[B]")
+    for _ in range(5):
+        a.info("a")
+    b.info("b")
+    b.info("b")
+    assert _msgs(q) == ["a", "a", "b", "b"]
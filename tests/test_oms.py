@@ -0,0 +1,146 @@
+# tests/test_oms.py
+"""OMS – 헷지 venue 별 레버리지 설정, 신규 주문 응답이 없을 때 cid 로 확인"""
+import asyncio
+
+import ccxt.async_support as ccxt
+
+from core.exchange import ExchWrapper
+from core.fixed    import Scale
+from core.ledger   import PositionLedger
+from core.models   import LedgerCfg, StratCfg
+from core.oms      import OMS
+from core.quote    import QState
+
+SPOT  = Scale(price_dp=10, qty_dp=8)
+HEDGE = Scale(price_dp=1,  qty_dp=3)
+HSYM  = "BTC/USDT:USDT"
+
+
+class StubHedge:
+    """set_leverage 만 – err 가 있으면 그 예외"""
+    def __init__(self, err=None):
+        self.err   = err
+        self.calls = []
+
+    async def set_leverage(self, lev, symbol):
+        self.calls.append((lev, symbol))
+        if self.err:
+            raise self.err
+        return {}
+
+
+class _Counter:
+    def labels(self, **k):
+        return self
+
+    def inc(self):
+        pass
+
+
+def _oms(spot_ex=None, hedges=None, lev=3):
+    """hedges : venue id → ccxt stub (첫 번째가 primary)"""
+    ex     = {v: ExchWrapper(id=v, symbol=HSYM, ccxt_ex=c, scale=HEDGE) for v, c in hedges.items()}
+    ledger = PositionLedger(LedgerCfg())
+    spot   = ExchWrapper(id="upbit", symbol="USDT/BTC", ccxt_ex=spot_ex, scale=SPOT)
+    primary, *rest = ex.values()
+    o = OMS(spot, primary, StratCfg(bp_threshold=1, order_size_krw=100000, hedge_leverage=lev),
+            asyncio.Queue(), asyncio.Queue(), _Counter(), None, ledger=ledger)
+    for b in rest:
+        ledger.add_venue(b)
+    return o
+
+
+def test_leverage_every_venue():
+    """primary / backup 모두 이 pair 심볼에 – 실패한 venue 만 다음에 다시, 'not modified' 는 적용으로"""
+    async def go():
+        bn, by = StubHedge(), StubHedge(ccxt.BadRequest('bybit {"retCode":110043,"retMsg":"leverage not modified"}'))
+        o      = _oms(hedges={"binanceusdm": bn, "bybit": by})
+        flaky  = StubHedge(ccxt.NetworkError("timeout"))
+        o.ledger.add_venue(ExchWrapper(id="okx", symbol=HSYM, ccxt_ex=flaky, scale=HEDGE))
+        await o._ensure_leverage()
+        first = o._leverage_set
+        flaky.err = None
+        await o._ensure_leverage()
+        await o._ensure_leverage()                      # 모두 끝남 – 더 부르지 않는다
+        return bn.calls, by.calls, flaky.calls, first, o._leverage_set
+    bn, by, flaky, first, done = asyncio.run(go())
+    assert bn == by == [(3, HSYM)] and flaky == [(3, HSYM)] * 2
+    assert not first and done
+
+
+# ────────────────────────────── 신규 주문 응답 없음
+class StubUpbit:
+    """지정가 / identifier 조회 / 취소 – err 는 지정가 응답 대신 올릴 예외, placed 면 그래도 접수"""
+    def __init__(self, err=None, placed=True, lookup_fail=0):
+        self.err         = err
+        self.placed      = placed
+        self.lookup_fail = lookup_fail
+        self.orders      = {}               # cid → 주문
+        self.lookups     = 0
+        self.canceled    = []
+
+    async def create_limit_buy_order(self, symbol, amount, price, params):
+        cid = params["clientOrderId"]
+        if self.placed:
+            self.orders[cid] = {"id": f"u{len(self.orders)}", "clientOrderId": cid, "status": "open"}
+        if self.err:
+            raise self.err
+        return self.orders[cid]
+
+    async def privateGetOrder(self, params):
+        self.lookups += 1
+        if self.lookup_fail:
+            self.lookup_fail -= 1
+            raise ccxt.NetworkError("lookup timeout")
+        o = self.orders.get(params["identifier"])
+        if o is None:
+            raise ccxt.OrderNotFound("order_not_found")
+        return o
+
+    def parse_order(self, r, market=None):
+        return r
+
+    async def cancel_order(self, oid, symbol):
+        self.canceled.append(oid)
+        return {"id": oid}
+
+
+def _place(ex: StubUpbit, settle: float = 0.0):
+    async def go():
+        o = _oms(ex, {"binanceusdm": StubHedge()})
+        o.LOOKUP_SEC = 0.01
+        q = o.quotes["bid"]
+        q.want = (SPOT.px("0.0000158"), SPOT.qty("0.001"))
+        await o._place("bid")
+        state = (q.state, q.oid, dict(o.watch))
+        await asyncio.sleep(settle)
+        return state, dict(o.watch), o.fill_q
+    return asyncio.run(go())
+
+
+def test_place_rejected_drops_cid():
+    ex = StubUpbit(ccxt.InsufficientFunds("insufficient_funds_bid"), placed=False)
+    (state, oid, watch), _, _ = _place(ex)
+    assert state is QState.IDLE and watch == {} and ex.lookups == 0
+
+
+def test_place_timeout_but_accepted():
+    """응답은 못 받았지만 들어간 주문 – cid 조회로 oid 를 얻어 그대로 LIVE 로 추적"""
+    ex = StubUpbit(ccxt.RequestTimeout("timeout"))
+    (state, oid, watch), _, fq = _place(ex)
+    assert state is QState.LIVE and oid == "u0" and watch == {"u0": fq}
+
+
+def test_place_timeout_not_accepted():
+    ex = StubUpbit(ccxt.RequestTimeout("timeout"), placed=False)
+    (state, oid, watch), _, _ = _place(ex)
+    assert state is QState.IDLE and watch == {} and ex.lookups == 1
+
+
+def test_place_unknown_resolved_later():
+    """조회도 실패 – cid 를 watch 에 남겨 체결은 계속 받고, 나중에 찾으면 oid 로 옮겨 취소"""
+    ex = StubUpbit(ccxt.ExchangeNotAvailable("502"), lookup_fail=2)
+    (state, oid, watch), later, fq = _place(ex, settle=0.1)
+    cid = next(iter(ex.orders))
+    assert state is QState.IDLE and watch == {cid: fq}
+    assert later == {"u0": fq} and ex.canceled == ["u0"] and ex.lookups == 3
@@ -0,0 +1,66 @@
+# tests/test_quote.py
+"""OMS 최소 diff 판정 (none / new / cancel / replace) 과 재호가 허용 오차 경계"""
+import pytest
+
+from core.quote import QState, SideQuote, Tolerance, diff
+
+
+def _quote(state, want=None, price=0, qty=0):
+    q = SideQuote("bid")
+    q.state, q.want, q.price, q.qty = state, want, price, qty
+    if state is QState.LIVE:
+        q.oid = "o1"
+    return q
+
+
+TOL = Tolerance(1)                          # 1 bp
+
+# (상태, want, 걸린 price, 걸린 qty) → 동작
+CASES = [
+    (QState.IDLE,           None,           0,       0,   "none"),
+    (QState.IDLE,           (100000, 50),   0,       0,   "new"),
+    (QState.PENDING_NEW,    (100000, 50),   0,       0,   "none"),
+    (QState.PENDING_NEW,    None,           0,       0,   "none"),
+    (QState.PENDING_CANCEL, (100000, 50),   100000,  50,  "none"),
+    (QState.PENDING_CANCEL, None,           100000,  50,  "none"),
+    (QState.LIVE,           None,           100000,  50,  "cancel"),
+    (QState.LIVE,           (100000, 50),   100000,  50,  "none"),
+    (QState.LIVE,           (100010, 50),   100000,  50,  "none"),      # 가격 1 bp 안
+    (QState.LIVE,           (100011, 50),   100000,  50,  "replace"),   # 가격 1 bp 밖
+    (QState.LIVE,           (99990, 50),    100000,  50,  "none"),
+    (QState.LIVE,           (99989, 50),    100000,  50,  "replace"),
+    (QState.LIVE,           (100000, 51),   100000,  50,  "replace"),   # 수량 변경
+    (QState.LIVE,           (100000, 0),    100000,  50,  "replace"),
+]
+
+
+@pytest.mark.parametrize("state, want, price, qty, act", CASES)
+def test_diff(state, want, price, qty, act):
+    assert diff(_quote(state, want, price, qty), TOL) == act
+
+
+# (bp, want, rest) → 같은 호가인가 – |want - rest| · 10000 <= rest · bp 경계 ± 1
+BANDS = [
+    (1,     100_010, 100_000, True),            # 100000 · 1 / 10000 = 10
+    (1,     100_011, 100_000, False),
+    (1,     99_990,  100_000, True),
+    (1,     99_989,  100_000, False),
+    (0.5,   20_001,  20_000,  True),            # 20000 · 0.5 / 10000 = 1
+    (0.5,   20_002,  20_000,  False),
+    (0.5,   19_999,  20_000,  True),
+    (0.5,   10_001,  10_000,  False),           # 0.5 단위 – 정수 차이 1 은 이미 밖
+    (0.25,  40_001,  40_000,  True),
+    (0.25,  40_002,  40_000,  False),
+    (0.1,   10**9 + 10**4,      10**9,  True),  # 큰 정수도 정확히 (Fraction(0.1) 은 0.1 보다 조금 큼)
+    (0.1,   10**9 + 10**4 + 1,  10**9,  False),
+    (0,     10_000,  10_000,  True),            # 0 bp – 같은 값만
+    (0,     10_001,  10_000,  False),
+    (3,     0,       0,       True),            # 걸린 수량 0
+    (3,     1,       0,       False),
+]
+
+
+@pytest.mark.parametrize("bp, want, rest, same", BANDS)
+def test_tolerance_edges(bp, want, rest, same):
+    assert Tolerance(bp).same(want, rest) is same
+
@@ -0,0 +1,125 @@
+# tests/test_ratelimit.py
+"""RateScheduler – 우선순위 순서, deadline 만료, Upbit / Binance 응답 헤더로 한도 맞추기"""
+import asyncio
+
+from multidict import CIMultiDict
+
+from core.ratelimit import RL_DROP, Prio, RateScheduler
+
+
+def _empty(rl: RateScheduler, group: str):
+    """burst 토큰을 모두 써서 다음 요청부터 대기열로 가게"""
+    g = rl.group(group)
+    g.refill(asyncio.get_running_loop().time())
+    g.tokens = 0
+
+
+def test_priority_order():
+    """토큰이 모자라면 도착 순서와 무관하게 CANCEL > NEW > QUERY > MONITOR, 같은 우선순위는 도착 순"""
+    async def go():
+        rl, out = RateScheduler("upbit", {"default": 50}), []
+        _empty(rl, "default")
+
+        async def req(tag, prio):
+            await rl.acquire("default", prio)
+            out.append(tag)
+        await asyncio.gather(req("m", Prio.MONITOR), req("q1", Prio.QUERY), req("n", Prio.NEW),
+                             req("q2", Prio.QUERY), req("c", Prio.CANCEL))
+        return out
+    assert asyncio.run(go()) == ["c", "n", "q1", "q2", "m"]
+
+
+def test_idle_group_passes_at_once():
+    async def go():
+        rl   = RateScheduler("upbit")
+        loop = asyncio.get_running_loop()
+        t0   = loop.time()
+        ok   = [await rl.acquire("order", Prio.NEW) for _ in range(8)]    # burst = 1 초 분량
+        return ok, loop.time() - t0
+    ok, dt = asyncio.run(go())
+    assert all(ok) and dt < 0.05
+
+
+def test_deadline_expiry():
+    """deadline 안에 토큰을 못 얻은 요청은 False – 뒤에 있던 높은 우선순위 요청은 그대로 통과"""
+    async def go():
+        rl = RateScheduler("upbit", {"default": 10})
+        _empty(rl, "default")
+        c0 = RL_DROP.labels("upbit", "default", "MONITOR")._value.get()
+        mon, new = await asyncio.gather(rl.acquire("default", Prio.MONITOR, deadline=0.02),
+                                        rl.acquire("default", Prio.NEW, deadline=1.0))
+        return mon, new, RL_DROP.labels("upbit", "default", "MONITOR")._value.get() - c0
+    assert asyncio.run(go()) == (False, True, 1)
+
+
+def test_caller_cancel_frees_slot():
+    async def go():
+        rl = RateScheduler("upbit", {"default": 20})
+        _empty(rl, "default")
+        a = asyncio.ensure_future(rl.acquire("default", Prio.CANCEL))
+        b = asyncio.ensure_future(rl.acquire("default", Prio.QUERY))
+        await asyncio.sleep(0)
+        a.cancel()
+        return await asyncio.wait_for(b, 1.0)
+    assert asyncio.run(go()) is True
+
+
+# ────────────────────────────── 응답 헤더
+def test_upbit_remaining_req():
+    async def go():
+        rl   = RateScheduler("upbit")
+        loop = asyncio.get_running_loop()
+        rl.on_response("order", 201, CIMultiDict({"Remaining-Req": "group=order; min=479; sec=3"}))
+        g = rl.group("order")
+        tokens, paused = g.tokens, g.paused > loop.time()
+        rl.on_response("default", 200, CIMultiDict({"Remaining-Req": "group=default; min=1799; sec=0"}))
+        d = rl.group("default")
+        return tokens, paused, d.tokens, d.paused - loop.time()
+    tokens, paused, d_tokens, d_pause = asyncio.run(go())
+    assert tokens == 3 and not paused                   # 남은 3 개로 줄임
+    assert d_tokens <= 0 and 0.9 < d_pause <= 1.0       # sec=0 → 1 초 정지
+
+
+def test_upbit_remaining_req_unknown_group():
+    async def go():
+        rl = RateScheduler("upbit")
+        rl.on_response("default", 200, CIMultiDict({"Remaining-Req": "group=candles; min=599; sec=0"}))
+        return {n: (g.tokens, g.paused) for n, g in rl._groups.items()}
+    assert asyncio.run(go()) == {"order": (8, 0.0), "default": (30, 0.0), "ticker": (10, 0.0)}
+
+
+def test_binance_used_weight():
+    """X-MBX-USED-WEIGHT-1M 이 한도(2400)의 90% 를 넘으면 그 1 분 창이 끝날 때까지 default 정지"""
+    async def go():
+        rl   = RateScheduler("binanceusdm")
+        loop = asyncio.get_running_loop()
+        rl.on_response("default", 200, CIMultiDict({"X-MBX-USED-WEIGHT-1M": "2159"}))
+        below = rl.group("default").paused
+        rl.on_response("default", 200, CIMultiDict({"X-MBX-USED-WEIGHT-1M": "2160",
+                                                    "X-MBX-ORDER-COUNT-10S": "3"}))
+        return below, rl.group("default").paused - loop.time(), rl.group("order").paused
+    below, pause, order = asyncio.run(go())
+    assert below == 0.0 and 0 < pause <= 60 and order == 0.0
+
+
+def test_binance_order_count():
+    async def go():
+        rl   = RateScheduler("binanceusdm")
+        loop = asyncio.get_running_loop()
+        rl.on_response("order", 200, CIMultiDict({"X-MBX-ORDER-COUNT-10S": "270"}))
+        return rl.group("order").paused - loop.time(), rl.group("default").paused
+    pause, default = asyncio.run(go())
+    assert 0 < pause <= 10 and default == 0.0
+
+
+def test_retry_after_pauses_queue():
+    """429 + Retry-After 동안은 대기열의 요청도 통과하지 못한다"""
+    async def go():
+        rl   = RateScheduler("binanceusdm")
+        loop = asyncio.get_running_loop()
+        rl.on_response("order", 429, CIMultiDict({"Retry-After": "0.2"}))
+        t0 = loop.time()
+        ok = await rl.acquire("order", Prio.CANCEL)
+        return ok, loop.time() - t0
+    ok, dt = asyncio.run(go())
+    assert ok and 0.19 <= dt < 0.5